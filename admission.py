@@ -0,0 +1,116 @@
+"""Controle de admissão dos uploads pesados
+
+Vários uploads grandes ao mesmo tempo multiplicam o uso de memória (bytes do
+upload, cópias para o pool, DataFrames e resultado). O AdmissionController
+deixa passar direto os arquivos pequenos e coloca os pesados em uma fila
+FIFO: no máximo max_heavy_jobs ao mesmo tempo e, juntos, dentro de
+memory_budget bytes estimados. Um arquivo maior que o orçamento inteiro roda
+sozinho, em vez de nunca rodar.
+
+Configuração por variáveis de ambiente: ADMISSION_HEAVY_MB (padrão: 5),
+ADMISSION_MAX_HEAVY_JOBS (padrão: 2) e ADMISSION_MEMORY_BUDGET_MB (padrão: 1024).
+"""
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+from processing import CHUNKED_PROCESSING_BYTES
+
+MB = 1024 * 1024
+
+# Memória estimada por byte de upload: no caminho em memória o processo do app
+# guarda a cópia enviada ao pool e o pickle dela, e o filho o arquivo e o
+# resultado; arquivos grandes vão ao filho por um arquivo temporário (mmap)
+IN_MEMORY_COST_FACTOR = 4
+SPILLED_COST_FACTOR = 2
+
+
+def estimate_cost(size: int) -> int:
+    """Memória estimada (bytes) para processar um upload de size bytes"""
+    factor = SPILLED_COST_FACTOR if size >= CHUNKED_PROCESSING_BYTES else IN_MEMORY_COST_FACTOR
+    return size * factor
+
+
+class _Ticket:
+    """Pedido na fila (comparado por identidade)"""
+    __slots__ = ('cost',)
+
+    def __init__(self, cost: int):
+        self.cost = cost
+
+
+class AdmissionController:
+    """Fila FIFO com limite de jobs pesados simultâneos e de memória estimada"""
+
+    def __init__(self, max_heavy_jobs: int = None, memory_budget: int = None, heavy_bytes: int = None, poll_interval: float = 0.5):
+        self.max_heavy_jobs = max_heavy_jobs or int(os.environ.get('ADMISSION_MAX_HEAVY_JOBS', 2))
+        self.memory_budget = memory_budget or int(os.environ.get('ADMISSION_MEMORY_BUDGET_MB', 1024)) * MB
+        self.heavy_bytes = heavy_bytes if heavy_bytes is not None else int(float(os.environ.get('ADMISSION_HEAVY_MB', 5)) * MB)
+        self.poll_interval = poll_interval
+        self._condition = threading.Condition()
+        self._waiting = deque()
+        self._running = 0
+        self._running_cost = 0
+
+    def _can_start(self, ticket: _Ticket) -> bool:
+        if self._waiting[0] is not ticket:
+            return False
+        if self._running == 0:
+            return True
+        return self._running < self.max_heavy_jobs and self._running_cost + ticket.cost <= self.memory_budget
+
+    @contextmanager
+    def admit(self, size: int, on_wait: Callable[[int], None] = None):
+        """Espera a vez de um upload de size bytes e o mantém admitido dentro do bloco
+
+        on_wait(posição na fila, começando em 1) é chamado na thread de quem
+        espera sempre que a posição muda. Exceções durante a espera (o
+        Streamlit interrompe o script em um rerun) retiram o pedido da fila.
+        """
+        if size < self.heavy_bytes:
+            yield
+            return
+
+        ticket = _Ticket(estimate_cost(size))
+        shown = None
+        with self._condition:
+            self._waiting.append(ticket)
+        try:
+            while True:
+                with self._condition:
+                    if self._can_start(ticket):
+                        self._waiting.popleft()
+                        self._running += 1
+                        self._running_cost += ticket.cost
+                        break
+                    position = self._waiting.index(ticket) + 1
+                if on_wait is not None and position != shown:
+                    on_wait(position)
+                    shown = position
+                with self._condition:
+                    self._condition.wait(self.poll_interval)
+        except BaseException:
+            with self._condition:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                self._condition.notify_all()
+            raise
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._running -= 1
+                self._running_cost -= ticket.cost
+                self._condition.notify_all()
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                'running': self._running,
+                'waiting': len(self._waiting),
+                'running_cost': self._running_cost,
+                'memory_budget': self.memory_budget,
+            }
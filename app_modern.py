@@ -1,644 +1,623 @@
 import streamlit as st
 import pandas as pd
-import re
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack
 from typing import Dict, List, Tuple
-from collections import defaultdict
-import plotly.express as px
-import plotly.graph_objects as go
+
+from processing import (
+    DETAILS_CACHE,
+    ROW_CACHE,
+    INVALID_FORMAT_MESSAGE,
+    PAYMENT_OPTIONS,
+    InvalidFormatError,
+    peek_account,
+    process_source,
+    source_size,
+)
+from discounts import DISCOUNT_RULES
+from summary import generate_summary
+from charts import create_cost_chart
+from cost_cube import item_count, result_cube, rows_by_region
+from result_model import ProcessResult
+from profiling import NULL_PROFILER, StageProfiler
+from process_pool import ProcessingPool, upload_source
+from admission import AdmissionController
+from result_store import ResultStore, open_store, result_key, summary_variant
+from compare import ADDED, CHANGED, REMOVED, UNCHANGED, compare_results
+import telemetry
+from warmup import SAMPLE_EXPORT_PT, warm_up, warm_up_enabled
+from theme import BASE_CSS, DARK_THEME_CSS, LIGHT_THEME_CSS, LOGO_PATH, LOGO_WIDTH, PAGE_ICON_PATH, PAGE_ICON_WIDTH, scaled_png
 
 # Configuração da página
 st.set_page_config(
     page_title="AWS Cost Calculator",
-    page_icon="06 - Dati Símbolo Oficial.png",
+    page_icon=scaled_png(PAGE_ICON_PATH, PAGE_ICON_WIDTH),
     layout="wide",
     initial_sidebar_state="expanded"
 )
 
 # CSS customizado com paleta de cores personalizada
-st.markdown("""
-<style>
-    .main-header {
-        background: linear-gradient(135deg, #1b0f5d 0%, #655ccb 100%);
-        padding: 2rem;
-        border-radius: 15px;
-        margin-bottom: 2rem;
-        color: #ffffff;
-        text-align: center;
-        box-shadow: 0 8px 32px rgba(27, 15, 93, 0.3);
-    }
-    
-    .logo-container {
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        gap: 1rem;
-        margin-bottom: 1rem;
-    }
-    
-    .metric-card {
-        background: #ffffff;
-        padding: 1.5rem;
-        border-radius: 12px;
-        box-shadow: 0 4px 16px rgba(27, 15, 93, 0.1);
-        border-left: 4px solid #f59d01;
-        transition: transform 0.2s ease;
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 20px rgba(27, 15, 93, 0.15);
-    }
-    
-    .service-card {
-        background: #ffffff;
-        padding: 1.5rem;
-        border-radius: 12px;
-        margin: 1rem 0;
-        border: 1px solid #5bbed6;
-        box-shadow: 0 2px 8px rgba(91, 190, 214, 0.1);
-    }
-    
-    .upload-area {
-        border: 2px dashed #f59d01;
-        border-radius: 15px;
-        padding: 2rem;
-        text-align: center;
-        background: linear-gradient(45deg, #ffffff 0%, #f8f9ff 100%);
-        transition: all 0.3s ease;
-    }
-    
-    .upload-area:hover {
-        border-color: #655ccb;
-        background: linear-gradient(45deg, #f8f9ff 0%, #ffffff 100%);
-    }
-    
-    .success-banner {
-        background: linear-gradient(45deg, #a1dfb4 0%, #c8e6c9 100%);
-        border: 1px solid #a1dfb4;
-        color: #1b5e20;
-        padding: 1rem;
-        border-radius: 12px;
-        margin: 1rem 0;
-        box-shadow: 0 2px 8px rgba(161, 223, 180, 0.3);
-    }
-    
-    .stButton > button {
-        background: linear-gradient(45deg, #f59d01 0%, #ff9800 100%);
-        color: #ffffff;
-        border: none;
-        border-radius: 8px;
-        padding: 0.5rem 1rem;
-        font-weight: 600;
-        transition: all 0.3s ease;
-    }
-    
-    .stButton > button:hover {
-        background: linear-gradient(45deg, #e68900 0%, #f57c00 100%);
-        transform: translateY(-1px);
-        box-shadow: 0 4px 12px rgba(245, 157, 1, 0.4);
-    }
-    
-    .sidebar .stSelectbox > div > div {
-        background-color: #ffffff;
-        border: 1px solid #5bbed6;
-    }
-    
-    .sidebar .stNumberInput > div > div > input {
-        background-color: #ffffff;
-        border: 1px solid #5bbed6;
-    }
-    
-    h1, h2, h3 {
-        color: #1b0f5d;
-    }
-    
-    .main-header h1 {
-        color: #ffffff !important;
-    }
-    
-    .stMetric {
-        background: #ffffff;
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 3px solid #655ccb;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(BASE_CSS, unsafe_allow_html=True)
 
-def extract_instance_details(config_text: str, service: str) -> Dict:
-    """Extrai detalhes das instâncias do texto de configuração"""
-    details = {'quantidade': 1, 'tipo': 'N/A', 'specs': []}
-    
-    if "EC2" in service:
-        instance_match = re.search(r'Instância do EC2 avançada \(([^)]+)\)|Advance EC2 instance \(([^)]+)\)', config_text)
-        if instance_match:
-            details['tipo'] = instance_match.group(1) or instance_match.group(2)
-        
-        qty_match = re.search(r'Número de instâncias: (\d+)|Number of instances: (\d+)', config_text)
-        if qty_match:
-            details['quantidade'] = int(qty_match.group(1) or qty_match.group(2))
-        
-        pricing_match = re.search(r'Pricing strategy \(([^)]+)\)', config_text)
-        pricing_strategy = pricing_match.group(1) if pricing_match else 'N/A'
-        
-        os_match = re.search(r'Sistema operacional \(([^)]+)\)|Operating system \(([^)]+)\)', config_text)
-        os_system = (os_match.group(1) or os_match.group(2)) if os_match else 'N/A'
-        
-        details['specs'] = [pricing_strategy, os_system]
+@st.cache_resource(show_spinner=False)
+def get_processing_pool() -> ProcessingPool:
+    """Pool de processos do parse e do cálculo, compartilhado por todas as sessões"""
+    return ProcessingPool()
+
+@st.cache_resource(show_spinner=False)
+def get_admission_controller() -> AdmissionController:
+    """Fila dos uploads pesados, compartilhada por todas as sessões"""
+    return AdmissionController()
+
+@st.cache_resource(show_spinner=False)
+def get_result_store() -> ResultStore:
+    """Resultados persistidos em disco (None se desligado ou se o arquivo não abrir)"""
+    try:
+        return open_store()
+    except (sqlite3.Error, OSError):
+        return None
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up() -> Dict:
+    """Aquece parser, regex, Plotly e imagens em segundo plano, uma vez por processo
     
-    elif "RDS" in service or "Aurora" in service:
-        instance_match = re.search(r'Tipo de instância \(([^)]+)\)|Instance type \(([^)]+)\)', config_text)
-        if instance_match:
-            details['tipo'] = instance_match.group(1) or instance_match.group(2)
-        
-        nodes_match = re.search(r'Nós \((\d+)\)|Nodes \((\d+)\)', config_text)
-        if nodes_match:
-            details['quantidade'] = int(nodes_match.group(1) or nodes_match.group(2))
-        
-        az_config = 'Single AZ'
-        if 'Multi' in config_text or 'multi' in config_text:
-            az_config = 'Multi AZ'
-        
-        purchase_option = 'Reserved Instance'
-        if 'OnDemand' in config_text:
-            purchase_option = 'On Demand'
-        elif 'No Upfront' in config_text:
-            purchase_option = 'No Upfront'
-        elif 'All Upfront' in config_text:
-            purchase_option = 'All Upfront'
-        
-        period = '1 ano'
-        if '3 year' in config_text.lower() or '3-year' in config_text.lower():
-            period = '3 anos'
-        
-        engine_type = service
-        details['specs'] = [az_config, purchase_option, period, engine_type]
+    Roda ao fim da primeira execução do script após o deploy, em uma thread,
+    enquanto o primeiro usuário ainda escolhe o arquivo; a importação do app e a
+    primeira renderização não esperam pelo Plotly nem pelo pool.
+    """
+    state = {'timings': None, 'error': None}
     
-    elif "ElastiCache" in service:
-        instance_types = re.findall(r'Tipo de instância \(([^)]+)\)|Instance type \(([^)]+)\)', config_text)
-        nodes_counts = re.findall(r'Nós \((\d+)\)|Nodes \((\d+)\)', config_text)
-        
-        instance_types = [match[0] or match[1] for match in instance_types]
-        nodes_counts = [int(match[0] or match[1]) for match in nodes_counts]
-        
-        for i, instance_type in enumerate(instance_types):
-            if i < len(nodes_counts):
-                nodes = nodes_counts[i]
-                if nodes > 0 and 'r6gd.12xlarge' not in instance_type:
-                    details['tipo'] = instance_type
-                    details['quantidade'] = nodes
-                    break
-        
-        purchase_option = 'Reserved Instance'
-        if 'OnDemand' in config_text:
-            purchase_option = 'On Demand'
-        elif 'Heavy Utilization' in config_text:
-            purchase_option = 'Heavy Utilization'
-        elif 'No Upfront' in config_text:
-            purchase_option = 'No Upfront'
-        elif 'All Upfront' in config_text:
-            purchase_option = 'All Upfront'
-        
-        period = '1 ano'
-        if '3 year' in config_text.lower() or '3-year' in config_text.lower():
-            period = '3 anos'
-        
-        cache_engine = 'Redis'
-        if 'Valkey' in config_text:
-            cache_engine = 'Valkey'
-        elif 'Memcached' in config_text:
-            cache_engine = 'Memcached'
-        
-        details['specs'] = [purchase_option, period, cache_engine]
+    def run():
+        try:
+            state['timings'] = warm_up()
+        except Exception as e:
+            state['error'] = e
     
-    elif "AWS Fargate" in service or "Fargate" in service:
-        architecture = 'x86'
-        if 'ARM' in config_text:
-            architecture = 'ARM'
-        
-        os_system = 'Linux'
-        if 'Windows' in config_text:
-            os_system = 'Windows'
-        
-        details['specs'] = [architecture, os_system]
+    state['thread'] = threading.Thread(target=run, name='warm-up', daemon=True)
+    state['thread'].start()
     
-    return details
+    # Os processos do pool sobem e importam o pipeline antes do primeiro upload
+    get_processing_pool().prestart(SAMPLE_EXPORT_PT)
+    return state
+
+# Hashes de upload guardados por sessão (o modo comparação usa dois arquivos)
+UPLOAD_DIGESTS_PER_SESSION = 8
+
+def upload_digest(uploaded_file) -> str:
+    """SHA-256 do conteúdo do upload, calculado uma única vez por arquivo na sessão"""
+    digests = st.session_state.setdefault('upload_digests', {})
+    digest = digests.get(uploaded_file.file_id)
+    if digest is not None:
+        return digest
+    
+    with uploaded_file.getbuffer() as buffer:
+        digest = hashlib.sha256(buffer).hexdigest()
+    if len(digests) >= UPLOAD_DIGESTS_PER_SESSION:
+        digests.pop(next(iter(digests)))
+    digests[uploaded_file.file_id] = digest
+    return digest
+
+def run_pipeline(uploaded_file, lambda_payment_option: str, fargate_payment_option: str, profiler=None) -> ProcessResult:
+    """Carrega, valida e processa o upload (levanta InvalidFormatError se o formato for inválido)"""
+    profiler = profiler or NULL_PROFILER
+    # Arquivos grandes são carregados e processados em blocos
+    with profiler.stage('process_source'):
+        data = process_source(uploaded_file, lambda_payment_option, fargate_payment_option, profiler)
+    
+    with profiler.stage('ProcessResult.from_dict'):
+        return ProcessResult.from_dict(data)
+
+def run_each(uploaded_files: List, lambda_payment_option: str, fargate_payment_option: str, profiler=None) -> Tuple[List[ProcessResult], List[Exception]]:
+    """run_pipeline de cada arquivo na thread do script, com o erro de cada um (None se deu certo)"""
+    results, errors = [], []
+    for uploaded_file in uploaded_files:
+        try:
+            results.append(run_pipeline(uploaded_file, lambda_payment_option, fargate_payment_option, profiler))
+            errors.append(None)
+        except Exception as e:
+            results.append(None)
+            errors.append(e)
+    return results, errors
+
+def run_in_pool(uploaded_files: List, lambda_payment_option: str, fargate_payment_option: str, profiler=None) -> Tuple[List[ProcessResult], List[Exception]]:
+    """run_pipeline de cada arquivo em processos do pool, em paralelo, com uma barra de progresso
+    
+    Devolve os resultados e os erros de cada arquivo: um arquivo que falha
+    (formato inválido, CSV ilegível, seção ausente) tem resultado None e o
+    erro ao lado, sem interromper os outros do lote. Os arquivos do
+    lote passam juntos pela fila de admissão, como um único job do tamanho
+    somado, e a barra mostra a posição de quem espera. A barra é criada e
+    apagada aqui dentro: load_and_process (cache_data) repete nos acertos do
+    cache os elementos criados durante a execução e só consegue repetir os
+    que nasceram dentro da função. Se o pool quebrar (um processo filho morto
+    por falta de memória, por exemplo), ele é encerrado, recriado na próxima
+    chamada e os arquivos são processados na thread do script.
+    """
+    profiler = profiler or NULL_PROFILER
+    label = "Processando arquivo" if len(uploaded_files) == 1 else f"Processando {len(uploaded_files)} arquivos"
+    progress_bar = st.progress(0.0, text=f"{label}... 0%")
+    
+    def show_queue_position(position: int):
+        progress_bar.progress(0.0, text=f"⏳ Aguardando a vez: posição {position} na fila de arquivos grandes")
+    
+    try:
+        profiler.begin('Fila de admissão')
+        with get_admission_controller().admit(sum(source_size(f) for f in uploaded_files), show_queue_position):
+            profiler.end()
+            progress_bar.progress(0.0, text=f"{label}... 0%")
+            
+            pool = get_processing_pool()
+            try:
+                with profiler.stage('process_source'), ExitStack() as sources:
+                    # A conta do arquivo leva revisões da mesma estimativa ao processo com as linhas no ROW_CACHE
+                    jobs = [
+                        pool.submit(
+                            sources.enter_context(upload_source(uploaded_file)),
+                            lambda_payment_option,
+                            fargate_payment_option,
+                            profiler.trace_memory,
+                            affinity=peek_account(uploaded_file)
+                        )
+                        for uploaded_file in uploaded_files
+                    ]
+                    shown = 0
+                    pending = jobs
+                    while pending:
+                        pending[0].wait(0.1)
+                        pending = [job for job in pending if not job.done()]
+                        percent = int(sum(job.progress for job in jobs) / len(jobs) * 100)
+                        if percent != shown:
+                            progress_bar.progress(percent / 100, text=f"{label}... {percent}%")
+                            shown = percent
+                    
+                    results, errors = [], []
+                    for job in jobs:
+                        try:
+                            result, stages, counters = job.result()
+                        except BrokenProcessPool:
+                            raise
+                        except Exception as e:
+                            results.append(None)
+                            errors.append(e)
+                            continue
+                        profiler.merge(stages)
+                        for name, amount in counters.items():
+                            profiler.count(name, amount)
+                        results.append(result)
+                        errors.append(None)
+            except BrokenProcessPool:
+                # Os outros processos e a thread de progresso do pool quebrado também são encerrados
+                pool.shutdown(wait=False, cancel_futures=True)
+                if get_processing_pool() is pool:
+                    get_processing_pool.clear()
+                return run_each(uploaded_files, lambda_payment_option, fargate_payment_option, profiler)
+    finally:
+        progress_bar.empty()
+    return results, errors
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_and_process(file_digests: Tuple[str, ...], _uploaded_files, lambda_payment_option: str, fargate_payment_option: str, rules_version: str, _profiler=None) -> Tuple[List[ProcessResult], List[Exception]]:
+    """run_in_pool cacheado pelos hashes dos conteúdos e pelas opções que alteram o resultado
+    
+    Câmbio, imposto e tema não entram na chave. Em acertos do cache as etapas
+    internas não rodam e não aparecem no profiler. Abaixo deste cache, que é
+    por processo, fica o ResultStore em disco, consultado arquivo a arquivo:
+    só vão ao pool os que nunca foram processados (antes de um restart, por
+    outra réplica ou em outro lote).
+    """
+    profiler = _profiler or NULL_PROFILER
+    store = get_result_store()
+    keys = [result_key(file_digest, lambda_payment_option, fargate_payment_option, rules_version) for file_digest in file_digests]
+    results = [None] * len(keys)
+    errors = [None] * len(keys)
+    if store is not None:
+        with profiler.stage('ResultStore.get'):
+            results = [store.get(key) for key in keys]
+    
+    missing = [index for index, result in enumerate(results) if result is None]
+    if missing:
+        processed, failures = run_in_pool([_uploaded_files[index] for index in missing], lambda_payment_option, fargate_payment_option, profiler)
+        for index, result, error in zip(missing, processed, failures):
+            results[index] = result
+            errors[index] = error
+        if store is not None:
+            with profiler.stage('ResultStore.put'):
+                for index in missing:
+                    if results[index] is not None:
+                        store.put(keys[index], results[index])
+    return results, errors
+
+def summary_data(result: ProcessResult, account: str = None, profiler=None) -> Dict:
+    """Dict com os itens usado por generate_summary (de uma só conta, se account for dado)"""
+    profiler = profiler or NULL_PROFILER
+    if account is not None:
+        with profiler.stage('ProcessResult.partition'):
+            result = result.partition(account)
+    with profiler.stage('ProcessResult.to_dict'):
+        return result.to_dict()
 
-def load_csv_file(file_path_or_buffer) -> pd.DataFrame:
-    """Carrega o CSV lidando com a estrutura complexa do arquivo AWS"""
-    if hasattr(file_path_or_buffer, 'read'):
-        content = file_path_or_buffer.read().decode('utf-8-sig')
-        lines = content.split('\n')
+@st.cache_resource(show_spinner=False, max_entries=4)
+def cached_summary_data(file_digest: str, lambda_payment_option: str, fargate_payment_option: str, rules_version: str, account: str, _result: ProcessResult, _profiler=None) -> Dict:
+    """summary_data montado uma vez por arquivo, opções e conta
+    
+    Câmbio e imposto só mudam o texto do resumo, então não refazem o dict.
+    cache_resource devolve o mesmo objeto sem copiar (cache_data o
+    desserializaria a cada execução); generate_summary só lê o dict.
+    """
+    return summary_data(_result, account, _profiler)
+
+def summary_text(file_digest: str, result: ProcessResult, exchange_rate: float, tax_rate: float, lambda_payment_option: str, fargate_payment_option: str, profiler, use_store: bool = True, account: str = None) -> str:
+    """generate_summary, reaproveitando o resumo guardado no ResultStore para os mesmos parâmetros
+    
+    account identifica o resumo de uma só conta de uma exportação consolidada.
+    O dict com os itens só é montado quando o resumo não está guardado; com
+    use_store=False (captura de perfil) nenhum cache é usado.
+    """
+    store = get_result_store() if use_store else None
+    if store is not None:
+        key = result_key(file_digest, lambda_payment_option, fargate_payment_option, DISCOUNT_RULES['version'])
+        variant = summary_variant(exchange_rate, tax_rate, account)
+        with profiler.stage('ResultStore.get_summary'):
+            summary = store.get_summary(key, variant)
+        if summary is not None:
+            return summary
+    
+    if use_store:
+        data = cached_summary_data(file_digest, lambda_payment_option, fargate_payment_option, DISCOUNT_RULES['version'], account, result, profiler)
     else:
-        with open(file_path_or_buffer, 'r', encoding='utf-8-sig') as f:
-            lines = f.readlines()
-    
-    start_idx = -1
-    for i, line in enumerate(lines):
-        if 'Estimativa detalhada' in line or 'Detailed Estimate' in line:
-            start_idx = i + 1
-            break
-    
-    if start_idx == -1:
-        raise ValueError("Seção 'Estimativa detalhada' ou 'Detailed Estimate' não encontrada")
-    
-    end_idx = len(lines)
-    for i in range(start_idx + 1, len(lines)):
-        if lines[i].strip() == '' or 'Confirmação' in lines[i] or 'Acknowledgement' in lines[i]:
-            end_idx = i
-            break
-    
-    data_lines = lines[start_idx:end_idx]
-    
-    from io import StringIO
-    csv_data = '\n'.join(data_lines)
-    df = pd.read_csv(StringIO(csv_data))
-    
-    return df
+        data = summary_data(result, account, profiler)
+    with profiler.stage('generate_summary'):
+        summary = generate_summary(data, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option)
+    if store is not None:
+        with profiler.stage('ResultStore.put_summary'):
+            store.put_summary(key, variant, summary)
+    return summary
+
+def cache_snapshot() -> Tuple[Dict, Dict]:
+    """Contadores dos caches de detalhes e de linhas deste processo"""
+    return DETAILS_CACHE.info(), ROW_CACHE.info()
 
-def process_csv(df: pd.DataFrame, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS") -> Dict:
-    """Processa o DataFrame e extrai informações relevantes"""
-    result = {
-        'client_name': '',
-        'account_id': '',
-        'services_by_region': defaultdict(lambda: defaultdict(list)),
-        'regions': set(),
-        'total_costs': {'no_upfront': 0, 'all_upfront': 0}
+def emit_telemetry(source: str, uploaded_files: List, file_digests: List[str], results: List[ProcessResult], errors: List[Exception], profiler: StageProfiler, caches_before: Tuple[Dict, Dict]):
+    """Emite um registro de telemetria por arquivo enviado nesta execução
+    
+    Tempos e acertos de cache são medidos na execução inteira: quando vários
+    arquivos são processados juntos (lote ou comparação), cada registro traz
+    os números do lote, identificado em source.
+    """
+    profiler.finish()
+    details_before, rows_before = caches_before
+    details_after, rows_after = cache_snapshot()
+    timings = profiler.timings()
+    cache_hits = {
+        'result': 'process_source' not in timings,
+        'result_store': 'ResultStore.get' in timings and 'process_source' not in timings,
+        'summary_store': 'ResultStore.get_summary' in timings and 'generate_summary' not in timings,
+        'details_hits': details_after['hits'] - details_before['hits'] + profiler.counters.get('details_hits', 0),
+        'details_misses': details_after['misses'] - details_before['misses'] + profiler.counters.get('details_misses', 0),
+        'row_hits': rows_after['hits'] - rows_before['hits'] + profiler.counters.get('row_hits', 0),
+        'row_misses': rows_after['misses'] - rows_before['misses'] + profiler.counters.get('row_misses', 0),
     }
-    
-    if not df.empty and 'Hierarquia de grupos' in df.columns:
-        first_hierarchy = df['Hierarquia de grupos'].iloc[0]
-        if ' > ' in first_hierarchy:
-            client_account = first_hierarchy.split(' > ')[0].strip()
-            
-            if ' - ' in client_account:
-                parts = client_account.split(' - ')
-                if len(parts) >= 3:
-                    result['client_name'] = ' - '.join(parts[:-1]).strip()
-                    result['account_id'] = parts[-1].strip()
-                elif len(parts) == 2:
-                    result['client_name'] = parts[0].strip()
-                    result['account_id'] = parts[1].strip()
-            elif ' ' in client_account:
-                client_parts = client_account.rsplit(' ', 1)
-                result['client_name'] = client_parts[0].strip()
-                result['account_id'] = client_parts[1].strip()
-    
-    for _, row in df.iterrows():
-        region = row['Região']
-        service = row['Serviço']
-        upfront = float(row['Pagamento adiantado']) if pd.notna(row['Pagamento adiantado']) else 0
-        monthly = float(row['Mensal']) if pd.notna(row['Mensal']) else 0
-        config = row['Resumo da configuração']
-        hierarchy = row['Hierarquia de grupos']
-        
-        result['regions'].add(region)
-        
-        payment_mode = 'No Upfront'
-        total_cost = 0
-        
-        if 'All Upfront' in hierarchy or 'ALL Upfront' in hierarchy or 'All UpFront' in hierarchy:
-            if "ElastiCache" in service and "cache.t2.micro" in config:
-                payment_mode = 'Heavy Utilization'
-            else:
-                payment_mode = 'All Upfront'
-            total_cost = upfront
-        elif 'Heavy Utilization' in config:
-            payment_mode = 'Heavy Utilization'
-            total_cost = upfront
-        elif 'No Upfront' in hierarchy or 'No UpFront' in hierarchy or 'No-UpFront' in hierarchy:
-            payment_mode = 'No Upfront'
-            total_cost = monthly
-        else:
-            payment_mode = 'No Upfront'
-            total_cost = monthly
-        
-        # Aplicar descontos específicos
-        if "CloudFront" in service:
-            payment_mode = 'No Upfront'
-            # Garantir que usa o valor mensal correto e aplica 30% de desconto
-            base_cost = monthly if monthly > 0 else upfront
-            total_cost = base_cost * 0.7  # 30% desconto
-        elif "AWS Lambda" in service or "Lambda" in service:
-            # Lambda sempre processa (mesmo On Demand)
-            payment_mode = 'All Upfront' if 'All Upfront' in lambda_payment_option else 'No Upfront'
-            is_sao_paulo = 'São Paulo' in region or 'América do Sul' in region
-            
-            if payment_mode == 'All Upfront':
-                base_cost = upfront if upfront > 0 else monthly
-            else:
-                base_cost = monthly
-            
-            if is_sao_paulo:
-                if payment_mode == 'All Upfront':
-                    total_cost = base_cost * 0.85  # 15% desconto
-                else:
-                    total_cost = base_cost * 0.90  # 10% desconto
-            else:
-                if payment_mode == 'All Upfront':
-                    total_cost = base_cost * 0.83  # 17% desconto
-                else:
-                    total_cost = base_cost * 0.88  # 12% desconto
-        elif "AWS Fargate" in service or "Fargate" in service:
-            # Fargate sempre processa (mesmo On Demand)
-            payment_mode = 'All Upfront' if 'All Upfront' in fargate_payment_option else 'No Upfront'
-            is_arm = 'ARM' in config
-            is_sao_paulo = 'São Paulo' in region or 'América do Sul' in region
-            
-            # Sempre usar o valor mensal como base para Fargate
-            base_cost = monthly
-            
-            if is_sao_paulo:
-                if payment_mode == 'All Upfront':
-                    if is_arm:
-                        total_cost = base_cost * 0.74  # 26% desconto
-                    else:
-                        total_cost = base_cost * 0.78  # 22% desconto
-                else:
-                    if is_arm:
-                        total_cost = base_cost * 0.79  # 21% desconto
-                    else:
-                        total_cost = base_cost * 0.85  # 15% desconto
-            else:
-                if payment_mode == 'All Upfront':
-                    if is_arm:
-                        total_cost = base_cost * 0.73  # 27% desconto
-                    else:
-                        total_cost = base_cost * 0.73  # 27% desconto
-                else:
-                    if is_arm:
-                        total_cost = base_cost * 0.79  # 21% desconto
-                    else:
-                        total_cost = base_cost * 0.80  # 20% desconto
-        elif "RDS" in service or "Aurora" in service:
-            # Aplicar desconto de armazenamento para RDS No Upfront
-            if payment_mode == 'No Upfront':
-                base_cost = monthly
-                # Verificar se tem especificação de armazenamento (20 GB)
-                if "Quantidade de armazenamento (20 GB)" in config:
-                    is_sao_paulo = 'São Paulo' in region or 'América do Sul' in region
-                    if is_sao_paulo:
-                        total_cost = base_cost - 4.38  # Desconto São Paulo
-                    else:
-                        total_cost = base_cost - 2.3   # Desconto outras regiões
-                else:
-                    total_cost = base_cost
-            else:
-                total_cost = upfront
-        else:
-            # Para outros serviços, usar a lógica padrão
-            if payment_mode == 'All Upfront':
-                total_cost = upfront
-            else:
-                total_cost = monthly
-        
-        # Correção especial: se upfront = 0 e monthly > 0, forçar No Upfront (exceto CloudFront, Lambda, Fargate e RDS que já têm desconto aplicado)
-        if upfront == 0 and monthly > 0 and "CloudFront" not in service and "Lambda" not in service and "AWS Fargate" not in service and "Fargate" not in service and "RDS" not in service and "Aurora" not in service:
-            payment_mode = 'No Upfront'
-            total_cost = monthly
-        
-        # Pular linhas On Demand (exceto Lambda, Fargate e CloudFront)
-        if ('On-demand' in hierarchy or 'On Demand' in hierarchy or 'On-Demand' in hierarchy):
-            # Permitir apenas Lambda, Fargate e CloudFront em On Demand
-            if ('AWS Lambda' not in service and 'Lambda' not in service and 
-                'AWS Fargate' not in service and 'Fargate' not in service and 
-                'CloudFront' not in service):
-                continue
-        
-        details = extract_instance_details(config, service)
-        
-        service_key = None
-        if "EC2" in service:
-            service_key = 'EC2'
-        elif "RDS" in service or "Aurora" in service:
-            service_key = 'RDS'
-        elif "ElastiCache" in service:
-            service_key = 'ElastiCache'
-        elif "CloudFront" in service:
-            service_key = 'CloudFront'
-        elif "AWS Lambda" in service or "Lambda" in service:
-            service_key = 'Lambda'
-        elif "AWS Fargate" in service or "Fargate" in service:
-            service_key = 'Fargate'
-        
-        if service_key:
-            result['services_by_region'][region][service_key].append({
-                'tipo': details.get('tipo', 'N/A'),
-                'quantidade': details.get('quantidade', 1),
-                'specs': details.get('specs', []),
-                'payment_mode': payment_mode,
-                'cost': total_cost,
-                'upfront': upfront,
-                'service_name': service,
-                'config': config
+    for uploaded_file, file_digest, result, error in zip(uploaded_files, file_digests, results, errors):
+        telemetry.emit(telemetry.estimate_record(
+            source,
+            file_digest,
+            uploaded_file.size,
+            data=result.overview() if result is not None else None,
+            timings=timings,
+            total_seconds=profiler.total_seconds,
+            cache_hits=cache_hits,
+            error=error,
+            file_name=uploaded_file.name
+        ))
+
+def render_performance_panel(panel, profiler: StageProfiler):
+    """Preenche o painel de Performance da sidebar com as etapas da execução"""
+    profiler.finish()
+    
+    with panel:
+        if not profiler.stages:
+            st.caption("Nenhuma etapa medida nesta execução.")
+            return
+        
+        stages_df = pd.DataFrame([
+            {
+                'Etapa': f"{'↳ ' * stage['depth']}{stage['stage']}",
+                'Tempo (ms)': round((stage['seconds'] or 0) * 1000, 1),
+                'Pico do processo (MB)': None if stage['peak_bytes'] is None else round(stage['peak_bytes'] / 1024 / 1024, 2)
+            }
+            for stage in profiler.stages
+        ])
+        st.dataframe(stages_df, use_container_width=True, hide_index=True)
+        st.caption(f"Execução completa: {profiler.total_seconds * 1000:.0f} ms")
+        if profiler.shared_peaks:
+            st.caption(
+                f"Pico de memória não medido em {profiler.shared_peaks} etapa(s): "
+                "outra sessão estava medindo memória ao mesmo tempo."
+            )
+        
+        store = get_result_store()
+        if store is not None:
+            stats = store.stats()
+            st.caption(
+                f"Resultados persistidos: {stats['entries']} ({stats['summaries']} resumos), "
+                f"{stats['bytes'] / 1024 / 1024:.1f} de {stats['max_bytes'] / 1024 / 1024:.0f} MB; "
+                f"neste processo: {stats['hits']} acertos, {stats['misses']} falhas"
+            )
+        
+        if profiler.capture:
+            st.download_button(
+                "📥 Perfil cProfile (.prof)",
+                data=profiler.cpu_profile(),
+                file_name="perfil_execucao.prof",
+                mime="application/octet-stream",
+                use_container_width=True
+            )
+            st.download_button(
+                "📥 Relatório (cProfile + tracemalloc)",
+                data=profiler.report(),
+                file_name="perfil_execucao.txt",
+                mime="text/plain",
+                use_container_width=True
+            )
+
+def upload_error_message(error: Exception) -> str:
+    """Texto exibido para um arquivo que não pôde ser processado"""
+    if isinstance(error, InvalidFormatError):
+        return INVALID_FORMAT_MESSAGE
+    return f"Erro ao processar arquivo: {error}"
+
+def process_uploads(uploaded_files: List, lambda_payment_option: str, fargate_payment_option: str, profiler: StageProfiler) -> Tuple[List[str], List[ProcessResult], List[Exception]]:
+    """Hashes, resultados e erros de vários uploads, processados em um único lote no pool
+    
+    Cada arquivo que falha é apontado na tela e tem resultado None; os
+    outros seguem normalmente.
+    """
+    with st.spinner("🔄 Processando arquivos..."):
+        with profiler.stage('Leitura do upload'):
+            file_digests = [upload_digest(uploaded_file) for uploaded_file in uploaded_files]
+        with profiler.stage('load_and_process'):
+            results, errors = load_and_process(
+                tuple(file_digests),
+                uploaded_files,
+                lambda_payment_option,
+                fargate_payment_option,
+                DISCOUNT_RULES['version'],
+                profiler
+            )
+    
+    for uploaded_file, error in zip(uploaded_files, errors):
+        if error is not None:
+            st.error(f"❌ {uploaded_file.name}: {upload_error_message(error)}")
+    return file_digests, results, errors
+
+def render_accounts(files: List[Tuple[str, str, ProcessResult]], exchange_rate: float, tax_rate: float, lambda_payment_option: str, fargate_payment_option: str, profiler: StageProfiler, use_store: bool = True):
+    """Totais por conta (com total geral) e o resumo de cada conta de (nome, hash, resultado) de arquivos
+    
+    As contas vêm das partições de cada resultado, então uma exportação
+    consolidada é separada por conta e arquivos da mesma conta são somados.
+    """
+    accounts = {}
+    entries = []
+    for file_name, file_digest, result in files:
+        partitions = result.accounts if len(result.accounts) > 1 else ()
+        for partition in partitions or (None,):
+            # Um arquivo de uma só conta usa o próprio resultado, sem particionar
+            source = partition or result
+            key = (source.account_id or file_name) if partition is None else partition.key
+            totals = dict(source.total_costs)
+            account = accounts.setdefault(key, {
+                'Cliente': source.client_name or "N/A",
+                'Conta AWS': source.account_id or "N/A",
+                'Arquivos': set(),
+                'Serviços': 0,
+                'No Upfront (USD/mês)': 0.0,
+                'All Upfront (USD)': 0.0,
             })
-            
-            # Acumular custos totais
-            if payment_mode == 'No Upfront':
-                result['total_costs']['no_upfront'] += total_cost
-            else:
-                if service_key in ['Lambda', 'Fargate']:
-                    result['total_costs']['all_upfront'] += total_cost * 12
-                else:
-                    result['total_costs']['all_upfront'] += total_cost
+            account['Arquivos'].add(file_name)
+            account['Serviços'] += item_count(source.cube())
+            account['No Upfront (USD/mês)'] += totals['no_upfront']
+            account['All Upfront (USD)'] += totals['all_upfront']
+            entries.append((file_name, file_digest, result, partition))
+    
+    st.header("💰 Totais por Conta")
+    accounts_df = pd.DataFrame(list(accounts.values()))
+    accounts_df['Arquivos'] = accounts_df['Arquivos'].map(len)
+    accounts_df.loc[len(accounts_df)] = {
+        'Cliente': "Total geral",
+        'Conta AWS': "",
+        'Arquivos': len(files),
+        'Serviços': accounts_df['Serviços'].sum(),
+        'No Upfront (USD/mês)': accounts_df['No Upfront (USD/mês)'].sum(),
+        'All Upfront (USD)': accounts_df['All Upfront (USD)'].sum(),
+    }
+    accounts_df['Mensal com imposto (BRL)'] = accounts_df['No Upfront (USD/mês)'] * exchange_rate * (1 + tax_rate / 100)
+    accounts_df['No Upfront (USD/mês)'] = accounts_df['No Upfront (USD/mês)'].map("${:,.2f}".format)
+    accounts_df['All Upfront (USD)'] = accounts_df['All Upfront (USD)'].map("${:,.2f}".format)
+    accounts_df['Mensal com imposto (BRL)'] = accounts_df['Mensal com imposto (BRL)'].map("R$ {:,.2f}".format)
+    st.dataframe(accounts_df, use_container_width=True, hide_index=True)
+    
+    # Só o resumo da conta escolhida é gerado (st.tabs montaria todos a cada execução)
+    st.header("📋 Resumo Detalhado")
+    labels = []
+    for position, (file_name, _, result, partition) in enumerate(entries, start=1):
+        source = partition or result
+        labels.append(f"{position}. {source.client_name or 'N/A'} - {source.account_id or 'N/A'} ({file_name})")
+    selected = st.radio("Conta", labels, horizontal=True)
+    file_name, file_digest, result, partition = entries[labels.index(selected)]
+    source = partition or result
+    
+    summary = summary_text(
+        file_digest, result, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, profiler,
+        use_store=use_store, account=partition.key if partition is not None else None
+    )
     
-    return result
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.text_area(
+            "Resumo Completo",
+            value=summary,
+            height=500,
+            help="Resumo formatado pronto para uso"
+        )
+    with col2:
+        st.download_button(
+            label="📥 Download",
+            data=summary,
+            file_name=f"resumo_aws_{source.client_name}_{source.account_id}.txt",
+            mime="text/plain",
+            use_container_width=True,
+            type="primary"
+        )
 
-def generate_summary(data: Dict, exchange_rate: float, tax_rate: float = 13.83, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS") -> str:
-    """Gera o resumo formatado baseado nos modelos"""
-    client_name = data['client_name']
-    account_id = data['account_id']
-    
-    summary = f"Resumos dos recursos a serem reservados\n{client_name} - {account_id}\n\n"
-    
-    # Totais por tipo de pagamento
-    total_no_upfront = 0
-    total_all_upfront = 0
-    
-    # Processar por região
-    for region in sorted(data['regions']):
-        if region not in data['services_by_region']:
-            continue
-        
-        # Mapear nome da região
-        region_name = region
-        if "N. da Virgínia" in region or "N. Virginia" in region or "Leste dos EUA" in region:
-            region_name = "N. Virginia"
-        elif "São Paulo" in region or "América do Sul" in region:
-            region_name = "São Paulo"
-        
-        summary += f"{region_name}\n"
-        
-        services = data['services_by_region'][region]
-        
-        # Processar cada serviço
-        for service_type in ['EC2', 'RDS', 'ElastiCache', 'CloudFront', 'Lambda', 'Fargate']:
-            if service_type not in services or not services[service_type]:
-                continue
-            
-            instances = services[service_type]
-            
-            # Agrupar por tipo de pagamento
-            no_upfront_instances = [i for i in instances if i['payment_mode'] == 'No Upfront']
-            all_upfront_instances = [i for i in instances if i['payment_mode'] in ['All Upfront', 'Heavy Utilization']]
-            
-            # Calcular totais
-            no_upfront_cost = sum(i['cost'] for i in no_upfront_instances)
-            all_upfront_cost = sum(i['cost'] for i in all_upfront_instances)
-            
-            total_no_upfront += no_upfront_cost
-            # Para Lambda e Fargate All Upfront, multiplicar por 12 no total geral
-            if service_type in ['Lambda', 'Fargate']:
-                total_all_upfront += all_upfront_cost * 12
-            else:
-                total_all_upfront += all_upfront_cost
-            
-            # Gerar seção do serviço
-            if service_type == 'EC2':
-                total_instances = sum(i['quantidade'] for i in instances)
-                summary += f"EC2 Instances - {total_instances:02d} instâncias - Conta AWS {account_id}\n"
-                summary += "Tipos de Instancias:\n"
-                
-                for instance in instances:
-                    pricing_strategy = instance['specs'][0] if len(instance['specs']) > 0 else 'N/A'
-                    os_system = instance['specs'][1] if len(instance['specs']) > 1 else 'N/A'
-                    summary += f"-{instance['quantidade']} - {instance['tipo']} ({pricing_strategy}, {os_system})\n"
-                
-                if no_upfront_cost > 0:
-                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
-                if all_upfront_cost > 0:
-                    summary += f"Valor total All Upfront: USD {all_upfront_cost:,.2f}/ano\n"
-            
-            elif service_type == 'RDS':
-                total_instances = sum(i['quantidade'] for i in instances)
-                summary += f"RDS - {total_instances:02d} instâncias - Conta AWS {account_id}\n"
-                summary += "Tipos de Instancias:\n"
-                
-                for instance in instances:
-                    az = instance['specs'][0] if len(instance['specs']) > 0 else 'N/A'
-                    purchase = instance['payment_mode']  # Usar payment_mode em vez de specs[1]
-                    period = instance['specs'][2] if len(instance['specs']) > 2 else 'N/A'
-                    engine = instance['specs'][3] if len(instance['specs']) > 3 else 'N/A'
-                    summary += f"-{instance['quantidade']} - {instance['tipo']} ({az}, {purchase}, {period}, {engine})\n"
-                
-                if no_upfront_cost > 0:
-                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
-                if all_upfront_cost > 0:
-                    summary += f"Valor total All Upfront: USD {all_upfront_cost:,.2f}/ano\n"
-            
-            elif service_type == 'ElastiCache':
-                total_nodes = sum(i['quantidade'] for i in instances)
-                summary += f"ElastiCache - {total_nodes:02d} nós - Conta AWS {account_id}\n"
-                summary += "Tipos de Instancias:\n"
-                
-                for instance in instances:
-                    purchase = instance['payment_mode']  # Usar payment_mode em vez de specs[0]
-                    period = instance['specs'][1] if len(instance['specs']) > 1 else 'N/A'
-                    cache_engine = instance['specs'][2] if len(instance['specs']) > 2 else 'N/A'
-                    summary += f"-{instance['quantidade']} - {instance['tipo']} ({purchase}, {period}, {cache_engine})\n"
-                
-                if no_upfront_cost > 0:
-                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
-                if all_upfront_cost > 0:
-                    summary += f"Valor total All Upfront: USD {all_upfront_cost:,.2f}/ano\n"
-            
-            elif service_type == 'CloudFront':
-                summary += f"CloudFront - Conta AWS {account_id}\n"
-                summary += "Período: 1 ano\n"
-                summary += "Forma de pagamento: No Upfront em 12x pela AWS\n"
-                summary += f"Valor total mensal: USD {no_upfront_cost:,.2f} (sem impostos)\n"
-            
-            elif service_type == 'Lambda':
-                summary += f"Lambda - Conta AWS {account_id}\n"
-                summary += f"Forma de pagamento: {lambda_payment_option}\n"
-                if no_upfront_cost > 0:
-                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
-                if all_upfront_cost > 0:
-                    summary += f"Valor total All Upfront: USD {all_upfront_cost * 12:,.2f}/ano\n"
-            
-            elif service_type == 'Fargate':
-                summary += f"ECS fargate - {region_name} - Conta AWS {account_id}\n"
-                summary += "Período: 1 ano\n"
-                summary += f"Forma de pagamento: {fargate_payment_option}\n"
-                
-                # Mostrar detalhes das configurações
-                for instance in instances:
-                    architecture = instance['specs'][0] if len(instance['specs']) > 0 else 'x86'
-                    os_system = instance['specs'][1] if len(instance['specs']) > 1 else 'Linux'
-                    summary += f"Configuração: {os_system} {architecture}\n"
-                
-                if no_upfront_cost > 0:
-                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
-                if all_upfront_cost > 0:
-                    summary += f"Valor total All Upfront: USD {all_upfront_cost * 12:,.2f}/ano\n"
-            
-            summary += "\n"
-    
-    # Resumo financeiro
-    if total_all_upfront > 0:
-        summary += "Resumo financeiro All Upfront:\n"
-        all_upfront_taxes = total_all_upfront * (tax_rate / 100)
-        all_upfront_with_taxes = total_all_upfront + all_upfront_taxes
-        all_upfront_brl = all_upfront_with_taxes * exchange_rate
-        all_upfront_parcela = all_upfront_brl / 6
-        
-        summary += f"Valor total (sem imposto): USD {total_all_upfront:,.2f}/ano\n"
-        summary += f"Impostos: USD {all_upfront_taxes:,.2f}/ano\n"
-        summary += f"Valor do dólar (aproximado): R$ {exchange_rate:.2f}\n"
-        summary += f"Valor total em reais (com imposto): R$ {all_upfront_brl:,.2f}/ano\n"
-        summary += f"Parcelamento TdSynnex(com imposto): 06x R$ {all_upfront_parcela:,.2f} via TdSynnex\n\n"
-    
-    if total_no_upfront > 0:
-        summary += "Resumo financeiro No Upfront:\n"
-        no_upfront_annual = total_no_upfront * 12
-        no_upfront_taxes = no_upfront_annual * (tax_rate / 100)
-        no_upfront_with_taxes = no_upfront_annual + no_upfront_taxes
-        no_upfront_brl_monthly = no_upfront_with_taxes * exchange_rate / 12
-        
-        summary += f"Valor total (sem imposto): USD {no_upfront_annual:,.2f}/ano\n"
-        summary += f"Impostos: USD {no_upfront_taxes:,.2f}/ano\n"
-        summary += f"Valor do dólar (aproximado): R$ {exchange_rate:.2f}\n"
-        summary += f"Valor total em reais (com imposto): 12x R$ {no_upfront_brl_monthly:,.2f} via AWS\n"
+def render_consolidated(uploaded_files: List, exchange_rate: float, tax_rate: float, lambda_payment_option: str, fargate_payment_option: str, profiler: StageProfiler) -> Tuple[List[str], List[ProcessResult], List[Exception]]:
+    """Vários arquivos: totais por conta, total geral e o resumo de cada conta
+    
+    Devolve hashes, resultados e erros dos arquivos (para a telemetria).
+    """
+    file_digests, results, errors = process_uploads(uploaded_files, lambda_payment_option, fargate_payment_option, profiler)
+    processed = [
+        (uploaded_file.name, file_digest, result)
+        for uploaded_file, file_digest, result in zip(uploaded_files, file_digests, results)
+        if result is not None
+    ]
+    if not processed:
+        return file_digests, results, errors
+    
+    profiler.begin('Renderização')
+    st.markdown(f"""
+    <div class="success-banner">
+        ✅ <strong>{len(processed)} arquivos processados com sucesso!</strong>
+    </div>
+    """, unsafe_allow_html=True)
     
-    return summary
+    totals = [dict(result.total_costs) for _, _, result in processed]
+    account_keys = {
+        partition.key if len(result.accounts) > 1 else (result.account_id or file_name)
+        for file_name, _, result in processed
+        for partition in (result.accounts if len(result.accounts) > 1 else (None,))
+    }
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🏢 Contas", len(account_keys), help="Contas AWS distintas nos arquivos enviados")
+    with col2:
+        st.metric("⚙️ Serviços", sum(item_count(result.cube()) for _, _, result in processed), help="Total de serviços configurados")
+    with col3:
+        st.metric("Mensal No Upfront (USD)", f"${sum(total['no_upfront'] for total in totals):,.2f}")
+    with col4:
+        st.metric("All Upfront (USD)", f"${sum(total['all_upfront'] for total in totals):,.2f}")
+    
+    render_accounts(processed, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, profiler)
+    profiler.end()
+    return file_digests, results, errors
 
-def create_cost_chart(data: Dict, exchange_rate: float):
-    """Cria gráfico de custos por serviço"""
-    services_costs = defaultdict(float)
-    
-    for region_services in data['services_by_region'].values():
-        for service_type, instances in region_services.items():
-            total_cost = sum(i['cost'] for i in instances)
-            services_costs[service_type] += total_cost
-    
-    if not services_costs:
-        return None
-    
-    # Paleta de cores personalizada
-    custom_colors = ['#f59d01', '#5bbed6', '#655ccb', '#a1dfb4', '#1b0f5d', '#ff9800']
-    
-    fig = px.pie(
-        values=list(services_costs.values()),
-        names=list(services_costs.keys()),
-        title="Distribuição de Custos por Serviço (USD)",
-        color_discrete_sequence=custom_colors
-    )
-    
-    fig.update_traces(
-        textposition='inside', 
-        textinfo='percent+label',
-        textfont_size=12,
-        marker=dict(line=dict(color='#ffffff', width=2))
-    )
+def render_comparison(exchange_rate: float, lambda_payment_option: str, fargate_payment_option: str, profiler: StageProfiler) -> Tuple[List, List[str], List[ProcessResult], List[Exception]]:
+    """Modo comparação: itens e custos que mudaram entre duas exportações
+    
+    Devolve os uploads com hashes, resultados e erros (para a telemetria);
+    listas vazias enquanto faltar um dos arquivos.
+    """
+    st.header("🔀 Comparar Estimativas")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        before_file = st.file_uploader(
+            "📄 Estimativa anterior",
+            type="csv",
+            key="compare_before",
+            help="Exportação usada como referência (ex.: proposta do trimestre anterior)"
+        )
+    with col2:
+        after_file = st.file_uploader(
+            "📄 Estimativa atual",
+            type="csv",
+            key="compare_after",
+            help="Exportação comparada com a anterior"
+        )
     
-    fig.update_layout(
-        height=400,
-        title_font_color='#1b0f5d',
-        title_font_size=18,
-        font=dict(color='#1b0f5d')
+    if before_file is None or after_file is None:
+        st.info("💡 Envie as duas exportações para ver os itens adicionados, removidos e alterados.")
+        return [], [], [], []
+    
+    # As duas exportações são processadas em paralelo
+    uploaded_files = [before_file, after_file]
+    file_digests, results, errors = process_uploads(uploaded_files, lambda_payment_option, fargate_payment_option, profiler)
+    if None in results:
+        return uploaded_files, file_digests, results, errors
+    
+    with profiler.stage('compare_results'):
+        diff = compare_results(*results)
+    
+    profiler.begin('Renderização')
+    before, after = results
+    if before.account_id != after.account_id:
+        st.warning(f"⚠️ As estimativas são de contas diferentes ({before.account_id or 'N/A'} e {after.account_id or 'N/A'})")
+    
+    totals = diff['totals']
+    counts = diff['counts']
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(
+            "Mensal No Upfront (USD)",
+            f"${totals['no_upfront']['after']:,.2f}",
+            delta=f"{totals['no_upfront']['delta']:+,.2f}",
+            delta_color="inverse"
+        )
+    with col2:
+        st.metric(
+            "Mensal No Upfront (BRL)",
+            f"R$ {totals['no_upfront']['after'] * exchange_rate:,.2f}",
+            delta=f"{totals['no_upfront']['delta'] * exchange_rate:+,.2f}",
+            delta_color="inverse"
+        )
+    with col3:
+        st.metric(
+            "All Upfront (USD)",
+            f"${totals['all_upfront']['after']:,.2f}",
+            delta=f"{totals['all_upfront']['delta']:+,.2f}",
+            delta_color="inverse"
+        )
+    with col4:
+        st.metric(
+            "Itens alterados",
+            counts[ADDED] + counts[REMOVED] + counts[CHANGED],
+            help="Itens casados por região, serviço, tipo e specs"
+        )
+    st.caption(
+        f"{counts[ADDED]} adicionados · {counts[REMOVED]} removidos · "
+        f"{counts[CHANGED]} alterados · {counts[UNCHANGED]} sem alteração"
     )
     
-    return fig
+    st.subheader("📊 Por Serviço e Região")
+    sections_df = pd.DataFrame(diff['sections'])
+    for column in sections_df.columns[2:-1]:
+        money = "{:+,.2f}" if column.startswith('Δ') else "${:,.2f}"
+        sections_df[column] = sections_df[column].map(money.format)
+    st.dataframe(sections_df, use_container_width=True, hide_index=True)
+    
+    st.subheader("🔍 Itens")
+    if diff['items']:
+        statuses = st.multiselect("Situação", [ADDED, REMOVED, CHANGED], default=[ADDED, REMOVED, CHANGED])
+        items_df = pd.DataFrame(diff['items'])
+        
+        st.download_button(
+            label="📥 Download (CSV)",
+            data=items_df.to_csv(index=False),
+            file_name=f"comparacao_{after.account_id or 'estimativas'}.csv",
+            mime="text/csv"
+        )
+        
+        items_df = items_df[items_df['Situação'].isin(statuses)]
+        for column in ('Custo antes (USD)', 'Custo depois (USD)'):
+            items_df[column] = items_df[column].map("${:,.2f}".format)
+        items_df['Δ Custo (USD)'] = items_df['Δ Custo (USD)'].map("{:+,.2f}".format)
+        st.dataframe(items_df, use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ Nenhum item mudou entre as duas estimativas.")
+    profiler.end()
+    return uploaded_files, file_digests, results, errors
 
 def main():
     # Header principal
@@ -655,10 +634,10 @@ def main():
     with st.sidebar:
         # Logo bem no topo
         try:
-            logo = "02 - Dati Logotipo Oficial.png"
+            logo = scaled_png(LOGO_PATH, LOGO_WIDTH)
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
-                st.image(logo, width=120)
+                st.image(logo, width=LOGO_WIDTH)
         except:
             pass
         
@@ -684,127 +663,126 @@ def main():
         
         lambda_payment_option = st.selectbox(
             "🔧 Lambda",
-            ["No Upfront 12x pela AWS", "All Upfront 06x pela TdSynnex"]
+            PAYMENT_OPTIONS
         )
         
         fargate_payment_option = st.selectbox(
             "🐳 ECS Fargate",
-            ["No Upfront 12x pela AWS", "All Upfront 06x pela TdSynnex"]
+            PAYMENT_OPTIONS
         )
         
         st.markdown("---")
         
+        compare_mode = st.toggle(
+            "🔀 Comparar estimativas",
+            value=False,
+            help="Compara duas exportações (ex.: a proposta anterior e a atual) item a item"
+        )
+        
         # Tema claro/escuro
         dark_mode = st.toggle("🌙 Modo Escuro", value=False)
         
+        # Painel de performance (opcional): tempo e pico de memória por etapa
+        show_performance = st.toggle(
+            "⏱️ Performance",
+            value=False,
+            help="Mede tempo e pico de memória de cada etapa desta execução (o rastreio de memória deixa o processamento mais lento)"
+        )
+        if show_performance:
+            # O botão de captura só aparece com um único arquivo (ver abaixo)
+            capture_slot = st.container()
+            performance_panel = st.container()
+        
         if dark_mode:
-            st.markdown("""
-            <style>
-                .stApp {
-                    background-color: #1a1a1a !important;
-                    color: #ffffff !important;
-                }
-                .main-header {
-                    background: linear-gradient(135deg, #0d0825 0%, #2d1b69 100%) !important;
-                    color: #ffffff !important;
-                }
-                .metric-card {
-                    background: #2d2d2d !important;
-                    color: #ffffff !important;
-                }
-                .service-card {
-                    background: #2d2d2d !important;
-                    color: #ffffff !important;
-                    border: 1px solid #444444 !important;
-                }
-                .upload-area {
-                    background: #2d2d2d !important;
-                    border-color: #f59d01 !important;
-                    color: #ffffff !important;
-                }
-                .stSidebar {
-                    background-color: #262626 !important;
-                }
-                .stSidebar .stMarkdown {
-                    color: #ffffff !important;
-                }
-                h1, h2, h3, h4, h5, h6 {
-                    color: #ffffff !important;
-                }
-                .stMetric {
-                    background: #2d2d2d !important;
-                    color: #ffffff !important;
-                }
-                .stDataFrame {
-                    background: #2d2d2d !important;
-                }
-                .stTextArea textarea {
-                    background-color: #2d2d2d !important;
-                    color: #ffffff !important;
-                }
-            </style>
-            """, unsafe_allow_html=True)
+            st.markdown(DARK_THEME_CSS, unsafe_allow_html=True)
         else:
-            st.markdown("""
-            <style>
-                .stApp {
-                    background-color: #ffffff !important;
-                    color: #1b0f5d !important;
-                }
-                .main-header {
-                    background: linear-gradient(135deg, #1b0f5d 0%, #655ccb 100%) !important;
-                    color: #ffffff !important;
-                }
-                h1, h2, h3, h4, h5, h6 {
-                    color: #1b0f5d !important;
-                }
-            </style>
-            """, unsafe_allow_html=True)
+            st.markdown(LIGHT_THEME_CSS, unsafe_allow_html=True)
+    
+    if compare_mode:
+        profiler = StageProfiler(trace_memory=show_performance).start()
+        caches_before = cache_snapshot()
+        uploaded_files, file_digests, results, errors = render_comparison(exchange_rate, lambda_payment_option, fargate_payment_option, profiler)
+        emit_telemetry('app-compare', uploaded_files, file_digests, results, errors, profiler, caches_before)
+        if show_performance:
+            render_performance_panel(performance_panel, profiler)
+        return
     
     # Upload de arquivo
     st.header("📁 Upload do Arquivo")
     
-    uploaded_file = st.file_uploader(
-        "Selecione o arquivo CSV da Calculadora AWS",
+    uploaded_files = st.file_uploader(
+        "Selecione os arquivos CSV da Calculadora AWS",
         type="csv",
-        help="Arquivo deve ser exportado da Calculadora de Preços da AWS"
+        accept_multiple_files=True,
+        help="Arquivos exportados da Calculadora de Preços da AWS; envie um por conta para ver o consolidado"
     )
     
+    if len(uploaded_files) > 1:
+        profiler = StageProfiler(trace_memory=show_performance).start()
+        caches_before = cache_snapshot()
+        file_digests, results, errors = render_consolidated(uploaded_files, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, profiler)
+        emit_telemetry('app-multi', uploaded_files, file_digests, results, errors, profiler, caches_before)
+        if show_performance:
+            render_performance_panel(performance_panel, profiler)
+        return
+    uploaded_file = uploaded_files[0] if uploaded_files else None
+    
+    capture_run = False
+    if show_performance:
+        with capture_slot:
+            capture_run = st.button(
+                "📸 Capturar perfil (cProfile/tracemalloc)",
+                help="Reprocessa o arquivo sem cache com cProfile e tracemalloc ativos e oferece o resultado para download",
+                use_container_width=True
+            )
+    
+    # Tempos por etapa são sempre medidos (baratos) para a telemetria; memória só com o painel
+    profiler = StageProfiler(trace_memory=show_performance, capture=capture_run).start()
+    caches_before = cache_snapshot()
+    file_digest, result, data, error = None, None, None, None
+    
     if uploaded_file is not None:
         try:
             with st.spinner("🔄 Processando arquivo..."):
-                # Carregar e processar dados
-                df = load_csv_file(uploaded_file)
-                
-                # Verificar colunas
-                required_columns_pt = ['Hierarquia de grupos', 'Região', 'Serviço', 'Pagamento adiantado', 'Mensal', 'Resumo da configuração']
-                required_columns_en = ['Group hierarchy', 'Region', 'Service', 'Upfront', 'Monthly', 'Configuration summary']
+                with profiler.stage('Leitura do upload'):
+                    file_digest = upload_digest(uploaded_file)
                 
-                is_portuguese = all(col in df.columns for col in required_columns_pt)
-                is_english = all(col in df.columns for col in required_columns_en)
-                
-                if not is_portuguese and not is_english:
-                    st.error("❌ Formato de arquivo inválido. Verifique se o CSV foi exportado corretamente da Calculadora AWS.")
-                    return
-                
-                # Normalizar colunas
-                if is_english:
-                    column_mapping = {
-                        'Group hierarchy': 'Hierarquia de grupos',
-                        'Region': 'Região',
-                        'Service': 'Serviço',
-                        'Upfront': 'Pagamento adiantado',
-                        'Monthly': 'Mensal',
-                        'Configuration summary': 'Resumo da configuração'
-                    }
-                    df = df.rename(columns=column_mapping)
+                with profiler.stage('load_and_process'):
+                    if capture_run:
+                        # Captura sempre mede o processamento completo, sem cache. Roda
+                        # na thread do script com cProfile e tracemalloc, então passa
+                        # pela mesma fila de admissão dos jobs do pool
+                        queue_notice = st.empty()
+                        
+                        def show_queue_position(position: int):
+                            queue_notice.info(f"⏳ Aguardando a vez: posição {position} na fila de arquivos grandes")
+                        
+                        profiler.begin('Fila de admissão')
+                        with get_admission_controller().admit(source_size(uploaded_file), show_queue_position):
+                            profiler.end()
+                            queue_notice.empty()
+                            result = run_pipeline(uploaded_file, lambda_payment_option, fargate_payment_option, profiler)
+                    else:
+                        # Parse e normalização são reaproveitados entre reruns (câmbio, imposto, tema)
+                        [result], [error] = load_and_process(
+                            (file_digest,),
+                            [uploaded_file],
+                            lambda_payment_option,
+                            fargate_payment_option,
+                            DISCOUNT_RULES['version'],
+                            profiler
+                        )
+                        if error is not None:
+                            raise error
                 
-                # Processar dados
-                data = process_csv(df, lambda_payment_option, fargate_payment_option)
+                # Só os agregados: os itens (to_dict) são montados apenas para gerar o resumo
+                data = result.overview()
                 
                 if not data['account_id']:
                     st.warning("⚠️ Não foi possível extrair o ID da conta AWS")
             
+            profiler.begin('Renderização')
+            
             # Exibir sucesso
             st.markdown("""
             <div class="success-banner">
@@ -812,6 +790,9 @@ def main():
             </div>
             """, unsafe_allow_html=True)
             
+            # Exportação consolidada: totais e resumos separados por conta
+            multi_account = len(result.accounts) > 1
+            
             # Métricas principais
             col1, col2, col3, col4 = st.columns(4)
             
@@ -825,7 +806,7 @@ def main():
             with col2:
                 st.metric(
                     "🔢 Conta AWS", 
-                    data['account_id'] or "N/A",
+                    f"{len(result.accounts)} contas" if multi_account else data['account_id'] or "N/A",
                     help="ID da conta AWS"
                 )
             
@@ -837,7 +818,7 @@ def main():
                 )
             
             with col4:
-                total_services = sum(len(instances) for region_services in data['services_by_region'].values() for instances in region_services.values())
+                total_services = item_count(result_cube(data))
                 st.metric(
                     "⚙️ Serviços", 
                     total_services,
@@ -845,7 +826,8 @@ def main():
                 )
             
             # Gráfico de custos
-            cost_chart = create_cost_chart(data, exchange_rate)
+            with profiler.stage('create_cost_chart'):
+                cost_chart = create_cost_chart(data, exchange_rate)
             if cost_chart:
                 st.plotly_chart(cost_chart, use_container_width=True)
             
@@ -911,67 +893,90 @@ def main():
                     st.metric("6x (BRL)", f"R$ {installment_brl:,.2f}")
             
             # Resumo detalhado
-            st.header("📋 Resumo Detalhado")
-            
-            summary = generate_summary(data, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option)
-            
-            col1, col2 = st.columns([3, 1])
-            
-            with col1:
-                st.text_area(
-                    "Resumo Completo",
-                    value=summary,
-                    height=500,
-                    help="Resumo formatado pronto para uso"
-                )
-            
-            with col2:
-                st.download_button(
-                    label="📥 Download",
-                    data=summary,
-                    file_name=f"resumo_aws_{data['client_name']}_{data['account_id']}.txt",
-                    mime="text/plain",
-                    use_container_width=True,
-                    type="primary"
+            if multi_account:
+                render_accounts(
+                    [(uploaded_file.name, file_digest, result)],
+                    exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, profiler,
+                    use_store=not capture_run
                 )
+            else:
+                st.header("📋 Resumo Detalhado")
                 
-                st.button(
-                    "📋 Copiar",
-                    help="Copiar resumo para área de transferência",
-                    use_container_width=True
-                )
+                # A captura mede a geração do resumo, sem o ResultStore
+                summary = summary_text(file_digest, result, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, profiler, use_store=not capture_run)
+                
+                col1, col2 = st.columns([3, 1])
+                
+                with col1:
+                    st.text_area(
+                        "Resumo Completo",
+                        value=summary,
+                        height=500,
+                        help="Resumo formatado pronto para uso"
+                    )
+                
+                with col2:
+                    st.download_button(
+                        label="📥 Download",
+                        data=summary,
+                        file_name=f"resumo_aws_{data['client_name']}_{data['account_id']}.txt",
+                        mime="text/plain",
+                        use_container_width=True,
+                        type="primary"
+                    )
+                
+                    st.button(
+                        "📋 Copiar",
+                        help="Copiar resumo para área de transferência",
+                        use_container_width=True
+                    )
             
             # Detalhes por região (expansível)
             with st.expander("🌍 Detalhes por Região"):
+                region_rows = rows_by_region(result_cube(data))
                 for region in sorted(data['regions']):
-                    if region in data['services_by_region']:
+                    if region in region_rows:
                         st.subheader(f"📍 {region}")
                         
-                        services = data['services_by_region'][region]
+                        # Uma linha por serviço e forma de pagamento, direto do cubo de custos
+                        region_df = pd.DataFrame(region_rows[region])
+                        region_df['Custo (USD)'] = region_df['Custo (USD)'].map(lambda cost: f"${cost:,.2f}")
+                        region_df['Upfront (USD)'] = region_df['Upfront (USD)'].map(lambda upfront: f"${upfront:,.2f}")
                         
-                        for service_type, instances in services.items():
-                            if instances:
-                                st.write(f"**{service_type}**: {len(instances)} instância(s)")
-                                
-                                service_df = pd.DataFrame([
-                                    {
-                                        'Tipo': inst['tipo'],
-                                        'Quantidade': inst['quantidade'],
-                                        'Pagamento': inst['payment_mode'],
-                                        'Custo (USD)': f"${inst['cost']:.2f}"
-                                    }
-                                    for inst in instances
-                                ])
-                                
-                                st.dataframe(service_df, use_container_width=True)
+                        st.dataframe(region_df, use_container_width=True, hide_index=True)
             
             # Debug (opcional)
             with st.expander("🔍 Dados Brutos (Debug)"):
-                st.json(data)
+                # O conteúdo do expander roda mesmo fechado: o JSON completo só sob demanda
+                if st.toggle("Carregar JSON completo", help=f"{len(result.items)} itens em colunas; pode ser grande"):
+                    st.json(result.to_json())
+                else:
+                    st.json({
+                        'client_name': result.client_name,
+                        'account_id': result.account_id,
+                        'regions': list(result.regions),
+                        'total_costs': dict(result.total_costs),
+                        'rows': result.rows,
+                        'locale': result.locale,
+                        'cost_cube': [list(row) for row in result.cost_cube],
+                    })
+            
+            profiler.end()
                 
+        except InvalidFormatError as e:
+            error = e
+            st.error(f"❌ {INVALID_FORMAT_MESSAGE}")
         except Exception as e:
+            error = e
             st.error(f"❌ Erro ao processar arquivo: {str(e)}")
             st.info("💡 Verifique se o arquivo foi exportado corretamente da Calculadora AWS")
+        
+        emit_telemetry('app', [uploaded_file], [file_digest], [result], [error], profiler, caches_before)
+    
+    if show_performance:
+        render_performance_panel(performance_panel, profiler)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    if warm_up_enabled():
+        start_warm_up()
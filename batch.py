@@ -0,0 +1,283 @@
+"""Modo em lote: gera os resumos de uma pasta (ou glob) de CSVs da Calculadora AWS
+
+Não importa Streamlit nem Plotly. Os arquivos são distribuídos entre os
+núcleos com um pool de processos; um arquivo inválido é registrado no
+índice e o lote continua, assim como um arquivo que derruba o processo
+que o processava. Uma exportação consolidada (várias contas na
+Hierarquia de grupos) gera um resumo e uma linha do índice por conta.
+
+Uso:
+    python batch.py exportacoes/ --output resumos/ --exchange-rate 5.50
+    python batch.py "exportacoes/**/*.csv" --lambda-payment all-upfront
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple
+
+import telemetry
+from cost_cube import item_count
+from processing import DETAILS_CACHE, PAYMENT_OPTIONS, ROW_CACHE, process_source
+from profiling import StageProfiler
+from result_model import ProcessResult
+from summary import generate_summary
+
+# Opções de pagamento da linha de comando -> textos usados no resumo
+PAYMENT_CHOICES = {
+    'no-upfront': PAYMENT_OPTIONS[0],
+    'all-upfront': PAYMENT_OPTIONS[1],
+}
+
+INDEX_FIELDS = [
+    'arquivo', 'status', 'cliente', 'conta', 'itens', 'no_upfront_usd_mes',
+    'all_upfront_usd_ano', 'segundos', 'resumo', 'erro'
+]
+
+
+def find_csv_files(inputs: List[str]) -> List[str]:
+    """Expande pastas, globs e arquivos em uma lista ordenada e sem repetições"""
+    files = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            matches = glob.glob(os.path.join(entry, '*.csv'))
+        else:
+            matches = glob.glob(entry, recursive=True)
+        files.extend(path for path in matches if os.path.isfile(path))
+    return sorted(set(files))
+
+
+def summary_paths(files: List[str], output_dir: str) -> Dict[str, str]:
+    """Caminho do resumo de cada arquivo (nomes repetidos recebem sufixo)"""
+    paths = {}
+    used = set()
+    for path in files:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = f"{stem}.txt"
+        counter = 2
+        while name in used:
+            name = f"{stem}-{counter}.txt"
+            counter += 1
+        used.add(name)
+        paths[path] = os.path.join(output_dir, name)
+    return paths
+
+
+def account_summary_path(summary_path: str, account: str) -> str:
+    """Resumo de uma conta de exportação consolidada: <arquivo>-<conta>.txt"""
+    stem, extension = os.path.splitext(summary_path)
+    suffix = re.sub(r'[^\w.-]+', '_', account).strip('_') or 'conta'
+    return f"{stem}-{suffix}{extension}"
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 do conteúdo do arquivo (mesmo hash usado pelo app)"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def error_record(path: str, error: BaseException) -> Dict:
+    """Linha do índice de um arquivo que falhou"""
+    record = dict.fromkeys(INDEX_FIELDS, '')
+    record.update(arquivo=path, status='erro', erro=f"{type(error).__name__}: {error}")
+    return record
+
+
+def summarize_file(path: str, summary_path: str, exchange_rate: float, tax_rate: float, lambda_payment_option: str, fargate_payment_option: str) -> Tuple[List[Dict], Dict]:
+    """Processa um arquivo e grava o resumo; erros viram uma linha do índice
+
+    Exportações consolidadas geram um resumo por conta (account_summary_path).
+    Retorna as linhas do índice (uma por conta) e o registro de telemetria do
+    arquivo.
+    """
+    record = dict.fromkeys(INDEX_FIELDS, '')
+    record['arquivo'] = path
+    records = [record]
+    start = time.perf_counter()
+    profiler = StageProfiler().start()
+    details_cache_before = DETAILS_CACHE.info()
+    row_cache_before = ROW_CACHE.info()
+    content_hash, data, error = None, None, None
+
+    try:
+        with profiler.stage('Leitura do arquivo'):
+            content_hash = file_digest(path)
+        data = process_source(path, lambda_payment_option, fargate_payment_option, profiler)
+        if len(data.get('accounts', {})) > 1:
+            summaries = [
+                (partition.to_dict(), account_summary_path(summary_path, key))
+                for key, partition in ProcessResult.from_dict(data).partitions()
+            ]
+        else:
+            summaries = [(data, summary_path)]
+
+        records = []
+        for source, source_path in summaries:
+            with profiler.stage('generate_summary'):
+                summary = generate_summary(source, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option)
+            with profiler.stage('Gravação do resumo'):
+                with open(source_path, 'w', encoding='utf-8') as f:
+                    f.write(summary)
+
+            records.append(dict(
+                record,
+                status='ok',
+                cliente=source['client_name'],
+                conta=source['account_id'],
+                itens=item_count(source['cost_cube']),
+                no_upfront_usd_mes=f"{source['total_costs']['no_upfront']:.2f}",
+                all_upfront_usd_ano=f"{source['total_costs']['all_upfront']:.2f}",
+                resumo=source_path,
+            ))
+    except Exception as e:
+        error = e
+        records = [error_record(path, e)]
+
+    elapsed = f"{time.perf_counter() - start:.3f}"
+    for record in records:
+        record['segundos'] = elapsed
+    profiler.finish()
+    details_cache_after = DETAILS_CACHE.info()
+    row_cache_after = ROW_CACHE.info()
+    telemetry_record = telemetry.estimate_record(
+        'batch',
+        content_hash,
+        os.path.getsize(path) if os.path.exists(path) else None,
+        data=data,
+        timings=profiler.timings(),
+        total_seconds=profiler.total_seconds,
+        cache_hits={
+            'details_hits': details_cache_after['hits'] - details_cache_before['hits'],
+            'details_misses': details_cache_after['misses'] - details_cache_before['misses'],
+            'row_hits': row_cache_after['hits'] - row_cache_before['hits'],
+            'row_misses': row_cache_after['misses'] - row_cache_before['misses'],
+        },
+        error=error,
+        file_name=path
+    )
+    return records, telemetry_record
+
+
+def run_batch(files: List[str], output_dir: str, exchange_rate: float, tax_rate: float, lambda_payment_option: str, fargate_payment_option: str, workers: int = None) -> List[Dict]:
+    """Gera os resumos em paralelo e devolve os registros na ordem dos arquivos
+
+    Cada arquivo contribui com uma linha por conta (uma só se não for
+    consolidado ou se falhar). A telemetria é emitida pelo processo principal, que é o único a gravar no
+    arquivo JSON lines.
+
+    Se um processo do pool morrer (falta de memória, crash), todos os
+    arquivos pendentes no pool falham juntos com BrokenProcessPool. Esses
+    arquivos são reprocessados um a um, cada um em um executor novo: os
+    que não causaram a queda geram o resumo normalmente e só o que derrubar
+    o próprio processo fica como erro no índice.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = summary_paths(files, output_dir)
+    options = (exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option)
+
+    records = {}
+    if workers == 1 or len(files) <= 1:
+        for path in files:
+            records[path], telemetry_record = summarize_file(path, paths[path], *options)
+            telemetry.emit(telemetry_record)
+        return [record for path in files for record in records[path]]
+
+    broken = summarize_in_pool(files, paths, options, workers, records)
+    for path in broken:
+        summarize_in_pool([path], paths, options, 1, records)
+    return [record for path in files for record in records[path]]
+
+
+def summarize_in_pool(files: List[str], paths: Dict[str, str], options: Tuple, workers: int, records: Dict[str, List[Dict]]) -> List[str]:
+    """Resume files em um executor novo, preenchendo records
+
+    Devolve os arquivos perdidos porque o pool quebrou; com um só arquivo,
+    ele é registrado como erro (foi ele que derrubou o processo).
+    """
+    broken = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for path in files:
+            try:
+                futures[pool.submit(summarize_file, path, paths[path], *options)] = path
+            except BrokenProcessPool:
+                broken.append(path)
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                records[path], telemetry_record = future.result()
+            except BrokenProcessPool:
+                broken.append(path)
+                continue
+            telemetry.emit(telemetry_record)
+
+    if len(files) == 1 and broken:
+        path = broken.pop()
+        error = BrokenProcessPool("o processo terminou abruptamente ao processar este arquivo")
+        records[path] = [error_record(path, error)]
+        telemetry.emit(telemetry.estimate_record(
+            'batch', None, os.path.getsize(path) if os.path.exists(path) else None, error=error, file_name=path
+        ))
+    broken = set(broken)
+    return [path for path in files if path in broken]
+
+
+def write_index(records: List[Dict], output_dir: str) -> str:
+    """Grava o índice combinado (index.csv) com uma linha por arquivo e conta"""
+    index_path = os.path.join(output_dir, 'index.csv')
+    with open(index_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=INDEX_FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+    return index_path
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Gera resumos de CSVs da Calculadora AWS em lote.")
+    parser.add_argument('inputs', nargs='+', help="Pastas, arquivos ou globs de CSVs")
+    parser.add_argument('-o', '--output', default='resumos', help="Pasta de saída (padrão: resumos)")
+    parser.add_argument('--exchange-rate', type=float, default=5.50, help="Taxa USD -> BRL (padrão: 5.50)")
+    parser.add_argument('--tax-rate', type=float, default=13.83, help="Taxa de imposto em %% (padrão: 13.83)")
+    parser.add_argument('--lambda-payment', choices=PAYMENT_CHOICES, default='no-upfront', help="Forma de pagamento do Lambda")
+    parser.add_argument('--fargate-payment', choices=PAYMENT_CHOICES, default='no-upfront', help="Forma de pagamento do ECS Fargate")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="Processos em paralelo (padrão: núcleos da máquina)")
+    args = parser.parse_args(argv)
+
+    files = find_csv_files(args.inputs)
+    if not files:
+        print("Nenhum arquivo CSV encontrado.", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    records = run_batch(
+        files,
+        args.output,
+        args.exchange_rate,
+        args.tax_rate,
+        PAYMENT_CHOICES[args.lambda_payment],
+        PAYMENT_CHOICES[args.fargate_payment],
+        args.workers
+    )
+    elapsed = time.perf_counter() - start
+    index_path = write_index(records, args.output)
+
+    failed = [record for record in records if record['status'] != 'ok']
+    for record in failed:
+        print(f"❌ {record['arquivo']}: {record['erro']}", file=sys.stderr)
+
+    print(f"{len(records) - len(failed)}/{len(records)} resumos gerados em {elapsed:.2f}s "
+          f"({len(files) / elapsed:.1f} arquivos/s). Índice: {index_path}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
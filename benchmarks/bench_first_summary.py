@@ -0,0 +1,87 @@
+"""Tempo até o primeiro resumo em um processo novo, com e sem o aquecimento
+
+Cada rodada abre um processo, importa os módulos do app e mede o primeiro
+processamento + resumo + gráfico de uma exportação (a mesma em todas as
+rodadas). Com --warm o warmup.warm_up() roda antes da medição, como faz o app
+em segundo plano.
+
+Uso: python benchmarks/bench_first_summary.py [--file exportacao.csv] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from warmup import SAMPLE_EXPORT_PT  # noqa: E402
+
+# Código executado em cada processo novo; imprime os segundos até o primeiro resumo
+FIRST_SUMMARY = '''
+import sys, time
+sys.path.insert(0, {root!r})
+from processing import process_source
+from summary import generate_summary
+from charts import create_cost_chart
+if {warm!r}:
+    from warmup import warm_up
+    warm_up()
+start = time.perf_counter()
+data = process_source({path!r})
+generate_summary(data, 5.50)
+create_cost_chart(data, 5.50)
+print(time.perf_counter() - start)
+'''
+
+
+def synthetic_export(rows: int) -> bytes:
+    """Exportação a partir das linhas do exemplo embutido, com quantidades variadas"""
+    text = SAMPLE_EXPORT_PT.decode('utf-8')
+    head, body = text.split('Resumo da configuração\n', 1)
+    lines, tail = body.split('\n\n', 1)
+    lines = lines.splitlines()
+    generated = [
+        lines[index % len(lines)].replace('instâncias: 2', f'instâncias: {1 + index % 50}').replace('Nós (2)', f'Nós ({1 + index % 7})')
+        for index in range(rows)
+    ]
+    return (head + 'Resumo da configuração\n' + '\n'.join(generated) + '\n\n' + tail).encode('utf-8')
+
+
+def first_summary_seconds(path: str, warm: bool) -> float:
+    completed = subprocess.run(
+        [sys.executable, '-c', FIRST_SUMMARY.format(root=ROOT, path=path, warm=warm)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env=dict(os.environ, TELEMETRY_FILE='')
+    )
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--file', help="Exportação usada na medição (padrão: sintética com --rows linhas)")
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    path = args.file
+    if path is None:
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+            f.write(synthetic_export(args.rows))
+            path = f.name
+
+    try:
+        print(f"Arquivo: {path}")
+        print(f"{'Processo':<22}{'mediana (ms)':>14}{'mín. (ms)':>12}")
+        for label, warm in (('frio', False), ('após warm_up()', True)):
+            timings = [first_summary_seconds(path, warm) for _ in range(args.runs)]
+            print(f"{label:<22}{statistics.median(timings) * 1000:>14.1f}{min(timings) * 1000:>12.1f}")
+    finally:
+        if args.file is None:
+            os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Memória dos itens reservados: dicts por linha (formato antigo) x registros LineItem
+
+O ROW_CACHE do processamento guarda os itens das linhas entre execuções; a
+memória dele é medida e exibida à parte, para que o número dos LineItem seja
+o mesmo com o cache ligado ou desligado (ROW_CACHE_SIZE=0).
+
+Uso: python benchmarks/bench_line_items.py [--items 10000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from collections import defaultdict
+from typing import Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from processing import ROW_CACHE, compute_line_items, extract_instance_details, process_csv  # noqa: E402
+
+# Linhas modelo (serviço, configuração); cada item recebe quantidades e custos diferentes
+TEMPLATES = [
+    ('Amazon EC2', 'Número de instâncias: {n}, Instância do EC2 avançada (m5.{size}), Pricing strategy (EC2 Instance Savings Plans 1 Year No Upfront), Sistema operacional (Linux)'),
+    ('Amazon RDS for PostgreSQL', 'Nós ({n}), Tipo de instância (db.r6g.{size}), Implantação (Multi-AZ), Termo (1 year), Opção de compra (No Upfront)'),
+    ('Amazon ElastiCache', 'Nós ({n}), Tipo de instância (cache.r6g.{size}), Mecanismo (Redis), Opção (All Upfront)'),
+    ('AWS Fargate', 'Sistema operacional (Linux), Arquitetura da CPU (ARM), Tarefas ({n})'),
+]
+SIZES = ['large', 'xlarge', '2xlarge', '4xlarge']
+
+
+def build_frame(items: int) -> pd.DataFrame:
+    rows = []
+    for index in range(items):
+        service, config = TEMPLATES[index % len(TEMPLATES)]
+        rows.append({
+            'Hierarquia de grupos': 'Cliente Exemplo - 123456789012 > No Upfront',
+            'Região': 'América do Sul (São Paulo)' if index % 3 else 'Leste dos EUA (N. da Virgínia)',
+            'Serviço': service,
+            'Pagamento adiantado': 0.0,
+            'Mensal': 10.0 + index % 97,
+            # Strings novas por linha, como as que o parser de CSV produz
+            'Resumo da configuração': config.format(n=1 + index % 8, size=SIZES[index % 4]),
+        })
+    return pd.DataFrame(rows)
+
+
+def legacy_services(df: pd.DataFrame) -> dict:
+    """Estrutura antiga: um dict de oito chaves por linha, com a config copiada em cada item"""
+    services_by_region = defaultdict(lambda: defaultdict(list))
+    items = compute_line_items(df)
+    kept = items[items['keep']]
+    for region, service, config, upfront, payment_mode, service_key, cost in zip(
+        kept['region'], kept['service'], kept['config'], kept['upfront'],
+        kept['payment_mode'], kept['service_key'], kept['cost']
+    ):
+        details = extract_instance_details(config, service)
+        services_by_region[region][service_key].append({
+            'tipo': details['tipo'],
+            'quantidade': details['quantidade'],
+            'specs': list(details['specs']),
+            'payment_mode': payment_mode,
+            'cost': cost,
+            'upfront': upfront,
+            'service_name': service,
+            'config': config
+        })
+    return services_by_region
+
+
+def retained_bytes(builder, items: int) -> Tuple[int, int]:
+    """Memória que continua alocada depois de descartar o DataFrame: (resultado, ROW_CACHE)"""
+    ROW_CACHE.clear()
+    df = build_frame(items)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = builder(df)
+    del df
+    gc.collect()
+    total = tracemalloc.get_traced_memory()[0] - baseline
+    ROW_CACHE.clear()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return retained, total - retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=10000)
+    args = parser.parse_args()
+
+    legacy, _ = retained_bytes(legacy_services, args.items)
+    compact, row_cache = retained_bytes(process_csv, args.items)
+    scale = 10000 / args.items
+
+    print(f"Itens: {args.items}")
+    print(f"{'Formato':<28}{'Memória/10k itens':>20}")
+    print(f"{'dict por linha':<28}{legacy * scale / 1024 / 1024:>17.2f} MB")
+    print(f"{'LineItem (__slots__)':<28}{compact * scale / 1024 / 1024:>17.2f} MB")
+    print(f"{'ROW_CACHE (entre execuções)':<28}{max(row_cache, 0) * scale / 1024 / 1024:>17.2f} MB")
+    print(f"Redução: {(1 - compact / legacy) * 100:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
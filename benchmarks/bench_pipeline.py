@@ -0,0 +1,97 @@
+"""Escalabilidade do pipeline por tamanho de exportação (linhas/s e pico de RSS)
+
+Para cada tamanho gera uma exportação sintética (generate_export.py) e mede,
+em um processo novo, cada etapa separadamente: load_csv_file,
+normalize_columns + process_csv, generate_summary e create_cost_chart. O pico
+de RSS é o ru_maxrss do processo filho, então um tamanho não contamina o
+próximo. As etapas são chamadas diretamente, sem o desvio de process_source
+para o caminho em blocos nos arquivos grandes.
+
+Uso: python benchmarks/bench_pipeline.py [--sizes 10,1000,10000,100000,1000000] [--lang en] [--runs 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from generate_export import DEFAULT_MIX, parse_mix, write_export  # noqa: E402
+
+STAGES = ('load_csv_file', 'process_csv', 'generate_summary', 'create_cost_chart')
+
+# Código executado em cada processo novo; imprime os segundos por etapa e o pico de RSS
+MEASURE = '''
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+from charts import create_cost_chart
+from processing import load_csv_file, normalize_columns, process_csv
+from summary import generate_summary
+import plotly.express  # importação fora da medição do gráfico
+timings = {{}}
+start = time.perf_counter()
+df = load_csv_file({path!r})
+timings['load_csv_file'] = time.perf_counter() - start
+start = time.perf_counter()
+data = process_csv(normalize_columns(df))
+timings['process_csv'] = time.perf_counter() - start
+del df
+start = time.perf_counter()
+generate_summary(data, 5.50)
+timings['generate_summary'] = time.perf_counter() - start
+start = time.perf_counter()
+create_cost_chart(data, 5.50)
+timings['create_cost_chart'] = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{'timings': timings, 'rows': data['rows'], 'max_rss_kb': rss}}))
+'''
+
+
+def measure(path: str) -> dict:
+    completed = subprocess.run(
+        [sys.executable, '-c', MEASURE.format(root=ROOT, path=path)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env=dict(os.environ, TELEMETRY_FILE='')
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10,1000,10000,100000', help="Linhas por exportação, separadas por vírgula")
+    parser.add_argument('--lang', choices=('pt', 'en'), default='pt')
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument('--accounts', type=int, default=1)
+    parser.add_argument('--runs', type=int, default=3, help="Rodadas por tamanho (vale a mediana)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    mix = parse_mix(args.mix)
+
+    header = f"{'Linhas':>9}{'MB':>8}" + ''.join(f"{stage + ' (ms)':>24}" for stage in STAGES) + f"{'total linhas/s':>16}{'pico RSS (MB)':>15}"
+    print(header)
+    for rows in sizes:
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+            path = f.name
+        try:
+            write_export(path, rows, lang=args.lang, mix=mix, accounts=args.accounts)
+            results = [measure(path) for _ in range(args.runs)]
+            stages = {stage: statistics.median(result['timings'][stage] for result in results) for stage in STAGES}
+            total = sum(stages.values())
+            rss_mb = max(result['max_rss_kb'] for result in results) / 1024
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+        finally:
+            os.unlink(path)
+
+        cells = ''.join(
+            f"{stages[stage] * 1000:>11.1f} ({rows / stages[stage]:>9,.0f}/s)" for stage in STAGES
+        )
+        print(f"{rows:>9}{size_mb:>8.1f}{cells}{rows / total:>16,.0f}{rss_mb:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Tempo de inicialização do app medido com python -X importtime
+
+Cada rodada importa o módulo em um processo novo (importação a frio) e lê o
+relatório do -X importtime. Mostra o tempo total, os pacotes mais caros e se
+o Plotly Express foi carregado na inicialização. Em seguida mede, também em
+processos novos, o aquecimento que o app roda depois da primeira renderização
+(warmup.warm_up); WARM_UP=0 pula essa parte.
+
+Uso: python benchmarks/bench_startup.py [--module app_modern] [--runs 5] [--top 15]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from warmup import warm_up_enabled
+
+# "import time:  self [us] | cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+DEFERRED_MODULES = ('plotly.express',)
+
+
+def import_profile(module: str) -> List[Tuple[str, int, int, int]]:
+    """(módulo, profundidade, self µs, cumulativo µs) de uma importação a frio"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True,
+        env=dict(os.environ, TELEMETRY_FILE='')
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr[-2000:])
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, len(indent) // 2, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def warm_up_profile() -> Dict[str, float]:
+    """Segundos por etapa de warmup.warm_up() em um processo novo (após a importação)"""
+    completed = subprocess.run(
+        [sys.executable, '-c', 'import json, warmup; print(json.dumps(warmup.warm_up()))'],
+        cwd=ROOT, capture_output=True, text=True,
+        env=dict(os.environ, TELEMETRY_FILE='')
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr[-2000:])
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='app_modern')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    totals = []
+    top_level: Dict[str, List[int]] = {}
+    loaded = set()
+    for _ in range(args.runs):
+        entries = import_profile(args.module)
+        loaded.update(name for name, _, _, _ in entries)
+        totals.append(next(cumulative for name, _, _, cumulative in entries if name == args.module))
+        for name, depth, _, cumulative in entries:
+            if depth <= 1:
+                top_level.setdefault(name, []).append(cumulative)
+
+    print(f"Importação a frio de {args.module} ({args.runs} rodadas)")
+    print(f"mediana: {statistics.median(totals) / 1000:.1f} ms  (mín. {min(totals) / 1000:.1f} ms, máx. {max(totals) / 1000:.1f} ms)")
+
+    print(f"\n{'Módulo':<40}{'Cumulativo (ms)':>18}")
+    ranked = sorted(top_level.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, values in ranked[:args.top]:
+        print(f"{name:<40}{statistics.median(values) / 1000:>18.1f}")
+
+    print()
+    for module in DEFERRED_MODULES:
+        status = 'carregado na inicialização' if module in loaded else 'adiado (carregado no primeiro uso)'
+        print(f"{module}: {status}")
+
+    if not warm_up_enabled():
+        print("\nAquecimento: desligado (WARM_UP)")
+        return
+
+    stages: Dict[str, List[float]] = {}
+    for _ in range(args.runs):
+        for stage, seconds in warm_up_profile().items():
+            stages.setdefault(stage, []).append(seconds)
+    warm_totals = [sum(values) for values in zip(*stages.values())]
+
+    print(f"\nAquecimento após a primeira renderização ({args.runs} rodadas, em segundo plano)")
+    print(f"mediana: {statistics.median(warm_totals) * 1000:.1f} ms  (mín. {min(warm_totals) * 1000:.1f} ms, máx. {max(warm_totals) * 1000:.1f} ms)")
+    for stage, values in stages.items():
+        print(f"  {stage:<38}{statistics.median(values) * 1000:>18.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""Tempo do resumo: concatenação com += (implementação anterior) x junção única com modelos
+
+Uso: python benchmarks/bench_summary.py [--items 10 1000 100000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cost_cube import build_cube  # noqa: E402
+from result_model import LineItem  # noqa: E402
+from summary import generate_summary  # noqa: E402
+
+REGIONS = ['América do Sul (São Paulo)', 'Leste dos EUA (N. da Virgínia)', 'Europa (Irlanda)']
+# Serviço -> (tipo, specs) dos itens gerados
+SERVICES = {
+    'EC2': ('m5.xlarge', ('EC2 Instance Savings Plans', 'Linux')),
+    'RDS': ('db.r6g.large', ('Multi-AZ', 'No Upfront', '1 year', 'PostgreSQL')),
+    'ElastiCache': ('cache.r6g.large', ('No Upfront', '1 year', 'Redis')),
+    'CloudFront': ('Security Savings Bundle', ('CloudFront',)),
+    'Lambda': ('Compute Savings Plans', ('Lambda',)),
+    'Fargate': ('Compute Savings Plans', ('ARM', 'Linux')),
+}
+PAYMENT_MODES = ['No Upfront', 'All Upfront', 'Heavy Utilization']
+
+
+def build_data(items: int) -> Dict:
+    services_by_region = {}
+    service_keys = list(SERVICES)
+    for index in range(items):
+        region = REGIONS[index % len(REGIONS)]
+        service_key = service_keys[index // len(REGIONS) % len(service_keys)]
+        tipo, specs = SERVICES[service_key]
+        services_by_region.setdefault(region, {}).setdefault(service_key, []).append(LineItem(
+            tipo, 1 + index % 8, specs, PAYMENT_MODES[index % len(PAYMENT_MODES)],
+            10.0 + index % 97 / 7, 0.0, service_key, 0
+        ))
+    return {
+        'client_name': 'Cliente Exemplo',
+        'account_id': '123456789012',
+        'services_by_region': services_by_region,
+        'regions': set(services_by_region),
+        'total_costs': {'no_upfront': 0, 'all_upfront': 0},
+        # Como em process_csv, o cubo já vem pronto no resultado
+        'cost_cube': build_cube(services_by_region),
+        'configs': ['']
+    }
+
+
+def legacy_generate_summary(data: Dict, exchange_rate: float, tax_rate: float = 13.83, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS") -> str:
+    """Implementação anterior, com summary += a cada linha (referência do benchmark)"""
+    client_name = data['client_name']
+    account_id = data['account_id']
+
+    summary = f"Resumos dos recursos a serem reservados\n{client_name} - {account_id}\n\n"
+
+    # Totais por tipo de pagamento
+    total_no_upfront = 0
+    total_all_upfront = 0
+
+    # Processar por região
+    for region in sorted(data['regions']):
+        if region not in data['services_by_region']:
+            continue
+
+        # Mapear nome da região
+        region_name = region
+        if "N. da Virgínia" in region or "N. Virginia" in region or "Leste dos EUA" in region:
+            region_name = "N. Virginia"
+        elif "São Paulo" in region or "América do Sul" in region:
+            region_name = "São Paulo"
+
+        summary += f"{region_name}\n"
+
+        services = data['services_by_region'][region]
+
+        # Processar cada serviço
+        for service_type in ['EC2', 'RDS', 'ElastiCache', 'CloudFront', 'Lambda', 'Fargate']:
+            if service_type not in services or not services[service_type]:
+                continue
+
+            instances = services[service_type]
+
+            # Agrupar por tipo de pagamento
+            no_upfront_instances = [i for i in instances if i.payment_mode == 'No Upfront']
+            all_upfront_instances = [i for i in instances if i.payment_mode in ['All Upfront', 'Heavy Utilization']]
+
+            # Calcular totais
+            no_upfront_cost = sum(i.cost for i in no_upfront_instances)
+            all_upfront_cost = sum(i.cost for i in all_upfront_instances)
+
+            total_no_upfront += no_upfront_cost
+            # Para Lambda e Fargate All Upfront, multiplicar por 12 no total geral
+            if service_type in ['Lambda', 'Fargate']:
+                total_all_upfront += all_upfront_cost * 12
+            else:
+                total_all_upfront += all_upfront_cost
+
+            # Gerar seção do serviço
+            if service_type == 'EC2':
+                total_instances = sum(i.quantidade for i in instances)
+                summary += f"EC2 Instances - {total_instances:02d} instâncias - Conta AWS {account_id}\n"
+                summary += "Tipos de Instancias:\n"
+
+                for instance in instances:
+                    pricing_strategy = instance.specs[0] if len(instance.specs) > 0 else 'N/A'
+                    os_system = instance.specs[1] if len(instance.specs) > 1 else 'N/A'
+                    summary += f"-{instance.quantidade} - {instance.tipo} ({pricing_strategy}, {os_system})\n"
+
+                if no_upfront_cost > 0:
+                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
+                if all_upfront_cost > 0:
+                    summary += f"Valor total All Upfront: USD {all_upfront_cost:,.2f}/ano\n"
+
+            elif service_type == 'RDS':
+                total_instances = sum(i.quantidade for i in instances)
+                summary += f"RDS - {total_instances:02d} instâncias - Conta AWS {account_id}\n"
+                summary += "Tipos de Instancias:\n"
+
+                for instance in instances:
+                    az = instance.specs[0] if len(instance.specs) > 0 else 'N/A'
+                    purchase = instance.payment_mode  # Usar payment_mode em vez de specs[1]
+                    period = instance.specs[2] if len(instance.specs) > 2 else 'N/A'
+                    engine = instance.specs[3] if len(instance.specs) > 3 else 'N/A'
+                    summary += f"-{instance.quantidade} - {instance.tipo} ({az}, {purchase}, {period}, {engine})\n"
+
+                if no_upfront_cost > 0:
+                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
+                if all_upfront_cost > 0:
+                    summary += f"Valor total All Upfront: USD {all_upfront_cost:,.2f}/ano\n"
+
+            elif service_type == 'ElastiCache':
+                total_nodes = sum(i.quantidade for i in instances)
+                summary += f"ElastiCache - {total_nodes:02d} nós - Conta AWS {account_id}\n"
+                summary += "Tipos de Instancias:\n"
+
+                for instance in instances:
+                    purchase = instance.payment_mode  # Usar payment_mode em vez de specs[0]
+                    period = instance.specs[1] if len(instance.specs) > 1 else 'N/A'
+                    cache_engine = instance.specs[2] if len(instance.specs) > 2 else 'N/A'
+                    summary += f"-{instance.quantidade} - {instance.tipo} ({purchase}, {period}, {cache_engine})\n"
+
+                if no_upfront_cost > 0:
+                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
+                if all_upfront_cost > 0:
+                    summary += f"Valor total All Upfront: USD {all_upfront_cost:,.2f}/ano\n"
+
+            elif service_type == 'CloudFront':
+                summary += f"CloudFront - Conta AWS {account_id}\n"
+                summary += "Período: 1 ano\n"
+                summary += "Forma de pagamento: No Upfront em 12x pela AWS\n"
+                summary += f"Valor total mensal: USD {no_upfront_cost:,.2f} (sem impostos)\n"
+
+            elif service_type == 'Lambda':
+                summary += f"Lambda - Conta AWS {account_id}\n"
+                summary += f"Forma de pagamento: {lambda_payment_option}\n"
+                if no_upfront_cost > 0:
+                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
+                if all_upfront_cost > 0:
+                    summary += f"Valor total All Upfront: USD {all_upfront_cost * 12:,.2f}/ano\n"
+
+            elif service_type == 'Fargate':
+                summary += f"ECS fargate - {region_name} - Conta AWS {account_id}\n"
+                summary += "Período: 1 ano\n"
+                summary += f"Forma de pagamento: {fargate_payment_option}\n"
+
+                # Mostrar detalhes das configurações
+                for instance in instances:
+                    architecture = instance.specs[0] if len(instance.specs) > 0 else 'x86'
+                    os_system = instance.specs[1] if len(instance.specs) > 1 else 'Linux'
+                    summary += f"Configuração: {os_system} {architecture}\n"
+
+                if no_upfront_cost > 0:
+                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
+                if all_upfront_cost > 0:
+                    summary += f"Valor total All Upfront: USD {all_upfront_cost * 12:,.2f}/ano\n"
+
+            summary += "\n"
+
+    # Resumo financeiro
+    if total_all_upfront > 0:
+        summary += "Resumo financeiro All Upfront:\n"
+        all_upfront_taxes = total_all_upfront * (tax_rate / 100)
+        all_upfront_with_taxes = total_all_upfront + all_upfront_taxes
+        all_upfront_brl = all_upfront_with_taxes * exchange_rate
+        all_upfront_parcela = all_upfront_brl / 6
+
+        summary += f"Valor total (sem imposto): USD {total_all_upfront:,.2f}/ano\n"
+        summary += f"Impostos: USD {all_upfront_taxes:,.2f}/ano\n"
+        summary += f"Valor do dólar (aproximado): R$ {exchange_rate:.2f}\n"
+        summary += f"Valor total em reais (com imposto): R$ {all_upfront_brl:,.2f}/ano\n"
+        summary += f"Parcelamento TdSynnex(com imposto): 06x R$ {all_upfront_parcela:,.2f} via TdSynnex\n\n"
+
+    if total_no_upfront > 0:
+        summary += "Resumo financeiro No Upfront:\n"
+        no_upfront_annual = total_no_upfront * 12
+        no_upfront_taxes = no_upfront_annual * (tax_rate / 100)
+        no_upfront_with_taxes = no_upfront_annual + no_upfront_taxes
+        no_upfront_brl_monthly = no_upfront_with_taxes * exchange_rate / 12
+
+        summary += f"Valor total (sem imposto): USD {no_upfront_annual:,.2f}/ano\n"
+        summary += f"Impostos: USD {no_upfront_taxes:,.2f}/ano\n"
+        summary += f"Valor do dólar (aproximado): R$ {exchange_rate:.2f}\n"
+        summary += f"Valor total em reais (com imposto): 12x R$ {no_upfront_brl_monthly:,.2f} via AWS\n"
+
+    return summary
+
+
+def best_time(function, data: Dict, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(data, 5.5, 13.83, 'All Upfront pela AWS', 'No Upfront 12x pela AWS')
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, nargs='+', default=[10, 1000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Itens':>8}{'+= (ms)':>14}{'join (ms)':>14}{'Ganho':>10}{'Idêntico':>10}")
+    for items in args.items:
+        data = build_data(items)
+        identical = legacy_generate_summary(data, 5.5, 13.83, 'All Upfront pela AWS') == generate_summary(data, 5.5, 13.83, 'All Upfront pela AWS')
+        legacy = best_time(legacy_generate_summary, data, args.repeat)
+        current = best_time(generate_summary, data, args.repeat)
+        print(f"{items:>8}{legacy * 1000:>14.2f}{current * 1000:>14.2f}{legacy / current:>9.1f}x{'sim' if identical else 'NÃO':>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""Gerador de exportações sintéticas da Calculadora de Preços da AWS (CSV)
+
+Escreve o preâmbulo com os totais, a seção "Estimativa detalhada" / "Detailed
+Estimate" e o rodapé de confirmação, em português ou inglês. As linhas são
+geradas em streaming, então 1M de linhas não precisa caber em memória.
+
+Uso:
+    python benchmarks/generate_export.py saida.csv --rows 100000 --lang en \\
+        --mix EC2=4,RDS=2,Aurora=1,ElastiCache=1,CloudFront=1,Lambda=1,Fargate=2,Other=1 \\
+        --accounts 3 --seed 7
+"""
+import argparse
+import csv
+import random
+from typing import Dict, Iterator, List, Tuple
+
+HEADERS = {
+    'pt': ['Hierarquia de grupos', 'Região', 'Descrição', 'Serviço', 'Pagamento adiantado', 'Mensal',
+           'Primeiros 12 meses no total', 'Moeda', 'Status', 'Resumo da configuração'],
+    'en': ['Group hierarchy', 'Region', 'Description', 'Service', 'Upfront', 'Monthly',
+           'First 12 months total', 'Currency', 'Status', 'Configuration summary'],
+}
+
+REGIONS = {
+    'pt': ['América do Sul (São Paulo)', 'Leste dos EUA (N. da Virgínia)', 'Leste dos EUA (Ohio)', 'Europa (Irlanda)'],
+    'en': ['South America (Sao Paulo)', 'US East (N. Virginia)', 'US East (Ohio)', 'Europe (Ireland)'],
+}
+
+# Textos fixos do arquivo em cada idioma
+TEXTS = {
+    'pt': {
+        'title': 'Resumo da estimativa',
+        'totals_header': ['Custo adiantado', 'Custo mensal', 'Custo total de 12 meses', 'Moeda'],
+        'section': 'Estimativa detalhada',
+        'footer': 'Confirmação',
+        'disclaimer': 'A Calculadora de Preços da AWS fornece apenas uma estimativa das tarifas dos serviços da AWS.',
+        'all_upfront': 'All Upfront', 'no_upfront': 'No Upfront', 'on_demand': 'On-Demand',
+    },
+    'en': {
+        'title': 'Estimate summary',
+        'totals_header': ['Upfront cost', 'Monthly cost', 'Total 12 months cost', 'Currency'],
+        'section': 'Detailed Estimate',
+        'footer': 'Acknowledgement',
+        'disclaimer': 'AWS Pricing Calculator provides only an estimate of your AWS fees.',
+        'all_upfront': 'All Upfront', 'no_upfront': 'No Upfront', 'on_demand': 'On-Demand',
+    },
+}
+
+DEFAULT_MIX = 'EC2=4,RDS=2,Aurora=1,ElastiCache=2,CloudFront=1,Lambda=1,Fargate=2,Other=1'
+PAYMENT_WEIGHTS = {'all_upfront': 4, 'no_upfront': 5, 'on_demand': 1}
+
+EC2_TYPES = ['t3.medium', 'm5.large', 'm5.xlarge', 'm6g.2xlarge', 'c6i.4xlarge', 'r5.8xlarge']
+DB_TYPES = ['db.t3.medium', 'db.r6g.large', 'db.r6g.xlarge', 'db.m5.2xlarge']
+CACHE_TYPES = ['cache.t2.micro', 'cache.t3.medium', 'cache.r6g.large', 'cache.m6g.xlarge']
+
+
+def _ec2(r: random.Random, lang: str, payment: str) -> Tuple[str, str]:
+    plan = f"EC2 Instance Savings Plans {r.choice(['1 Year', '3 Year'])} {'All Upfront' if payment == 'all_upfront' else 'No Upfront'}"
+    os_name = r.choice(['Linux', 'Linux', 'Windows Server'])
+    if lang == 'pt':
+        config = f"Número de instâncias: {r.randint(1, 12)}, Instância do EC2 avançada ({r.choice(EC2_TYPES)}), Pricing strategy ({plan}), Sistema operacional ({os_name})"
+    else:
+        config = f"Number of instances: {r.randint(1, 12)}, Advance EC2 instance ({r.choice(EC2_TYPES)}), Pricing strategy ({plan}), Operating system ({os_name})"
+    return 'Amazon EC2', config
+
+
+def _database(service: str):
+    def generate(r: random.Random, lang: str, payment: str) -> Tuple[str, str]:
+        option = {'all_upfront': 'All Upfront', 'no_upfront': 'No Upfront', 'on_demand': 'OnDemand'}[payment]
+        deployment = r.choice(['Multi-AZ', 'Single-AZ'])
+        term = r.choice(['1 year', '3 year'])
+        storage = r.choice([20, 20, 100, 500])
+        if lang == 'pt':
+            config = f"Nós ({r.randint(1, 4)}), Tipo de instância ({r.choice(DB_TYPES)}), Implantação ({deployment}), Termo ({term}), Opção de compra ({option}), Quantidade de armazenamento ({storage} GB)"
+        else:
+            config = f"Nodes ({r.randint(1, 4)}), Instance type ({r.choice(DB_TYPES)}), Deployment option ({deployment}), Term ({term}), Purchase option ({option}), Storage amount ({storage} GB)"
+        return service, config
+    return generate
+
+
+def _elasticache(r: random.Random, lang: str, payment: str) -> Tuple[str, str]:
+    option = {'all_upfront': r.choice(['All Upfront', 'Heavy Utilization']), 'no_upfront': 'No Upfront', 'on_demand': 'OnDemand'}[payment]
+    engine = r.choice(['Redis', 'Redis', 'Valkey', 'Memcached'])
+    if lang == 'pt':
+        config = f"Nós ({r.randint(1, 6)}), Tipo de instância ({r.choice(CACHE_TYPES)}), Mecanismo ({engine}), Opção ({option})"
+    else:
+        config = f"Nodes ({r.randint(1, 6)}), Instance type ({r.choice(CACHE_TYPES)}), Engine ({engine}), Option ({option})"
+    return 'Amazon ElastiCache', config
+
+
+def _cloudfront(r: random.Random, lang: str, payment: str) -> Tuple[str, str]:
+    label = 'Transferência de dados para a internet' if lang == 'pt' else 'Data transfer out to internet'
+    return 'Amazon CloudFront', f"{label} ({r.randint(1, 50)} TB por mês)"
+
+
+def _lambda(r: random.Random, lang: str, payment: str) -> Tuple[str, str]:
+    architecture = r.choice(['x86', 'Arm'])
+    if lang == 'pt':
+        config = f"Arquitetura ({architecture}), Número de solicitações ({r.randint(1, 500)} milhões por mês), Armazenamento efêmero alocado (512 MB)"
+    else:
+        config = f"Architecture ({architecture}), Number of requests ({r.randint(1, 500)} million per month), Amount of ephemeral storage allocated (512 MB)"
+    return 'AWS Lambda', config
+
+
+def _fargate(r: random.Random, lang: str, payment: str) -> Tuple[str, str]:
+    os_name = r.choice(['Linux', 'Linux', 'Windows'])
+    architecture = r.choice(['x86', 'ARM'])
+    if lang == 'pt':
+        config = f"Sistema operacional ({os_name}), Arquitetura da CPU ({architecture}), Número médio de tarefas ({r.randint(1, 40)})"
+    else:
+        config = f"Operating system ({os_name}), CPU Architecture ({architecture}), Average number of tasks ({r.randint(1, 40)})"
+    return 'AWS Fargate', config
+
+
+def _other(r: random.Random, lang: str, payment: str) -> Tuple[str, str]:
+    label = 'Armazenamento S3 Standard' if lang == 'pt' else 'S3 Standard storage'
+    return 'Amazon Simple Storage Service (S3)', f"{label} ({r.randint(1, 100)} TB por mês)"
+
+
+GENERATORS = {
+    'EC2': _ec2,
+    'RDS': _database('Amazon RDS for PostgreSQL'),
+    'Aurora': _database('Amazon Aurora MySQL-Compatible'),
+    'ElastiCache': _elasticache,
+    'CloudFront': _cloudfront,
+    'Lambda': _lambda,
+    'Fargate': _fargate,
+    'Other': _other,
+}
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """"EC2=4,RDS=2" -> {'EC2': 4, 'RDS': 2}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in GENERATORS:
+            raise ValueError(f"Serviço desconhecido no mix: {name} (opções: {', '.join(GENERATORS)})")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def iter_rows(rows: int, lang: str = 'pt', mix: Dict[str, int] = None, regions: List[str] = None, accounts: int = 1, seed: int = 1) -> Iterator[List]:
+    """Linhas da seção detalhada, determinísticas para a mesma seed"""
+    r = random.Random(seed)
+    mix = mix or parse_mix(DEFAULT_MIX)
+    regions = regions or REGIONS[lang]
+    texts = TEXTS[lang]
+    services, weights = list(mix), list(mix.values())
+    payments, payment_weights = list(PAYMENT_WEIGHTS), list(PAYMENT_WEIGHTS.values())
+    clients = [(f"Cliente {chr(65 + i % 26)}{i // 26 or ''}", f"{100000000000 + i * 7919:012d}") for i in range(max(accounts, 1))]
+
+    for _ in range(rows):
+        client, account = r.choice(clients)
+        payment = r.choices(payments, payment_weights)[0]
+        service, config = GENERATORS[r.choices(services, weights)[0]](r, lang, payment)
+
+        if payment == 'all_upfront':
+            upfront, monthly = round(r.uniform(100, 20000), 2), r.choice([0.0, round(r.uniform(1, 50), 2)])
+        else:
+            upfront, monthly = 0.0, round(r.uniform(5, 3000), 2)
+
+        yield [
+            f"{client} - {account} > {texts[payment]}",
+            r.choice(regions),
+            '',
+            service,
+            upfront,
+            monthly,
+            round(upfront + 12 * monthly, 2),
+            'USD',
+            '',
+            config,
+        ]
+
+
+def write_export(path: str, rows: int, lang: str = 'pt', mix: Dict[str, int] = None, regions: List[str] = None, accounts: int = 1, seed: int = 1):
+    """Grava uma exportação completa (preâmbulo, seção detalhada e rodapé)"""
+    texts = TEXTS[lang]
+    options = dict(rows=rows, lang=lang, mix=mix, regions=regions, accounts=accounts, seed=seed)
+
+    # Primeira passada só para os totais do preâmbulo (as linhas são determinísticas)
+    upfront_total = monthly_total = 0.0
+    for row in iter_rows(**options):
+        upfront_total += row[4]
+        monthly_total += row[5]
+
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow([texts['title']])
+        writer.writerow(texts['totals_header'])
+        writer.writerow([round(upfront_total, 2), round(monthly_total, 2), round(upfront_total + 12 * monthly_total, 2), 'USD'])
+        f.write('\n')
+        writer.writerow([texts['section']])
+        writer.writerow(HEADERS[lang])
+        writer.writerows(iter_rows(**options))
+        f.write('\n')
+        writer.writerow([texts['footer']])
+        writer.writerow([texts['disclaimer']])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output')
+    parser.add_argument('--rows', type=int, default=1000, help="Linhas na seção detalhada (10 a 1.000.000)")
+    parser.add_argument('--lang', choices=HEADERS, default='pt')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"Pesos por serviço (padrão: {DEFAULT_MIX})")
+    parser.add_argument('--regions', help="Regiões separadas por ';' (padrão: quatro regiões do idioma)")
+    parser.add_argument('--accounts', type=int, default=1, help="Contas (clientes) distintas na hierarquia")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    write_export(
+        args.output,
+        args.rows,
+        lang=args.lang,
+        mix=parse_mix(args.mix),
+        regions=args.regions.split(';') if args.regions else None,
+        accounts=args.accounts,
+        seed=args.seed
+    )
+
+
+if __name__ == '__main__':
+    main()
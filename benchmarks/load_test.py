@@ -0,0 +1,308 @@
+"""Teste de carga: N sessões simultâneas do app_modern.py, sem rede externa e sem navegador
+
+Sobe um servidor "streamlit run" local e headless e abre N sessões pelo mesmo
+protocolo do navegador: websocket /_stcore/stream com BackMsg/ForwardMsg e
+upload por PUT em /_stcore/upload_file. Todas as sessões dividem o mesmo
+processo, com os mesmos caches, como em uma instância do App Runner.
+
+Cada sessão envia uma exportação gerada por generate_export.py e depois
+altera os campos da sidebar em rodadas. Uma interação vai do envio do rerun
+até o script_finished. O relatório mostra p50/p95/p99 por interação, a
+vazão e o crescimento do RSS do servidor por sessão (sessões abertas até o
+fim, como abas do navegador).
+
+O AppTest da versão 1.28 não serve aqui: cada execução troca o Runtime global
+e execuções simultâneas em threads interferem umas nas outras.
+
+Uso: python benchmarks/load_test.py [--sessions 8] [--rounds 3] [--rows 10000] [--same-file]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError  # noqa: E402
+from tornado.websocket import websocket_connect  # noqa: E402
+
+from streamlit.proto.BackMsg_pb2 import BackMsg  # noqa: E402
+from streamlit.proto.Common_pb2 import UploadedFileInfo  # noqa: E402
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg  # noqa: E402
+from streamlit.proto.WidgetStates_pb2 import WidgetState  # noqa: E402
+
+from generate_export import DEFAULT_MIX, parse_mix, write_export  # noqa: E402
+from processing import PAYMENT_OPTIONS  # noqa: E402
+from telemetry import percentile  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, 'app_modern.py')
+
+# Widgets usados pelo teste, localizados pelo rótulo
+WIDGET_LABELS = {
+    'exchange_rate': 'Taxa USD',
+    'tax_rate': 'Taxa de Imposto',
+    'lambda_payment': 'Lambda',
+    'fargate_payment': 'ECS Fargate',
+    'dark_mode': 'Modo Escuro',
+    'upload': 'Selecione os arquivos CSV',
+}
+WIDGET_TYPES = ('number_input', 'selectbox', 'checkbox', 'file_uploader', 'button')
+
+
+class AppSession:
+    """Uma sessão do navegador falando o protocolo do Streamlit"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.session_id = None
+        self.widget_ids: Dict[str, str] = {}
+        self.widget_states: Dict[str, WidgetState] = {}
+        self.errors: List[str] = []
+        self.latencies: Dict[str, List[float]] = {}
+        self._ws = None
+
+    async def connect(self):
+        self._ws = await websocket_connect(f"ws{self.base_url[4:]}/_stcore/stream", max_message_size=512 * 1024 * 1024)
+
+    def close(self):
+        if self._ws is not None:
+            self._ws.close()
+
+    async def _send(self, msg: BackMsg):
+        await self._ws.write_message(msg.SerializeToString(), binary=True)
+
+    async def _receive(self, until: str) -> ForwardMsg:
+        """Lê mensagens até a primeira do tipo until, registrando widgets e exceções"""
+        while True:
+            payload = await self._ws.read_message()
+            if payload is None:
+                raise ConnectionError("Conexão encerrada pelo servidor")
+            msg = ForwardMsg.FromString(payload)
+            kind = msg.WhichOneof('type')
+
+            if kind == 'new_session':
+                self.session_id = msg.new_session.initialize.session_id
+            elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type == 'exception':
+                    self.errors.append(f"{element.exception.type}: {element.exception.message}")
+                elif element_type in WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    for name, label in WIDGET_LABELS.items():
+                        if label in widget.label:
+                            self.widget_ids[name] = widget.id
+
+            if kind == until:
+                return msg
+
+    async def rerun(self, interaction: Optional[str] = None, started: float = None):
+        msg = BackMsg()
+        msg.rerun_script.widget_states.widgets.extend(self.widget_states.values())
+        start = started or time.perf_counter()
+        await self._send(msg)
+        finished = await self._receive('script_finished')
+        if finished.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+            self.errors.append(f"{interaction}: {ForwardMsg.ScriptFinishedStatus.Name(finished.script_finished)}")
+        if interaction is not None:
+            self.latencies.setdefault(interaction, []).append(time.perf_counter() - start)
+
+    def set_widget(self, name: str, **value):
+        state = WidgetState(id=self.widget_ids[name], **value)
+        self.widget_states[name] = state
+
+    async def upload(self, data: bytes, file_name: str):
+        """Pede a URL de upload, envia o arquivo por PUT e reexecuta com o arquivo no uploader"""
+        start = time.perf_counter()
+        msg = BackMsg()
+        msg.file_urls_request.request_id = uuid.uuid4().hex
+        msg.file_urls_request.file_names.append(file_name)
+        msg.file_urls_request.session_id = self.session_id
+        await self._send(msg)
+        file_urls = (await self._receive('file_urls_response')).file_urls_response.file_urls[0]
+
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{file_name}"\r\n'
+            f'Content-Type: text/csv\r\n\r\n'
+        ).encode('utf-8') + data + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        await AsyncHTTPClient().fetch(
+            self.base_url + file_urls.upload_url,
+            method='PUT',
+            body=body,
+            headers={'Content-Type': f'multipart/form-data; boundary={boundary}'},
+            request_timeout=600
+        )
+
+        state = WidgetState(id=self.widget_ids['upload'])
+        state.file_uploader_state_value.uploaded_file_info.append(
+            UploadedFileInfo(name=file_name, size=len(data), file_id=file_urls.file_id, file_urls=file_urls)
+        )
+        self.widget_states['upload'] = state
+        await self.rerun('upload', start)
+
+
+async def run_session(base_url: str, index: int, data: bytes, rounds: int) -> AppSession:
+    """Abre a página, envia o arquivo e altera a sidebar em rodadas"""
+    session = AppSession(base_url)
+    await session.connect()
+    await session.rerun('abertura')
+    await session.upload(data, f'sessao_{index}.csv')
+
+    for round_index in range(rounds):
+        option = PAYMENT_OPTIONS[(round_index + 1) % len(PAYMENT_OPTIONS)]
+        session.set_widget('exchange_rate', double_value=5.0 + round_index * 0.1 + 0.05)
+        await session.rerun('câmbio')
+        session.set_widget('tax_rate', double_value=10.0 + round_index)
+        await session.rerun('imposto')
+        session.set_widget('lambda_payment', int_value=PAYMENT_OPTIONS.index(option))
+        await session.rerun('pagamento Lambda')
+        session.set_widget('fargate_payment', int_value=PAYMENT_OPTIONS.index(option))
+        await session.rerun('pagamento Fargate')
+        session.set_widget('dark_mode', bool_value=round_index % 2 == 0)
+        await session.rerun('tema')
+
+    return session
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """VmRSS e VmHWM (pico) do processo em bytes, lidos do /proc (Linux)"""
+    memory = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'VmHWM'):
+                memory[key] = int(value.split()[0]) * 1024
+    return memory
+
+
+async def wait_until_healthy(base_url: str, server: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("O servidor Streamlit encerrou durante a inicialização")
+        try:
+            await AsyncHTTPClient().fetch(base_url + '/_stcore/health', request_timeout=2)
+            return
+        except (ConnectionError, HTTPClientError, OSError):
+            await asyncio.sleep(0.2)
+    raise TimeoutError("O servidor Streamlit não respondeu a tempo")
+
+
+async def load_test(args, uploads: List[bytes]):
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    server = subprocess.Popen(
+        [
+            sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+            '--server.headless=true',
+            f'--server.port={port}',
+            '--server.address=127.0.0.1',
+            '--server.enableXsrfProtection=false',
+            '--server.fileWatcherType=none',
+            '--browser.gatherUsageStats=false',
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # Sem telemetria nem resultados persistidos: cada rodada mede o parse, não o SQLite
+        env=dict(os.environ, TELEMETRY_FILE='', RESULT_STORE_PATH='')
+    )
+    sessions = []
+    try:
+        await wait_until_healthy(base_url, server)
+
+        # Uma sessão de aquecimento paga as importações e o warm-up do app antes da medição
+        warm = await run_session(base_url, -1, uploads[0], 0)
+        warm.close()
+        await asyncio.sleep(0.5)
+        baseline = process_memory(server.pid)
+
+        start = time.perf_counter()
+        sessions = await asyncio.gather(*(
+            run_session(base_url, index, uploads[index % len(uploads)], args.rounds)
+            for index in range(args.sessions)
+        ))
+        wall_seconds = time.perf_counter() - start
+        final = process_memory(server.pid)
+    finally:
+        for session in sessions:
+            session.close()
+        server.terminate()
+        server.wait(timeout=10)
+
+    report(args, sessions, wall_seconds, baseline, final)
+    return sessions
+
+
+def report(args, sessions: List[AppSession], wall_seconds: float, baseline: Dict[str, int], final: Dict[str, int]):
+    by_interaction: Dict[str, List[float]] = {}
+    for session in sessions:
+        for name, values in session.latencies.items():
+            by_interaction.setdefault(name, []).extend(values)
+
+    print(f"\n{'Interação':<20}{'n':>6}{'p50 (ms)':>12}{'p95 (ms)':>12}{'p99 (ms)':>12}{'máx. (ms)':>12}")
+    for name, values in by_interaction.items():
+        values.sort()
+        print(f"{name:<20}{len(values):>6}" + ''.join(
+            f"{value * 1000:>12.1f}" for value in (percentile(values, 50), percentile(values, 95), percentile(values, 99), values[-1])
+        ))
+
+    total = sum(len(values) for values in by_interaction.values())
+    print(f"\nVazão: {total / wall_seconds:.2f} interações/s ({total} em {wall_seconds:.2f} s), "
+          f"{args.sessions / wall_seconds:.2f} sessões/s")
+    print(f"RSS do servidor: {baseline['VmRSS'] / 2**20:.1f} MB -> {final['VmRSS'] / 2**20:.1f} MB "
+          f"(+{(final['VmRSS'] - baseline['VmRSS']) / 2**20 / args.sessions:.1f} MB por sessão), "
+          f"pico {final['VmHWM'] / 2**20:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=8, help="Sessões simultâneas")
+    parser.add_argument('--rounds', type=int, default=3, help="Rodadas de alterações na sidebar por sessão")
+    parser.add_argument('--rows', type=int, default=10000, help="Linhas de cada exportação gerada")
+    parser.add_argument('--lang', choices=('pt', 'en'), default='pt')
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument('--same-file', action='store_true', help="Todas as sessões enviam o mesmo arquivo (acertos de cache)")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    uploads = []
+    for index in range(1 if args.same_file else args.sessions):
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+            path = f.name
+        try:
+            write_export(path, args.rows, lang=args.lang, mix=mix, seed=index + 1)
+            with open(path, 'rb') as f:
+                uploads.append(f.read())
+        finally:
+            os.unlink(path)
+    print(f"{args.sessions} sessões, {args.rounds} rodadas, {args.rows} linhas por arquivo "
+          f"({len(uploads[0]) / (1024 * 1024):.1f} MB, {'mesmo arquivo' if args.same_file else 'arquivos distintos'})")
+
+    sessions = asyncio.run(load_test(args, uploads))
+
+    errors = [error for session in sessions for error in session.errors]
+    if errors:
+        print(f"\n{len(errors)} erros:")
+        for error in errors[:10]:
+            print(f"  {error}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List
+
+
+def content_digest(*parts: str) -> bytes:
+    """Digest curto e estável de um conjunto de textos (usado como chave de cache)"""
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(str(part).encode('utf-8', 'surrogatepass'))
+        hasher.update(b'\x00')
+    return hasher.digest()
+
+
+class LRUCache:
+    """Cache LRU limitado, seguro entre threads, com contadores de acertos e falhas"""
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 0:
+            raise ValueError("O tamanho máximo do cache não pode ser negativo")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def get_many(self, keys: Iterable[Hashable], default: Any = None) -> List[Any]:
+        """get() de várias chaves com uma única aquisição do lock"""
+        values = []
+        with self._lock:
+            data = self._data
+            for key in keys:
+                if key in data:
+                    data.move_to_end(key)
+                    self.hits += 1
+                    values.append(data[key])
+                else:
+                    self.misses += 1
+                    values.append(default)
+        return values
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            if self.maxsize == 0:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def resize(self, maxsize: int):
+        """Altera o limite, descartando as entradas mais antigas se necessário"""
+        if maxsize < 0:
+            raise ValueError("O tamanho máximo do cache não pode ser negativo")
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,40 @@
+from typing import Dict
+
+from cost_cube import result_cube, service_costs
+
+
+def create_cost_chart(data: Dict, exchange_rate: float):
+    """Cria gráfico de custos por serviço"""
+    # Plotly Express só é importado no primeiro gráfico, fora da inicialização do app
+    import plotly.express as px
+
+    services_costs = service_costs(result_cube(data))
+
+    if not services_costs:
+        return None
+
+    # Paleta de cores personalizada
+    custom_colors = ['#f59d01', '#5bbed6', '#655ccb', '#a1dfb4', '#1b0f5d', '#ff9800']
+
+    fig = px.pie(
+        values=list(services_costs.values()),
+        names=list(services_costs.keys()),
+        title="Distribuição de Custos por Serviço (USD)",
+        color_discrete_sequence=custom_colors
+    )
+
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        textfont_size=12,
+        marker=dict(line=dict(color='#ffffff', width=2))
+    )
+
+    fig.update_layout(
+        height=400,
+        title_font_color='#1b0f5d',
+        title_font_size=18,
+        font=dict(color='#1b0f5d')
+    )
+
+    return fig
@@ -0,0 +1,153 @@
+"""Comparação entre duas estimativas (ex.: a proposta do trimestre anterior e a atual)
+
+Os itens são casados por (região, service_key, tipo, specs) com um hash join:
+cada lado é agregado em um dict por chave (linhas da mesma instância somam
+custo, upfront e quantidade) e os dois dicts são comparados pelas chaves.
+Os valores por serviço e região e os totais gerais vêm só do cubo de custos
+dos dois resultados, sem gerar os resumos.
+"""
+from typing import Dict, List, Tuple
+
+from cost_cube import COST, ITEMS, QUANTITY, UPFRONT, add_item, section_totals
+from result_model import ProcessResult
+
+ADDED = 'Adicionado'
+REMOVED = 'Removido'
+CHANGED = 'Alterado'
+UNCHANGED = 'Sem alteração'
+
+# Diferenças de custo abaixo de meio centavo são arredondamento da soma, não mudança
+COST_TOLERANCE = 0.005
+
+# Lambda e Fargate All Upfront contam 12 meses nos totais (como em generate_summary)
+ANNUALIZED_SERVICES = ('Lambda', 'Fargate')
+
+
+def item_groups(result: ProcessResult) -> Dict[Tuple, List]:
+    """Itens agregados por (região, service_key, tipo, specs): [custo, upfront, quantidade, itens]"""
+    items = result.items
+    strings = items.strings
+    offsets = items.spec_offsets.tolist()
+    spec_ids = items.spec_ids.tolist()
+
+    # Agrupa pelos índices da tabela de strings (mais barato de hashear) e só
+    # depois traduz as chaves distintas para texto
+    groups = {}
+    rows = zip(
+        items.region.tolist(), items.service_key.tolist(), items.tipo.tolist(),
+        items.cost.tolist(), items.upfront.tolist(), items.quantidade.tolist(),
+        offsets, offsets[1:]
+    )
+    for region, service_key, tipo, cost, upfront, quantidade, start, end in rows:
+        add_item(groups, (region, service_key, tipo, tuple(spec_ids[start:end])), cost, upfront, quantidade)
+
+    return {
+        (strings[region], strings[service_key], strings[tipo], tuple(strings[i] for i in specs)): cell
+        for (region, service_key, tipo, specs), cell in groups.items()
+    }
+
+
+def _changed(before: List, after: List) -> bool:
+    return (
+        before[QUANTITY] != after[QUANTITY]
+        or before[ITEMS] != after[ITEMS]
+        or abs(after[COST] - before[COST]) >= COST_TOLERANCE
+        or abs(after[UPFRONT] - before[UPFRONT]) >= COST_TOLERANCE
+    )
+
+
+def _item_row(key: Tuple, status: str, before: List, after: List) -> Dict:
+    region, service_key, tipo, specs = key
+    cost_before = before[COST] if before else 0.0
+    cost_after = after[COST] if after else 0.0
+    quantity_before = before[QUANTITY] if before else 0
+    quantity_after = after[QUANTITY] if after else 0
+    return {
+        'Situação': status,
+        'Região': region,
+        'Serviço': service_key,
+        'Tipo': tipo,
+        'Specs': ' | '.join(specs),
+        'Quantidade antes': quantity_before,
+        'Quantidade depois': quantity_after,
+        'Custo antes (USD)': cost_before,
+        'Custo depois (USD)': cost_after,
+        'Δ Custo (USD)': cost_after - cost_before,
+    }
+
+
+def diff_items(before: ProcessResult, after: ProcessResult) -> Tuple[List[Dict], Dict[str, int]]:
+    """Itens adicionados, removidos e alterados (maiores diferenças primeiro) e a contagem de cada situação"""
+    old = item_groups(before)
+    new = item_groups(after)
+    rows = []
+    counts = {ADDED: 0, REMOVED: 0, CHANGED: 0, UNCHANGED: 0}
+
+    for key, cell in new.items():
+        previous = old.get(key)
+        if previous is None:
+            rows.append(_item_row(key, ADDED, None, cell))
+            counts[ADDED] += 1
+        elif _changed(previous, cell):
+            rows.append(_item_row(key, CHANGED, previous, cell))
+            counts[CHANGED] += 1
+        else:
+            counts[UNCHANGED] += 1
+    for key, cell in old.items():
+        if key not in new:
+            rows.append(_item_row(key, REMOVED, cell, None))
+            counts[REMOVED] += 1
+
+    rows.sort(key=lambda row: -abs(row['Δ Custo (USD)']))
+    return rows, counts
+
+
+def diff_sections(before: ProcessResult, after: ProcessResult) -> List[Dict]:
+    """Custos de cada serviço em cada região nas duas estimativas, a partir dos cubos
+
+    All Upfront já vem anualizado para Lambda e Fargate, como nos totais do resumo.
+    """
+    old = before.cube()
+    new = after.cube()
+    sections = sorted({key[:2] for key in old} | {key[:2] for key in new})
+
+    rows = []
+    for region, service_key in sections:
+        no_upfront_before, all_upfront_before, quantity_before = section_totals(old, region, service_key)
+        no_upfront_after, all_upfront_after, quantity_after = section_totals(new, region, service_key)
+        if service_key in ANNUALIZED_SERVICES:
+            all_upfront_before *= 12
+            all_upfront_after *= 12
+        rows.append({
+            'Região': region,
+            'Serviço': service_key,
+            'No Upfront antes (USD/mês)': no_upfront_before,
+            'No Upfront depois (USD/mês)': no_upfront_after,
+            'Δ No Upfront (USD/mês)': no_upfront_after - no_upfront_before,
+            'All Upfront antes (USD)': all_upfront_before,
+            'All Upfront depois (USD)': all_upfront_after,
+            'Δ All Upfront (USD)': all_upfront_after - all_upfront_before,
+            'Δ Quantidade': quantity_after - quantity_before,
+        })
+    return rows
+
+
+def compare_results(before: ProcessResult, after: ProcessResult) -> Dict:
+    """Diferenças entre duas estimativas: itens, serviços por região e totais
+
+    Os totais somam as linhas de diff_sections, então batem com os resumos
+    financeiros das duas estimativas sem precisar gerá-los.
+    """
+    items, counts = diff_items(before, after)
+    sections = diff_sections(before, after)
+
+    totals = {}
+    for name, before_column, after_column in (
+        ('no_upfront', 'No Upfront antes (USD/mês)', 'No Upfront depois (USD/mês)'),
+        ('all_upfront', 'All Upfront antes (USD)', 'All Upfront depois (USD)'),
+    ):
+        total_before = sum(row[before_column] for row in sections)
+        total_after = sum(row[after_column] for row in sections)
+        totals[name] = {'before': total_before, 'after': total_after, 'delta': total_after - total_before}
+
+    return {'items': items, 'counts': counts, 'sections': sections, 'totals': totals}
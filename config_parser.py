@@ -0,0 +1,104 @@
+import re
+from typing import Dict, List, Set
+
+# Pares "Chave (valor)" e "Chave: valor" do "Resumo da configuração"
+_PAIR_PATTERN = re.compile(r'(?P<key>[^,():]+?) \((?P<value>[^)]+)\)|(?P<ckey>[^,():]+?): (?P<cvalue>[^,()]+)')
+_COLON_PATTERN = re.compile(r'(?P<ckey>[^,():]+?): (?P<cvalue>[^,()]+)')
+
+# Marcadores procurados em qualquer ponto do texto (varredura única); o lookahead
+# descarta rapidamente as posições que não iniciam nenhum marcador
+_FLAG_PATTERN = re.compile(
+    r'(?=[MmOHNA3VW])(?:'
+    r'(?P<multi>Multi|multi)'
+    r'|(?P<on_demand>OnDemand)'
+    r'|(?P<heavy_utilization>Heavy Utilization)'
+    r'|(?P<no_upfront>No Upfront)'
+    r'|(?P<all_upfront>All Upfront)'
+    r'|(?P<three_year>3[ -][Yy][Ee][Aa][Rr])'
+    r'|(?P<valkey>Valkey)'
+    r'|(?P<memcached>Memcached)'
+    r'|(?P<arm>ARM)'
+    r'|(?P<windows>Windows)'
+    r')'
+)
+
+# Chaves em português e inglês mapeadas para nomes canônicos
+KEY_ALIASES = {
+    'Instância do EC2 avançada': 'ec2_instance',
+    'Advance EC2 instance': 'ec2_instance',
+    'Número de instâncias': 'instance_count',
+    'Number of instances': 'instance_count',
+    'Pricing strategy': 'pricing_strategy',
+    'Sistema operacional': 'operating_system',
+    'Operating system': 'operating_system',
+    'Tipo de instância': 'instance_type',
+    'Instance type': 'instance_type',
+    'Nós': 'nodes',
+    'Nodes': 'nodes',
+}
+
+# Aliases do mais longo para o mais curto: "Número de instâncias" antes de qualquer sufixo dele
+_ALIASES_BY_LENGTH = sorted(KEY_ALIASES.items(), key=lambda item: -len(item[0]))
+
+# Chave do texto -> chave canônica, resolvida uma vez por texto distinto
+_CANONICAL_KEYS = {}
+
+
+def canonical_key(key: str) -> str:
+    """Nome canônico de uma chave do resumo
+
+    Como as regex originais, que procuravam "Nodes (", "Instance type (" etc.
+    em qualquer ponto do texto, uma chave que termina com um alias conta como
+    ele: "Cache Nodes" é nodes e "DB Instance type" é instance_type. Chaves
+    sem alias são mantidas como aparecem no texto.
+    """
+    canonical = _CANONICAL_KEYS.get(key)
+    if canonical is None:
+        canonical = next((name for alias, name in _ALIASES_BY_LENGTH if key.endswith(alias)), key)
+        _CANONICAL_KEYS[key] = canonical
+    return canonical
+
+
+def _add_field(fields: Dict[str, List[str]], key: str, value: str):
+    fields.setdefault(canonical_key(key.strip()), []).append(value.strip())
+
+
+def tokenize_config(config_text: str) -> Dict[str, List[str]]:
+    """Converte o resumo "Chave (valor), Chave (valor)" em um mapa normalizado
+
+    Retorna {chave_canônica: [valores na ordem do texto]} (ver canonical_key).
+    """
+    fields = {}
+    if not isinstance(config_text, str):
+        return fields
+
+    for match in _PAIR_PATTERN.finditer(config_text):
+        if match.group('key') is not None:
+            value = match.group('value')
+            _add_field(fields, match.group('key'), value)
+            # Pares "Chave: valor" aninhados, ex.: "Workload (Consistent, Number of instances: 2)"
+            if ':' in value:
+                for nested in _COLON_PATTERN.finditer(value):
+                    _add_field(fields, nested.group('ckey'), nested.group('cvalue'))
+        else:
+            _add_field(fields, match.group('ckey'), match.group('cvalue'))
+
+    return fields
+
+
+def scan_flags(config_text: str) -> Set[str]:
+    """Marcadores presentes no texto (multi, on_demand, arm, windows, ...)"""
+    if not isinstance(config_text, str):
+        return set()
+    return {match.lastgroup for match in _FLAG_PATTERN.finditer(config_text)}
+
+
+def first_value(fields: Dict[str, List[str]], key: str, default: str = None) -> str:
+    """Primeiro valor de uma chave canônica"""
+    values = fields.get(key)
+    return values[0] if values else default
+
+
+def int_values(fields: Dict[str, List[str]], key: str) -> List[int]:
+    """Valores inteiros de uma chave canônica, ignorando os não numéricos"""
+    return [int(value) for value in fields.get(key, []) if value.isdecimal()]
@@ -0,0 +1,87 @@
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Cubo agregado do resultado: (região, service_key, payment_mode) -> [custo, upfront, quantidade, itens]
+# As somas são feitas item a item, na ordem das linhas, como em um único passe.
+COST, UPFRONT, QUANTITY, ITEMS = range(4)
+
+ALL_UPFRONT_MODES = ('All Upfront', 'Heavy Utilization')
+
+
+def add_item(cube: Dict, key: Tuple[str, str, str], cost: float, upfront: float, quantidade: int):
+    """Acumula um item na célula key do cubo"""
+    cell = cube.get(key)
+    if cell is None:
+        cube[key] = [cost, upfront, quantidade, 1]
+    else:
+        cell[COST] += cost
+        cell[UPFRONT] += upfront
+        cell[QUANTITY] += quantidade
+        cell[ITEMS] += 1
+
+
+def build_cube(services_by_region: Dict) -> Dict:
+    """Monta o cubo a partir dos itens (para resultados que não o trazem)"""
+    cube = {}
+    for region, services in services_by_region.items():
+        for service_key, instances in services.items():
+            for item in instances:
+                add_item(cube, (region, service_key, item.payment_mode), item.cost, item.upfront, item.quantidade)
+    return cube
+
+
+def result_cube(data: Dict) -> Dict:
+    """Cubo do resultado, montado a partir dos itens se ainda não existir"""
+    cube = data.get('cost_cube')
+    return cube if cube is not None else build_cube(data['services_by_region'])
+
+
+def section_totals(cube: Dict, region: str, service_key: str) -> Tuple[float, float, int]:
+    """(custo No Upfront, custo All Upfront, quantidade) de um serviço em uma região"""
+    no_upfront = cube.get((region, service_key, 'No Upfront'))
+    no_upfront_cost = no_upfront[COST] if no_upfront else 0
+    quantity = no_upfront[QUANTITY] if no_upfront else 0
+
+    all_upfront_cost = 0
+    for payment_mode in ALL_UPFRONT_MODES:
+        cell = cube.get((region, service_key, payment_mode))
+        if cell:
+            all_upfront_cost += cell[COST]
+            quantity += cell[QUANTITY]
+    return no_upfront_cost, all_upfront_cost, quantity
+
+
+def service_costs(cube: Dict) -> Dict[str, float]:
+    """Custo total de cada serviço somando regiões e formas de pagamento"""
+    costs = defaultdict(float)
+    for (_, service_key, _), cell in cube.items():
+        costs[service_key] += cell[COST]
+    return dict(costs)
+
+
+def service_mix(cube: Dict) -> Dict[str, int]:
+    """Número de itens de cada serviço"""
+    mix = defaultdict(int)
+    for (_, service_key, _), cell in cube.items():
+        mix[service_key] += cell[ITEMS]
+    return dict(mix)
+
+
+def item_count(cube: Dict) -> int:
+    """Número de itens reservados"""
+    return sum(cell[ITEMS] for cell in cube.values())
+
+
+def rows_by_region(cube: Dict) -> Dict[str, List[Dict]]:
+    """Linhas do cubo agrupadas por região, para as tabelas de detalhes"""
+    rows = defaultdict(list)
+    for (region, service_key, payment_mode), cell in cube.items():
+        rows[region].append({
+            'Serviço': service_key,
+            'Pagamento': payment_mode,
+            'Itens': cell[ITEMS],
+            'Quantidade': cell[QUANTITY],
+            'Custo (USD)': cell[COST],
+            'Upfront (USD)': cell[UPFRONT],
+        })
+    return dict(rows)
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Arquivo padrão da tabela de descontos (pode ser trocado via variável de ambiente)
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'discount_rules.json')
+
+# Valores possíveis de cada dimensão, usados para expandir o curinga "*"
+REGION_CLASSES = ('sao_paulo', 'other')
+PAYMENT_MODES = ('All Upfront', 'No Upfront', 'Heavy Utilization')
+ARCHITECTURES = ('ARM', 'x86')
+WILDCARD = '*'
+
+# Regra neutra para chaves sem desconto: (multiplicador, dedução, condição da dedução)
+NO_DISCOUNT = (1.0, 0.0, None)
+
+
+def compile_discount_rules(rules: List[Dict]) -> Dict[Tuple[str, str, str, str], Tuple[float, float, str]]:
+    """Compila a lista de regras em um dicionário (serviço, região, pagamento, arquitetura) -> regra
+
+    Curingas são expandidos para todos os valores da dimensão; regras mais
+    específicas prevalecem sobre regras com curinga.
+    """
+    dimensions = [('region', REGION_CLASSES), ('payment_mode', PAYMENT_MODES), ('architecture', ARCHITECTURES)]
+    lookup = {}
+    specificity = {}
+
+    for rule in rules:
+        if 'service' not in rule:
+            raise ValueError(f"Regra de desconto sem o campo 'service': {rule}")
+
+        expanded = [[rule['service']]]
+        rule_specificity = 0
+        for field, values in dimensions:
+            value = rule.get(field, WILDCARD)
+            if value == WILDCARD:
+                expanded.append(list(values))
+            elif value in values:
+                expanded.append([value])
+                rule_specificity += 1
+            else:
+                raise ValueError(f"Valor inválido '{value}' para '{field}' na regra de desconto: {rule}")
+
+        action = (
+            float(rule.get('multiplier', 1.0)),
+            float(rule.get('deduction', 0.0)),
+            rule.get('deduction_if_config_contains')
+        )
+
+        for service in expanded[0]:
+            for region in expanded[1]:
+                for payment_mode in expanded[2]:
+                    for architecture in expanded[3]:
+                        key = (service, region, payment_mode, architecture)
+                        previous = specificity.get(key, -1)
+                        if previous == rule_specificity and lookup[key] != action:
+                            raise ValueError(f"Regras de desconto conflitantes para {key}")
+                        if rule_specificity >= previous:
+                            lookup[key] = action
+                            specificity[key] = rule_specificity
+
+    return lookup
+
+
+def rules_digest(lookup: Dict) -> str:
+    """Hash da tabela compilada: muda sempre que algum desconto efetivo muda"""
+    canonical = repr(sorted(lookup.items()))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def load_discount_rules(path: str = None) -> Dict:
+    """Carrega e compila a tabela de descontos a partir de um arquivo JSON
+
+    'version' é o hash da tabela compilada, e não o campo "version" do
+    arquivo (guardado em 'label'): resultados persistidos e caches que usam
+    a versão na chave são invalidados mesmo se o campo não for atualizado.
+    """
+    path = path or os.environ.get('DISCOUNT_RULES_FILE') or DEFAULT_RULES_PATH
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    lookup = compile_discount_rules(raw.get('rules', []))
+    return {
+        'version': rules_digest(lookup),
+        'label': str(raw.get('version', '')),
+        'lookup': lookup
+    }
+
+
+def apply_discounts(base_cost: np.ndarray, service_keys, region_classes, payment_modes, architectures, configs: pd.Series, table: Dict = None) -> np.ndarray:
+    """Aplica a tabela de descontos a um lote inteiro de linhas
+
+    As chaves são fatoradas para que o dicionário seja consultado uma única
+    vez por combinação distinta, e o resultado é espalhado para as linhas.
+    """
+    table = table or DISCOUNT_RULES
+    lookup = table['lookup']
+    if len(base_cost) == 0:
+        return np.asarray(base_cost, dtype=float)
+
+    codes, unique_keys = pd.MultiIndex.from_arrays(
+        [service_keys, region_classes, payment_modes, architectures]
+    ).factorize()
+    actions = [lookup.get(key, NO_DISCOUNT) for key in unique_keys]
+
+    multipliers = np.array([action[0] for action in actions], dtype=float)[codes]
+    deductions = np.array([action[1] for action in actions], dtype=float)[codes]
+
+    # Deduções condicionais: avaliar cada condição distinta só nas linhas afetadas
+    markers = np.array([action[2] for action in actions], dtype=object)[codes]
+    for marker in {action[2] for action in actions if action[2]}:
+        rows = markers == marker
+        matches = configs[rows].fillna('').astype(str).str.contains(marker, regex=False).to_numpy(dtype=bool)
+        row_deductions = deductions[rows]
+        row_deductions[~matches] = 0.0
+        deductions[rows] = row_deductions
+
+    return base_cost * multipliers - deductions
+
+
+# Tabela compilada uma vez na inicialização
+DISCOUNT_RULES = load_discount_rules()
@@ -0,0 +1,249 @@
+"""Pool de processos para o parse e o cálculo das estimativas
+
+Um arquivo grande processado na thread do script segura o GIL e deixa todas
+as sessões do servidor lentas. Aqui o trabalho pesado roda em um pool
+limitado de processos (PROCESS_POOL_WORKERS, padrão: até 2), criado uma vez
+por processo pelo app (st.cache_resource).
+
+Os processos filhos sempre usam o caminho em blocos, que dá o mesmo
+resultado, e informam o avanço a cada bloco em uma fila única. Uma thread do
+processo principal repassa esse avanço para o ProcessingJob correspondente,
+onde a barra de progresso do app o lê.
+
+Cada processo tem o próprio ROW_CACHE. Para que uma estimativa revisada
+reaproveite as linhas da versão anterior, o job pode trazer uma afinidade (a
+conta do arquivo, ver processing.peek_account): jobs com a mesma afinidade
+vão para o mesmo processo, a menos que ele tenha mais de AFFINITY_SLACK jobs
+na frente do processo mais livre.
+"""
+import atexit
+import itertools
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import types
+import zlib
+from concurrent.futures import ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from processing import CHUNKED_PROCESSING_BYTES, DETAILS_CACHE, ROW_CACHE, process_csv_chunked, source_size
+from profiling import StageProfiler
+from result_model import ProcessResult
+
+DEFAULT_WORKERS = min(2, os.cpu_count() or 1)
+
+# Blocos menores que os do caminho padrão deixam a barra de progresso mais fluida
+POOL_CHUNKSIZE = 10000
+
+# Jobs a mais que o processo preferido pode ter na fila antes de a afinidade ser ignorada
+AFFINITY_SLACK = 1
+
+# Fila de progresso do processo filho (definida por _init_worker)
+_updates = None
+
+# Serializa a troca de sys.modules['__main__'] entre as threads de script das sessões
+_MAIN_LOCK = threading.Lock()
+
+
+def _init_worker(updates):
+    global _updates
+    _updates = updates
+
+
+@contextmanager
+def upload_source(uploaded_file):
+    """O que enviar ao processo filho: os bytes do upload ou, se grande, um arquivo temporário
+
+    Acima de CHUNKED_PROCESSING_BYTES o upload não é copiado para o pipe do
+    pool: é gravado direto do buffer em disco e o filho o lê via mmap, em
+    blocos. O arquivo é apagado na saída do bloco.
+    """
+    if source_size(uploaded_file) < CHUNKED_PROCESSING_BYTES:
+        yield uploaded_file.getvalue()
+        return
+
+    with tempfile.NamedTemporaryFile(prefix='upload_', suffix='.csv') as f:
+        with uploaded_file.getbuffer() as buffer:
+            f.write(buffer)
+        f.flush()
+        yield f.name
+
+
+def _process_job(job_id: int, source, lambda_payment_option: str, fargate_payment_option: str, trace_memory: bool) -> Tuple[ProcessResult, List[Dict], Dict]:
+    """Executado no processo filho: resultado, etapas medidas e uso dos caches
+
+    O uso dos caches vem como contadores (details_hits/misses do
+    DETAILS_CACHE, row_hits/misses do ROW_CACHE), no formato da telemetria.
+
+    Devolve um ProcessResult e não o dict de process_csv_chunked, que tem
+    defaultdicts com lambdas e não pode ser serializado.
+    """
+    def progress(done: int, total: int):
+        _updates.put((job_id, done / total if total else 1.0))
+
+    details_before = DETAILS_CACHE.info()
+    rows_before = ROW_CACHE.info()
+    profiler = StageProfiler(trace_memory=trace_memory).start()
+    with profiler.stage('process_csv_chunked'):
+        result = process_csv_chunked(source, lambda_payment_option, fargate_payment_option, POOL_CHUNKSIZE, progress, profiler)
+    with profiler.stage('ProcessResult.from_dict'):
+        result = ProcessResult.from_dict(result)
+    profiler.finish()
+    details_after = DETAILS_CACHE.info()
+    rows_after = ROW_CACHE.info()
+
+    counters = {
+        'details_hits': details_after['hits'] - details_before['hits'],
+        'details_misses': details_after['misses'] - details_before['misses'],
+        'row_hits': rows_after['hits'] - rows_before['hits'],
+        'row_misses': rows_after['misses'] - rows_before['misses'],
+    }
+    return result, profiler.stages, counters
+
+
+@contextmanager
+def _detached_main():
+    """Esconde o __main__ enquanto o pool cria processos filhos
+
+    Com spawn, o filho reexecuta o arquivo do __main__ do pai. Durante uma
+    execução do script o Streamlit aponta __main__ para o próprio app, o que
+    faria cada processo do pool rodar a página inteira (e tentar criar outro
+    pool). Os filhos só precisam deste módulo. sys.modules é global: a troca
+    é feita sob _MAIN_LOCK e só no submit que cria o processo de cada worker.
+    """
+    with _MAIN_LOCK:
+        main = sys.modules.get('__main__')
+        sys.modules['__main__'] = types.ModuleType('__main__')
+        try:
+            yield
+        finally:
+            sys.modules['__main__'] = main
+
+
+class ProcessingJob:
+    """Um arquivo em processamento no pool; progress vai de 0 a 1"""
+
+    def __init__(self, job_id: int, future):
+        self.job_id = job_id
+        self.future = future
+        self.progress = 0.0
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def wait(self, timeout: float) -> bool:
+        """Espera até timeout segundos; True se o job terminou"""
+        return bool(wait([self.future], timeout).done)
+
+    def result(self) -> Tuple[ProcessResult, List[Dict], Dict]:
+        """(ProcessResult, etapas, acertos/falhas dos caches)
+
+        Bloqueia até o fim do job. Exceções do processo filho
+        (InvalidFormatError, inclusive) são levantadas aqui.
+        """
+        return self.future.result()
+
+
+class ProcessingPool:
+    """Pool limitado de processos com progresso por job e afinidade por chave
+
+    Cada processo é um executor de um único worker, para que o pool escolha
+    onde cada job roda.
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or int(os.environ.get('PROCESS_POOL_WORKERS', DEFAULT_WORKERS))
+        # spawn: o servidor do Streamlit tem threads, que não sobrevivem bem a um fork
+        context = multiprocessing.get_context('spawn')
+        self._updates = context.Queue()
+        self._executors = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._updates,)
+            )
+            for _ in range(self.workers)
+        ]
+        self._pending = [0] * self.workers
+        # Cada executor cria o seu processo no primeiro submit (ver _detached_main)
+        self._spawned = [False] * self.workers
+        self._jobs: Dict[int, ProcessingJob] = {}
+        self._jobs_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, name='process-pool-progress', daemon=True)
+        self._dispatcher.start()
+        atexit.register(self.shutdown)
+
+    def _pick_worker(self, affinity: str = None) -> int:
+        """Processo do job: o da afinidade, se não estiver sobrecarregado, ou o mais livre"""
+        least_busy = min(range(self.workers), key=self._pending.__getitem__)
+        if affinity:
+            preferred = zlib.crc32(affinity.encode('utf-8')) % self.workers
+            if self._pending[preferred] <= self._pending[least_busy] + AFFINITY_SLACK:
+                return preferred
+        return least_busy
+
+    def submit(self, source, lambda_payment_option: str, fargate_payment_option: str, trace_memory: bool = False, affinity: str = None) -> ProcessingJob:
+        """Envia bytes de uma exportação ou o caminho de um arquivo (ver upload_source)
+
+        Jobs com a mesma affinity rodam, sempre que possível, no mesmo processo.
+        """
+        job_id = next(self._ids)
+        with self._jobs_lock:
+            worker = self._pick_worker(affinity)
+            self._pending[worker] += 1
+        executor = self._executors[worker]
+        job_args = (_process_job, job_id, source, lambda_payment_option, fargate_payment_option, trace_memory)
+        if self._spawned[worker]:
+            future = executor.submit(*job_args)
+        else:
+            # O executor cria o processo sob demanda, dentro do primeiro submit
+            with _detached_main():
+                future = executor.submit(*job_args)
+                self._spawned[worker] = True
+        job = ProcessingJob(job_id, future)
+        with self._jobs_lock:
+            self._jobs[job_id] = job
+        future.add_done_callback(lambda _: self._forget(job_id, worker))
+        return job
+
+    def prestart(self, sample: bytes):
+        """Sobe e aquece os processos filhos processando uma exportação de exemplo"""
+        for _ in range(self.workers):
+            self.submit(sample, "No Upfront 12x pela AWS", "No Upfront 12x pela AWS")
+
+    def shutdown(self, wait: bool = False, cancel_futures: bool = True):
+        """Encerra os processos e a thread de progresso (também usado para descartar um pool quebrado)"""
+        if not self._closed:
+            self._closed = True
+            atexit.unregister(self.shutdown)
+            for executor in self._executors:
+                executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+            self._updates.put(None)
+
+    def _forget(self, job_id: int, worker: int):
+        with self._jobs_lock:
+            self._pending[worker] -= 1
+            job = self._jobs.pop(job_id, None)
+        if job is not None:
+            job.progress = 1.0
+
+    def _dispatch(self):
+        while True:
+            try:
+                update = self._updates.get()
+            except Exception:
+                # Fila fechada no encerramento do processo
+                return
+            if update is None:
+                return
+            job_id, fraction = update
+            with self._jobs_lock:
+                job = self._jobs.get(job_id)
+            if job is not None:
+                job.progress = fraction
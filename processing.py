@@ -0,0 +1,790 @@
+import csv
+import io
+import mmap
+import re
+import sys
+import os
+import time
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from caching import LRUCache, content_digest
+from config_parser import tokenize_config, scan_flags, first_value, int_values
+from cost_cube import add_item
+from discounts import DISCOUNT_RULES, apply_discounts
+from profiling import NULL_PROFILER
+from result_model import LineItem
+
+# Início e fim da seção detalhada, procurados direto nos bytes (UTF-8). Os
+# terminadores são buscados um a um: literais simples usam a busca rápida do re.
+_SECTION_START = re.compile('Estimativa detalhada|Detailed Estimate'.encode('utf-8'))
+_SECTION_TERMINATORS = [re.compile(re.escape(marker.encode('utf-8'))) for marker in ('Confirmação', 'Acknowledgement')]
+_BLANK_LINE = re.compile(rb'\n[ \t\r\f\v]*(?=\n|\Z)')
+_NEWLINE = re.compile(rb'\n')
+
+# Colunas obrigatórias da exportação em português e em inglês
+REQUIRED_COLUMNS_PT = ['Hierarquia de grupos', 'Região', 'Serviço', 'Pagamento adiantado', 'Mensal', 'Resumo da configuração']
+REQUIRED_COLUMNS_EN = ['Group hierarchy', 'Region', 'Service', 'Upfront', 'Monthly', 'Configuration summary']
+COLUMN_MAPPING = dict(zip(REQUIRED_COLUMNS_EN, REQUIRED_COLUMNS_PT))
+INVALID_FORMAT_MESSAGE = "Formato de arquivo inválido. Verifique se o CSV foi exportado corretamente da Calculadora AWS."
+
+# Formas de pagamento oferecidas para Lambda e Fargate
+PAYMENT_OPTIONS = ["No Upfront 12x pela AWS", "All Upfront 06x pela TdSynnex"]
+
+# Versão do pipeline de processamento, parte da chave dos resultados persistidos
+# (result_store): incremente a cada mudança que altere o resultado de process_csv
+PIPELINE_VERSION = 1
+
+# Linhas por bloco no processamento em blocos
+DEFAULT_CHUNKSIZE = 50000
+
+# Arquivos a partir deste tamanho são processados em blocos, com memória constante
+CHUNKED_PROCESSING_BYTES = 50 * 1024 * 1024
+
+
+class InvalidFormatError(ValueError):
+    """CSV sem as colunas esperadas da Calculadora AWS"""
+
+# Ordem de prioridade dos serviços, igual à cadeia if/elif original
+SERVICE_KEYS = ['EC2', 'RDS', 'ElastiCache', 'CloudFront', 'Lambda', 'Fargate']
+
+
+def _contains(series: pd.Series, *needles: str) -> np.ndarray:
+    """Máscara booleana: True quando a célula contém qualquer um dos textos"""
+    text = series.fillna('').astype(str)
+    mask = np.zeros(len(text), dtype=bool)
+    for needle in needles:
+        mask |= text.str.contains(needle, regex=False).to_numpy(dtype=bool)
+    return mask
+
+
+def _numeric(series: pd.Series) -> np.ndarray:
+    """Converte a coluna para float, tratando vazios como 0"""
+    return pd.to_numeric(series).fillna(0).to_numpy(dtype=float)
+
+
+def compute_line_items(df: pd.DataFrame, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS", discount_rules: Dict = None) -> pd.DataFrame:
+    """Calcula payment_mode, service_key e custo com desconto para todas as linhas de uma vez
+
+    Retorna um DataFrame alinhado ao original com as colunas region, service,
+    config, upfront, monthly, payment_mode, service_key, cost e keep (linhas
+    que entram no resumo). Os descontos vêm da tabela em discount_rules.json.
+    """
+    n = len(df)
+    region = df['Região']
+    service = df['Serviço']
+    config = df['Resumo da configuração']
+    hierarchy = df['Hierarquia de grupos']
+
+    upfront = _numeric(df['Pagamento adiantado'])
+    monthly = _numeric(df['Mensal'])
+
+    is_ec2 = _contains(service, 'EC2')
+    is_rds = _contains(service, 'RDS', 'Aurora')
+    is_elasticache = _contains(service, 'ElastiCache')
+    is_cloudfront = _contains(service, 'CloudFront')
+    is_lambda = _contains(service, 'Lambda')
+    is_fargate = _contains(service, 'Fargate')
+
+    is_sao_paulo = _contains(region, 'São Paulo', 'América do Sul')
+    is_arm = _contains(config, 'ARM')
+    hier_all_upfront = _contains(hierarchy, 'All Upfront', 'ALL Upfront', 'All UpFront')
+    hier_on_demand = _contains(hierarchy, 'On-demand', 'On Demand', 'On-Demand')
+    heavy_config = _contains(config, 'Heavy Utilization')
+    t2_micro = _contains(config, 'cache.t2.micro')
+
+    # Modo de pagamento base a partir da hierarquia
+    heavy_base = (hier_all_upfront & is_elasticache & t2_micro) | (~hier_all_upfront & heavy_config)
+    payment_mode = np.full(n, 'No Upfront', dtype=object)
+    payment_mode[hier_all_upfront] = 'All Upfront'
+    payment_mode[heavy_base] = 'Heavy Utilization'
+    mode_all_upfront = payment_mode == 'All Upfront'
+    mode_no_upfront = payment_mode == 'No Upfront'
+
+    # Ramo de desconto de cada linha (mesma precedência da cadeia original)
+    branch_cloudfront = is_cloudfront
+    branch_lambda = ~branch_cloudfront & is_lambda
+    branch_fargate = ~branch_cloudfront & ~branch_lambda & is_fargate
+    branch_rds = ~branch_cloudfront & ~branch_lambda & ~branch_fargate & is_rds
+
+    lambda_all_upfront = 'All Upfront' in lambda_payment_option
+    fargate_all_upfront = 'All Upfront' in fargate_payment_option
+
+    # Valor base de cada linha, antes do desconto
+    base_cost = np.where(mode_all_upfront, upfront, monthly)
+    base_cost = np.where(branch_rds & ~mode_no_upfront, upfront, base_cost)
+    base_cost = np.where(branch_cloudfront, np.where(monthly > 0, monthly, upfront), base_cost)
+    if lambda_all_upfront:
+        base_cost = np.where(branch_lambda, np.where(upfront > 0, upfront, monthly), base_cost)
+    else:
+        base_cost = np.where(branch_lambda, monthly, base_cost)
+    base_cost = np.where(branch_fargate, monthly, base_cost)
+
+    # Modo de pagamento definido pelo serviço (CloudFront, Lambda e Fargate)
+    payment_mode[branch_cloudfront] = 'No Upfront'
+    payment_mode[branch_lambda] = 'All Upfront' if lambda_all_upfront else 'No Upfront'
+    payment_mode[branch_fargate] = 'All Upfront' if fargate_all_upfront else 'No Upfront'
+
+    # Chave do serviço: a primeira condição verdadeira vence, como no if/elif
+    service_key = np.full(n, None, dtype=object)
+    for key, mask in reversed(list(zip(SERVICE_KEYS, [is_ec2, is_rds, is_elasticache, is_cloudfront, is_lambda, is_fargate]))):
+        service_key[mask] = key
+
+    # Chave usada na tabela de descontos (mesma precedência da cadeia original)
+    discount_key = np.where(pd.isna(service_key), '', service_key).astype(object)
+    discount_key[branch_rds] = 'RDS'
+    discount_key[branch_fargate] = 'Fargate'
+    discount_key[branch_lambda] = 'Lambda'
+    discount_key[branch_cloudfront] = 'CloudFront'
+
+    cost = apply_discounts(
+        base_cost,
+        discount_key,
+        np.where(is_sao_paulo, 'sao_paulo', 'other'),
+        payment_mode,
+        np.where(is_arm, 'ARM', 'x86'),
+        config,
+        discount_rules
+    )
+
+    # Correção especial: upfront = 0 e monthly > 0 força No Upfront (exceto serviços com desconto)
+    force_no_upfront = (upfront == 0) & (monthly > 0) & ~(is_cloudfront | is_lambda | is_fargate | is_rds)
+    payment_mode[force_no_upfront] = 'No Upfront'
+    cost = np.where(force_no_upfront, monthly, cost)
+
+    # Pular linhas On Demand (exceto Lambda, Fargate e CloudFront)
+    skip_on_demand = hier_on_demand & ~(is_lambda | is_fargate | is_cloudfront)
+
+    return pd.DataFrame({
+        'region': region.to_numpy(),
+        'service': service.to_numpy(),
+        'config': config.to_numpy(),
+        'upfront': upfront,
+        'monthly': monthly,
+        'payment_mode': payment_mode,
+        'service_key': service_key,
+        'cost': cost,
+        'keep': ~skip_on_demand & pd.notna(service_key),
+    }, index=df.index)
+
+
+class _ByteRangeReader(io.RawIOBase):
+    """Leitor somente leitura sobre um memoryview, sem copiar o buffer inteiro"""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), len(self._view) - self._pos)
+        buffer[:size] = self._view[self._pos:self._pos + size]
+        self._pos += size
+        return size
+
+    def close(self):
+        self._view = memoryview(b'')
+        super().close()
+
+
+def find_detailed_section(buffer) -> Tuple[int, int]:
+    """Localiza (início, fim) em bytes da tabela "Estimativa detalhada" / "Detailed Estimate"
+
+    O início é a linha logo após o marcador (cabeçalho do CSV); o fim é a
+    primeira linha em branco ou com "Confirmação" / "Acknowledgement" depois
+    do cabeçalho. Funciona sobre bytes, memoryview ou mmap, sem decodificar.
+    """
+    start_match = _SECTION_START.search(buffer)
+    if start_match is None:
+        raise ValueError("Seção 'Estimativa detalhada' ou 'Detailed Estimate' não encontrada")
+
+    size = len(buffer)
+    newline = _NEWLINE.search(buffer, start_match.end())
+    if newline is None:
+        return size, size
+    start = newline.end()
+
+    header_end = _NEWLINE.search(buffer, start)
+    if header_end is None:
+        return start, size
+
+    data_start = header_end.end()
+    end = size
+
+    # Primeira linha em branco (o \n que a antecede pode ser o do cabeçalho)
+    blank = _BLANK_LINE.search(buffer, data_start - 1)
+    if blank:
+        end = blank.start() + 1
+
+    # Primeira linha com "Confirmação" / "Acknowledgement"
+    for terminator in _SECTION_TERMINATORS:
+        match = terminator.search(buffer, data_start, end)
+        if match:
+            end = _line_start(buffer, match.start(), data_start)
+
+    return start, end
+
+
+def _line_start(buffer, pos: int, floor: int) -> int:
+    """Início da linha que contém a posição pos (sem voltar antes de floor)"""
+    window = 4096
+    with memoryview(buffer) as view:
+        while pos > floor:
+            low = max(floor, pos - window)
+            newline = bytes(view[low:pos]).rfind(b'\n')
+            if newline != -1:
+                return low + newline + 1
+            pos = low
+    return floor
+
+
+def _read_section(buffer) -> pd.DataFrame:
+    """Lê apenas a seção detalhada do buffer com o parser de CSV"""
+    start, end = find_detailed_section(buffer)
+    with memoryview(buffer) as view, view[start:end] as section:
+        reader = _ByteRangeReader(section)
+        try:
+            return pd.read_csv(reader, encoding='utf-8')
+        finally:
+            reader.close()
+
+
+def load_csv_file(file_path_or_buffer) -> pd.DataFrame:
+    """Carrega o CSV lidando com a estrutura complexa do arquivo AWS
+
+    Uploads em memória são lidos direto do buffer (getbuffer) e arquivos em
+    disco via mmap: só o trecho da seção detalhada passa pelo parser.
+    """
+    if isinstance(file_path_or_buffer, (bytes, bytearray, memoryview)):
+        return _read_section(file_path_or_buffer)
+
+    if hasattr(file_path_or_buffer, 'getbuffer'):
+        with file_path_or_buffer.getbuffer() as buffer:
+            return _read_section(buffer)
+
+    if hasattr(file_path_or_buffer, 'read'):
+        return _read_section(file_path_or_buffer.read())
+
+    with open(file_path_or_buffer, 'rb') as f:
+        if f.seek(0, io.SEEK_END) == 0:
+            raise ValueError("Seção 'Estimativa detalhada' ou 'Detailed Estimate' não encontrada")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _read_section(mapped)
+
+
+def iter_csv_chunks(file_path_or_buffer, chunksize: int = DEFAULT_CHUNKSIZE, progress: Callable[[int, int], None] = None) -> Iterator[pd.DataFrame]:
+    """Lê a seção detalhada em blocos de até chunksize linhas
+
+    progress(bytes lidos, bytes da seção) é chamado depois que cada bloco é
+    consumido; os bytes lidos avançam pelo buffer do parser, não por linha.
+    """
+    if isinstance(file_path_or_buffer, (bytes, bytearray, memoryview)):
+        yield from _iter_section(file_path_or_buffer, chunksize, progress)
+    elif hasattr(file_path_or_buffer, 'getbuffer'):
+        with file_path_or_buffer.getbuffer() as buffer:
+            yield from _iter_section(buffer, chunksize, progress)
+    elif hasattr(file_path_or_buffer, 'read'):
+        yield from _iter_section(file_path_or_buffer.read(), chunksize, progress)
+    else:
+        with open(file_path_or_buffer, 'rb') as f:
+            if f.seek(0, io.SEEK_END) == 0:
+                raise ValueError("Seção 'Estimativa detalhada' ou 'Detailed Estimate' não encontrada")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield from _iter_section(mapped, chunksize, progress)
+
+
+def _iter_section(buffer, chunksize: int, progress: Callable[[int, int], None] = None) -> Iterator[pd.DataFrame]:
+    start, end = find_detailed_section(buffer)
+    with memoryview(buffer) as view, view[start:end] as section:
+        reader = _ByteRangeReader(section)
+        try:
+            with pd.read_csv(reader, encoding='utf-8', chunksize=chunksize) as chunks:
+                for chunk in chunks:
+                    yield chunk
+                    if progress is not None:
+                        progress(reader.tell(), len(section))
+        finally:
+            reader.close()
+
+
+def detect_locale(columns) -> str:
+    """Idioma da exportação ('pt' ou 'en') pelas colunas, ou None se inválida"""
+    columns = set(columns)
+    if all(col in columns for col in REQUIRED_COLUMNS_PT):
+        return 'pt'
+    if all(col in columns for col in REQUIRED_COLUMNS_EN):
+        return 'en'
+    return None
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Renomeia as colunas da exportação em inglês para os nomes em português"""
+    if detect_locale(df.columns) == 'en':
+        return df.rename(columns=COLUMN_MAPPING)
+    return df
+
+
+# Cache dos detalhes extraídos: exportações repetem a mesma configuração em muitas linhas
+DETAILS_CACHE = LRUCache(int(os.environ.get('DETAILS_CACHE_SIZE', 4096)))
+
+
+def extract_instance_details(config_text: str, service: str) -> Mapping:
+    """Extrai detalhes das instâncias do texto de configuração (memoizado)
+
+    O resultado é somente leitura (specs em tupla), pois é compartilhado entre
+    todas as linhas com o mesmo (serviço, configuração).
+    """
+    key = content_digest(service, config_text)
+    details = DETAILS_CACHE.get(key)
+    if details is None:
+        parsed = _parse_instance_details(config_text, service)
+        details = MappingProxyType({
+            'quantidade': parsed['quantidade'],
+            'tipo': sys.intern(parsed['tipo']),
+            'specs': tuple(sys.intern(spec) for spec in parsed['specs'])
+        })
+        DETAILS_CACHE.put(key, details)
+    return details
+
+
+def _parse_instance_details(config_text: str, service: str) -> Dict:
+    """Extrai detalhes das instâncias do texto de configuração"""
+    details = {'quantidade': 1, 'tipo': 'N/A', 'specs': []}
+
+    # O resumo é lido uma única vez em chaves canônicas (PT/EN); os marcadores
+    # (Multi, OnDemand, ARM, ...) só são varridos nos serviços que os usam
+    if "EC2" in service:
+        fields = tokenize_config(config_text)
+        details['tipo'] = first_value(fields, 'ec2_instance', 'N/A')
+
+        quantities = int_values(fields, 'instance_count')
+        if quantities:
+            details['quantidade'] = quantities[0]
+
+        pricing_strategy = first_value(fields, 'pricing_strategy', 'N/A')
+        os_system = first_value(fields, 'operating_system', 'N/A')
+
+        details['specs'] = [pricing_strategy, os_system]
+
+    elif "RDS" in service or "Aurora" in service:
+        fields = tokenize_config(config_text)
+        flags = scan_flags(config_text)
+        details['tipo'] = first_value(fields, 'instance_type', 'N/A')
+
+        nodes = int_values(fields, 'nodes')
+        if nodes:
+            details['quantidade'] = nodes[0]
+
+        az_config = 'Multi AZ' if 'multi' in flags else 'Single AZ'
+
+        purchase_option = 'Reserved Instance'
+        if 'on_demand' in flags:
+            purchase_option = 'On Demand'
+        elif 'no_upfront' in flags:
+            purchase_option = 'No Upfront'
+        elif 'all_upfront' in flags:
+            purchase_option = 'All Upfront'
+
+        period = '3 anos' if 'three_year' in flags else '1 ano'
+
+        engine_type = service
+        details['specs'] = [az_config, purchase_option, period, engine_type]
+
+    elif "ElastiCache" in service:
+        fields = tokenize_config(config_text)
+        flags = scan_flags(config_text)
+        instance_types = fields.get('instance_type', [])
+        nodes_counts = int_values(fields, 'nodes')
+
+        for instance_type, nodes in zip(instance_types, nodes_counts):
+            if nodes > 0 and 'r6gd.12xlarge' not in instance_type:
+                details['tipo'] = instance_type
+                details['quantidade'] = nodes
+                break
+
+        purchase_option = 'Reserved Instance'
+        if 'on_demand' in flags:
+            purchase_option = 'On Demand'
+        elif 'heavy_utilization' in flags:
+            purchase_option = 'Heavy Utilization'
+        elif 'no_upfront' in flags:
+            purchase_option = 'No Upfront'
+        elif 'all_upfront' in flags:
+            purchase_option = 'All Upfront'
+
+        period = '3 anos' if 'three_year' in flags else '1 ano'
+
+        cache_engine = 'Redis'
+        if 'valkey' in flags:
+            cache_engine = 'Valkey'
+        elif 'memcached' in flags:
+            cache_engine = 'Memcached'
+
+        details['specs'] = [purchase_option, period, cache_engine]
+
+    elif "AWS Fargate" in service or "Fargate" in service:
+        flags = scan_flags(config_text)
+        architecture = 'ARM' if 'arm' in flags else 'x86'
+        os_system = 'Windows' if 'windows' in flags else 'Linux'
+
+        details['specs'] = [architecture, os_system]
+
+    return details
+
+
+def new_result() -> Dict:
+    """Estrutura vazia do resultado de process_csv
+
+    client_name e account_id são os da primeira linha; accounts tem uma
+    partição (ver new_partition) por conta da Hierarquia de grupos.
+    """
+    return {
+        'client_name': '',
+        'account_id': '',
+        'services_by_region': defaultdict(lambda: defaultdict(list)),
+        'regions': set(),
+        'total_costs': {'no_upfront': 0, 'all_upfront': 0},
+        'cost_cube': {},
+        'configs': [],
+        'rows': 0,
+        'locale': None,
+        'accounts': {}
+    }
+
+
+def new_partition(client_name: str, account_id: str) -> Dict:
+    """Agregados de uma conta: os itens ficam em services_by_region, marcados com a conta"""
+    return {
+        'client_name': client_name,
+        'account_id': account_id,
+        'regions': set(),
+        'total_costs': {'no_upfront': 0, 'all_upfront': 0},
+        'cost_cube': {},
+        'rows': 0
+    }
+
+
+def parse_client_account(hierarchy: str) -> Tuple[str, str]:
+    """Extrai (cliente, conta) do primeiro nível da Hierarquia de grupos"""
+    client_name, account_id = '', ''
+    if ' > ' in hierarchy:
+        client_account = hierarchy.split(' > ')[0].strip()
+
+        if ' - ' in client_account:
+            parts = client_account.split(' - ')
+            if len(parts) >= 3:
+                client_name = ' - '.join(parts[:-1]).strip()
+                account_id = parts[-1].strip()
+            elif len(parts) == 2:
+                client_name = parts[0].strip()
+                account_id = parts[1].strip()
+        elif ' ' in client_account:
+            client_parts = client_account.rsplit(' ', 1)
+            client_name = client_parts[0].strip()
+            account_id = client_parts[1].strip()
+
+    return client_name, account_id
+
+
+# (cliente, conta) por texto da hierarquia: exportações consolidadas repetem
+# poucas hierarquias em milhares de linhas
+ACCOUNTS_CACHE = LRUCache(4096)
+
+
+def client_account(hierarchy) -> Tuple[str, str]:
+    """parse_client_account memoizado (hierarquia vazia não tem conta)"""
+    if not isinstance(hierarchy, str):
+        return '', ''
+    parsed = ACCOUNTS_CACHE.get(hierarchy)
+    if parsed is None:
+        parsed = parse_client_account(hierarchy)
+        ACCOUNTS_CACHE.put(hierarchy, parsed)
+    return parsed
+
+
+def row_accounts(df: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, Tuple[str, str]]]:
+    """Chave da conta de cada linha e (cliente, conta) de cada chave
+
+    A hierarquia é fatorada, então cada texto distinto é analisado uma vez. A
+    chave é o id da conta ou, sem ele, o nome do cliente.
+    """
+    codes, hierarchies = pd.factorize(df['Hierarquia de grupos'].fillna(''))
+    parsed = [client_account(hierarchy) for hierarchy in hierarchies]
+    keys = np.array([account_id or client_name for client_name, account_id in parsed], dtype=object)
+    names = {}
+    for key, pair in zip(keys.tolist(), parsed):
+        names.setdefault(key, pair)
+    return keys[codes], names
+
+
+# Bytes lidos do início da seção detalhada para identificar a conta do arquivo
+PEEK_BYTES = 64 * 1024
+
+
+def peek_account(uploaded_file) -> str:
+    """Chave da conta (id ou cliente) da primeira linha da seção detalhada, sem ler o resto
+
+    Aceita um upload (getbuffer) ou bytes. Devolve '' se o arquivo não tiver
+    a seção ou a coluna da hierarquia.
+    """
+    def section_head(buffer) -> bytes:
+        # Só o início da seção: o fim (find_detailed_section) exigiria varrer o arquivo
+        start_match = _SECTION_START.search(buffer)
+        newline = _NEWLINE.search(buffer, start_match.end()) if start_match else None
+        if newline is None:
+            return b''
+        return bytes(buffer[newline.end():newline.end() + PEEK_BYTES])
+
+    if hasattr(uploaded_file, 'getbuffer'):
+        with uploaded_file.getbuffer() as buffer:
+            head = section_head(buffer)
+    else:
+        head = section_head(uploaded_file)
+    try:
+        reader = csv.reader(io.StringIO(head.decode('utf-8', 'replace')))
+        row = dict(zip(next(reader, []), next(reader, [])))
+    except csv.Error:
+        return ''
+
+    client_name, account_id = client_account(row.get('Hierarquia de grupos', row.get('Group hierarchy', '')))
+    return account_id or client_name
+
+
+# Itens já calculados, pelo hash da linha: uma estimativa revisada e exportada
+# de novo só recalcula as linhas que mudaram. Com tamanho 0 o cache é desligado.
+ROW_CACHE = LRUCache(int(os.environ.get('ROW_CACHE_SIZE', 100000)))
+
+
+def row_hashes(df: pd.DataFrame, lambda_payment_option: str, fargate_payment_option: str, discount_rules: Dict = None) -> List[int]:
+    """Hash de 64 bits de cada linha, combinado com as opções que alteram o item
+
+    Só as colunas usadas no cálculo entram no hash; as opções de pagamento e a
+    versão da tabela de descontos entram como um sal comum a todas as linhas.
+    """
+    table = discount_rules or DISCOUNT_RULES
+    salt = int.from_bytes(content_digest(lambda_payment_option, fargate_payment_option, table['version'])[:8], 'little')
+    hashes = pd.util.hash_pandas_object(df[REQUIRED_COLUMNS_PT], index=False).to_numpy()
+    return (hashes ^ np.uint64(salt)).tolist()
+
+
+def _compute_row_items(df: pd.DataFrame, lambda_payment_option: str, fargate_payment_option: str) -> List:
+    """Item de cada linha: (service_key, payment_mode, custo, upfront, detalhes, serviço, config) ou None
+
+    Serviço e configuração são internados: as linhas com o mesmo texto, neste
+    arquivo ou em revisões guardadas no ROW_CACHE, compartilham uma única
+    string em vez de manter a cópia que o parser criou para cada linha.
+    """
+    items = compute_line_items(df, lambda_payment_option, fargate_payment_option)
+    return [
+        (
+            service_key, payment_mode, total_cost, upfront, extract_instance_details(config, service),
+            sys.intern(service), sys.intern(config) if isinstance(config, str) else None
+        )
+        if keep else None
+        for service, config, upfront, payment_mode, service_key, total_cost, keep in zip(
+            items['service'], items['config'], items['upfront'].tolist(), items['payment_mode'],
+            items['service_key'], items['cost'].tolist(), items['keep'].tolist()
+        )
+    ]
+
+
+def row_items(df: pd.DataFrame, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS") -> List:
+    """Itens das linhas na ordem do DataFrame, reaproveitando os do ROW_CACHE
+
+    Modo de pagamento, descontos e extract_instance_details só rodam nas
+    linhas cujo hash não está no cache. O cálculo de cada linha não depende
+    das outras, então o resultado é o mesmo de calcular tudo de novo.
+    """
+    if ROW_CACHE.maxsize == 0:
+        return _compute_row_items(df, lambda_payment_option, fargate_payment_option)
+
+    hashes = row_hashes(df, lambda_payment_option, fargate_payment_option)
+    missing = object()
+    items = ROW_CACHE.get_many(hashes, missing)
+    positions = [position for position, item in enumerate(items) if item is missing]
+
+    if positions:
+        computed = _compute_row_items(df.iloc[positions], lambda_payment_option, fargate_payment_option)
+        for position, item in zip(positions, computed):
+            items[position] = item
+            ROW_CACHE.put(hashes[position], item)
+    return items
+
+
+def accumulate_rows(result: Dict, df: pd.DataFrame, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS") -> Dict:
+    """Incorpora as linhas de um DataFrame (ou bloco) ao resultado acumulado
+
+    No mesmo passe, cada linha também é somada à partição da sua conta.
+    """
+    result['regions'].update(df['Região'])
+    result['rows'] += len(df)
+
+    # Cada texto de configuração é guardado uma vez; os itens guardam só o id
+    configs = result['configs']
+    config_ids = {config: config_id for config_id, config in enumerate(configs)}
+    cube = result['cost_cube']
+    no_upfront_costs = []
+    all_upfront_costs = []
+
+    accounts, names = row_accounts(df)
+    partitions = result['accounts']
+    for key, (client_name, account_id) in names.items():
+        if key not in partitions:
+            partitions[key] = new_partition(client_name, account_id)
+    account_costs = {key: ([], []) for key in names}
+
+    # Os agregados são refeitos na ordem das linhas, mesmo com itens do cache:
+    # somar diferenças ao total anterior mudaria os últimos dígitos dos floats
+    for region, account, item in zip(df['Região'], accounts, row_items(df, lambda_payment_option, fargate_payment_option)):
+        partition = partitions[account]
+        partition['regions'].add(region)
+        partition['rows'] += 1
+        if item is None:
+            continue
+        service_key, payment_mode, total_cost, upfront, details, service, config = item
+
+        if not isinstance(config, str):
+            config = None  # configuração vazia (NaN)
+        config_id = config_ids.get(config)
+        if config_id is None:
+            config_id = config_ids[config] = len(configs)
+            configs.append(config)
+
+        result['services_by_region'][region][service_key].append(LineItem(
+            details['tipo'],
+            details['quantidade'],
+            details['specs'],
+            payment_mode,
+            total_cost,
+            upfront,
+            service,
+            config_id,
+            account
+        ))
+        add_item(cube, (region, service_key, payment_mode), total_cost, upfront, details['quantidade'])
+        add_item(partition['cost_cube'], (region, service_key, payment_mode), total_cost, upfront, details['quantidade'])
+
+        # Lambda e Fargate All Upfront contam 12 meses
+        account_no_upfront, account_all_upfront = account_costs[account]
+        if payment_mode == 'No Upfront':
+            no_upfront_costs.append(total_cost)
+            account_no_upfront.append(total_cost)
+        else:
+            annual_cost = total_cost * 12 if service_key in ('Lambda', 'Fargate') else total_cost
+            all_upfront_costs.append(annual_cost)
+            account_all_upfront.append(annual_cost)
+
+    # sum() parte do total anterior para somar na mesma ordem de um único passe
+    totals = result['total_costs']
+    totals['no_upfront'] = sum(no_upfront_costs, totals['no_upfront'])
+    totals['all_upfront'] = sum(all_upfront_costs, totals['all_upfront'])
+    for key, (no_upfront, all_upfront) in account_costs.items():
+        totals = partitions[key]['total_costs']
+        totals['no_upfront'] = sum(no_upfront, totals['no_upfront'])
+        totals['all_upfront'] = sum(all_upfront, totals['all_upfront'])
+
+    return result
+
+
+def process_csv(df: pd.DataFrame, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS") -> Dict:
+    """Processa o DataFrame e extrai informações relevantes"""
+    result = new_result()
+
+    if not df.empty and 'Hierarquia de grupos' in df.columns:
+        result['client_name'], result['account_id'] = parse_client_account(df['Hierarquia de grupos'].iloc[0])
+
+    return accumulate_rows(result, df, lambda_payment_option, fargate_payment_option)
+
+
+def process_csv_chunked(file_path_or_buffer, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS", chunksize: int = DEFAULT_CHUNKSIZE, progress: Callable[[int, int], None] = None, profiler=None) -> Dict:
+    """Carrega e processa a seção detalhada em blocos de linhas de tamanho fixo
+
+    Cada bloco é normalizado, incorporado ao resultado e descartado, então o
+    pico de memória do parser depende de chunksize e não do tamanho do
+    arquivo. O resultado é idêntico a load_csv_file + process_csv. progress
+    recebe o avanço em bytes a cada bloco (ver iter_csv_chunks).
+
+    Leitura, normalização e cálculo são cronometrados bloco a bloco e
+    registrados em profiler, no fim, como as etapas load_csv_file,
+    normalize_columns e process_csv do caminho em memória (sem pico de
+    memória por etapa).
+    """
+    result = new_result()
+    first_chunk = True
+    seconds = {'load_csv_file': 0.0, 'normalize_columns': 0.0, 'process_csv': 0.0}
+
+    clock = time.perf_counter()
+    for chunk in iter_csv_chunks(file_path_or_buffer, chunksize, progress):
+        parsed = time.perf_counter()
+        seconds['load_csv_file'] += parsed - clock
+        if first_chunk:
+            result['locale'] = detect_locale(chunk.columns)
+            if result['locale'] is None:
+                raise InvalidFormatError(INVALID_FORMAT_MESSAGE)
+            chunk = normalize_columns(chunk)
+            if not chunk.empty:
+                result['client_name'], result['account_id'] = parse_client_account(chunk['Hierarquia de grupos'].iloc[0])
+            first_chunk = False
+        else:
+            chunk = normalize_columns(chunk)
+        normalized = time.perf_counter()
+        seconds['normalize_columns'] += normalized - parsed
+
+        accumulate_rows(result, chunk, lambda_payment_option, fargate_payment_option)
+        clock = time.perf_counter()
+        seconds['process_csv'] += clock - normalized
+    seconds['load_csv_file'] += time.perf_counter() - clock
+
+    if profiler is not None:
+        profiler.merge([
+            {'stage': stage, 'depth': 0, 'seconds': elapsed, 'peak_bytes': None}
+            for stage, elapsed in seconds.items()
+        ])
+    return result
+
+
+def source_size(file_path_or_buffer) -> int:
+    """Tamanho em bytes de um caminho, upload ou buffer"""
+    if isinstance(file_path_or_buffer, (bytes, bytearray, memoryview)):
+        return len(file_path_or_buffer)
+    if hasattr(file_path_or_buffer, 'getbuffer'):
+        return file_path_or_buffer.getbuffer().nbytes
+    if hasattr(file_path_or_buffer, 'size'):
+        return file_path_or_buffer.size
+    return os.path.getsize(file_path_or_buffer)
+
+
+def process_source(file_path_or_buffer, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS", profiler=None) -> Dict:
+    """Carrega, valida, normaliza e processa um CSV da Calculadora AWS
+
+    Arquivos grandes seguem pelo caminho em blocos. Levanta InvalidFormatError
+    se as colunas não forem as da exportação em português ou inglês. Cada
+    etapa é registrada em profiler (ver profiling.StageProfiler), se informado.
+    """
+    profiler = profiler or NULL_PROFILER
+
+    if source_size(file_path_or_buffer) >= CHUNKED_PROCESSING_BYTES:
+        with profiler.stage('process_csv_chunked'):
+            return process_csv_chunked(file_path_or_buffer, lambda_payment_option, fargate_payment_option, profiler=profiler)
+
+    with profiler.stage('load_csv_file'):
+        df = load_csv_file(file_path_or_buffer)
+    locale = detect_locale(df.columns)
+    if locale is None:
+        raise InvalidFormatError(INVALID_FORMAT_MESSAGE)
+
+    with profiler.stage('normalize_columns'):
+        df = normalize_columns(df)
+    with profiler.stage('process_csv'):
+        result = process_csv(df, lambda_payment_option, fargate_payment_option)
+    result['locale'] = locale
+    return result
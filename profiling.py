@@ -0,0 +1,205 @@
+import cProfile
+import io
+import marshal
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List
+
+# O tracemalloc é global no processo e várias sessões (threads do Streamlit)
+# podem medir memória ao mesmo tempo. O rastreio fica ligado enquanto houver
+# alguma sessão usando-o (só é desligado por quem o ligou), e cada sessão que
+# entra muda a geração: uma etapa que não rodou sozinha do início ao fim não
+# tem pico confiável, já que outra sessão pode ter zerado o pico no meio dela.
+_TRACING_LOCK = threading.Lock()
+_tracing_sessions = 0
+_tracing_owned = False
+_tracing_generation = 0
+
+
+def _acquire_tracing(frames: int):
+    global _tracing_sessions, _tracing_owned, _tracing_generation
+    with _TRACING_LOCK:
+        if _tracing_sessions == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _tracing_owned = True
+        _tracing_sessions += 1
+        _tracing_generation += 1
+
+
+def _release_tracing():
+    global _tracing_sessions, _tracing_owned
+    with _TRACING_LOCK:
+        _tracing_sessions -= 1
+        if _tracing_sessions == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+class StageProfiler:
+    """Tempo de parede e pico de memória de cada etapa de uma execução
+
+    Etapas podem ser aninhadas; os valores de uma etapa incluem os das etapas
+    internas. O pico de memória (acima do uso no início da etapa) vem do
+    tracemalloc e só é medido com trace_memory=True. É o pico do processo
+    inteiro, com as alocações de outras threads; se outra sessão também
+    medir memória durante a etapa, o pico fica em None e a etapa é contada
+    em shared_peaks. Com capture=True a execução inteira também passa pelo
+    cProfile e termina com um snapshot do tracemalloc (também do processo).
+    """
+
+    def __init__(self, trace_memory: bool = False, capture: bool = False):
+        self.trace_memory = trace_memory or capture
+        self.capture = capture
+        self.stages: List[Dict] = []
+        self.counters: Dict[str, int] = {}
+        self.snapshot = None
+        self.shared_peaks = 0
+        self._open = []  # [posição em stages, início, memória inicial, pico, geração ou None]
+        self._profile = None
+        self._tracing = False
+        self._start = None
+        self.total_seconds = None
+
+    def start(self):
+        self._start = time.perf_counter()
+        if self.trace_memory:
+            _acquire_tracing(25 if self.capture else 1)
+            self._tracing = True
+        if self.capture:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def finish(self):
+        """Fecha etapas pendentes e encerra cProfile/tracemalloc (só na primeira chamada)"""
+        if self.total_seconds is not None:
+            return
+        while self._open:
+            self.end()
+        if self._profile is not None:
+            self._profile.disable()
+        if self.capture and tracemalloc.is_tracing():
+            self.snapshot = tracemalloc.take_snapshot()
+        if self._tracing:
+            _release_tracing()
+            self._tracing = False
+        if self._start is not None:
+            self.total_seconds = time.perf_counter() - self._start
+
+    def begin(self, name: str):
+        current, generation = 0, None
+        if self._tracing:
+            with _TRACING_LOCK:
+                # Com outra sessão medindo, zerar o pico estragaria o dela
+                if _tracing_sessions == 1:
+                    current, peak = tracemalloc.get_traced_memory()
+                    if self._open:
+                        self._open[-1][3] = max(self._open[-1][3], peak)
+                    tracemalloc.reset_peak()
+                    generation = _tracing_generation
+        self.stages.append({'stage': name, 'depth': len(self._open), 'seconds': None, 'peak_bytes': None})
+        self._open.append([len(self.stages) - 1, time.perf_counter(), current, current, generation])
+
+    def end(self):
+        index, start, base, peak, generation = self._open.pop()
+        stage = self.stages[index]
+        stage['seconds'] = time.perf_counter() - start
+        if self._tracing:
+            with _TRACING_LOCK:
+                if generation is None or generation != _tracing_generation:
+                    self.shared_peaks += 1
+                    return
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+            stage['peak_bytes'] = peak - base
+            if self._open:
+                self._open[-1][3] = max(self._open[-1][3], peak)
+
+    @contextmanager
+    def stage(self, name: str):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def merge(self, stages: List[Dict]):
+        """Incorpora etapas medidas em outro processo como filhas da etapa aberta"""
+        depth = len(self._open)
+        self.stages.extend(dict(stage, depth=stage['depth'] + depth) for stage in stages)
+
+    def count(self, name: str, amount: int = 1):
+        """Soma amount ao contador name (ex.: acertos de cache em outro processo)"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timings(self) -> Dict[str, float]:
+        """Segundos por etapa (etapas repetidas são somadas)"""
+        timings = {}
+        for stage in self.stages:
+            if stage['seconds'] is not None:
+                timings[stage['stage']] = timings.get(stage['stage'], 0.0) + stage['seconds']
+        return timings
+
+    def cpu_profile(self) -> bytes:
+        """Estatísticas do cProfile no formato de pstats/snakeviz (.prof)"""
+        if self._profile is None:
+            return b''
+        return marshal.dumps(pstats.Stats(self._profile).stats)
+
+    def report(self, top: int = 40) -> str:
+        """Relatório em texto: etapas, funções mais caras e maiores alocações"""
+        output = io.StringIO()
+        output.write("Etapas (pico de memória do processo inteiro)\n" if self.trace_memory else "Etapas\n")
+        for stage in self.stages:
+            peak = '' if stage['peak_bytes'] is None else f"  pico {stage['peak_bytes'] / 1024 / 1024:.2f} MB"
+            output.write(f"{'  ' * stage['depth']}{stage['stage']}: {(stage['seconds'] or 0) * 1000:.1f} ms{peak}\n")
+
+        if self._profile is not None:
+            output.write(f"\ncProfile (top {top} por tempo acumulado)\n")
+            stats = pstats.Stats(self._profile, stream=output)
+            stats.sort_stats('cumulative').print_stats(top)
+
+        if self.snapshot is not None:
+            output.write(f"\ntracemalloc (top {top} linhas por memória alocada no processo)\n")
+            for stat in self.snapshot.statistics('lineno')[:top]:
+                output.write(f"{stat}\n")
+
+        return output.getvalue()
+
+
+class NullProfiler:
+    """Profiler que não mede nada (padrão quando o painel está desligado)"""
+    stages = ()
+    total_seconds = None
+    trace_memory = False
+    shared_peaks = 0
+    counters = {}
+
+    def start(self):
+        return self
+
+    def finish(self):
+        pass
+
+    def begin(self, name: str):
+        pass
+
+    def end(self):
+        pass
+
+    def stage(self, name: str):
+        return nullcontext()
+
+    def merge(self, stages: List[Dict]):
+        pass
+
+    def count(self, name: str, amount: int = 1):
+        pass
+
+    def timings(self) -> Dict[str, float]:
+        return {}
+
+
+NULL_PROFILER = NullProfiler()
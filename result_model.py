@@ -0,0 +1,462 @@
+import json
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from cost_cube import result_cube
+
+# Formato binário: MAGIC + versão (u8) + tamanho do cabeçalho (u32) + cabeçalho JSON,
+# seguido das colunas numéricas alinhadas em 8 bytes (little-endian)
+MAGIC = b'CALC'
+FORMAT_VERSION = 4
+_PREFIX = struct.Struct('<4sBI')
+_ALIGNMENT = 8
+_NAN = float('nan')
+
+# Colunas de índices para a tabela de strings
+STRING_COLUMNS = ('region', 'service_key', 'tipo', 'payment_mode', 'service_name', 'config', 'account')
+# Colunas numéricas e seus typecodes de array
+NUMERIC_COLUMNS = (
+    ('region', 'i'), ('service_key', 'i'), ('tipo', 'i'), ('payment_mode', 'i'),
+    ('service_name', 'i'), ('config', 'i'), ('account', 'i'), ('quantidade', 'q'), ('cost', 'd'),
+    ('upfront', 'd'), ('spec_offsets', 'i'), ('spec_ids', 'i'),
+)
+# Colunas com um valor por item (spec_offsets tem um a mais e spec_ids, um por spec)
+ITEM_COLUMNS = tuple(name for name, _ in NUMERIC_COLUMNS if name not in ('spec_offsets', 'spec_ids'))
+
+
+class LineItem:
+    """Item reservado compacto: __slots__ no lugar de dict e config referenciada por id
+
+    tipo, service_name e payment_mode são strings internadas e specs é uma
+    tupla compartilhada entre itens com a mesma configuração; o texto da
+    configuração fica uma única vez em result['configs']. account é a chave
+    da conta da linha (ver result['accounts']).
+    """
+    __slots__ = ('tipo', 'quantidade', 'specs', 'payment_mode', 'cost', 'upfront', 'service_name', 'config_id', 'account')
+
+    def __init__(self, tipo: str, quantidade: int, specs: Tuple[str, ...], payment_mode: str, cost: float, upfront: float, service_name: str, config_id: int, account: str = ''):
+        self.tipo = tipo
+        self.quantidade = quantidade
+        self.specs = specs
+        self.payment_mode = payment_mode
+        self.cost = cost
+        self.upfront = upfront
+        self.service_name = service_name
+        self.config_id = config_id
+        self.account = account
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, LineItem):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'LineItem({fields})'
+
+    def __reduce__(self):
+        return (LineItem, self._values())
+
+    def as_dict(self, configs: Sequence[str]) -> Dict:
+        """Item no formato de dict (para exibição/depuração)"""
+        return {
+            'tipo': self.tipo,
+            'quantidade': self.quantidade,
+            'specs': list(self.specs),
+            'payment_mode': self.payment_mode,
+            'cost': self.cost,
+            'upfront': self.upfront,
+            'service_name': self.service_name,
+            'config': configs[self.config_id]
+        }
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _as_column(values, typecode: str) -> Sequence:
+    """Array nativo para a coluna (memoryviews de from_bytes são mantidos sem cópia)"""
+    if isinstance(values, memoryview) and values.format == typecode:
+        return values
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    return array(typecode, values)
+
+
+@dataclass(frozen=True)
+class LineItemColumns:
+    """Itens do resultado em colunas: strings viram índices em uma tabela única"""
+    __slots__ = ('strings',) + tuple(name for name, _ in NUMERIC_COLUMNS)
+
+    strings: Tuple[str, ...]
+    region: Sequence[int]
+    service_key: Sequence[int]
+    tipo: Sequence[int]
+    payment_mode: Sequence[int]
+    service_name: Sequence[int]
+    config: Sequence[int]
+    account: Sequence[int]
+    quantidade: Sequence[int]
+    cost: Sequence[float]
+    upfront: Sequence[float]
+    spec_offsets: Sequence[int]
+    spec_ids: Sequence[int]
+
+    def __len__(self) -> int:
+        return len(self.cost)
+
+    def specs(self, index: int) -> List[str]:
+        """Specs do item na posição index"""
+        ids = self.spec_ids[self.spec_offsets[index]:self.spec_offsets[index + 1]]
+        return [self.strings[i] for i in ids]
+
+    def numeric_columns(self) -> Dict[str, Sequence]:
+        """Colunas numéricas por nome (compartilham o buffer, sem cópia)"""
+        return {name: getattr(self, name) for name, _ in NUMERIC_COLUMNS}
+
+
+@dataclass(frozen=True)
+class AccountPartition:
+    """Agregados de uma conta da exportação, somados na ordem das linhas da conta"""
+    __slots__ = ('key', 'client_name', 'account_id', 'regions', 'total_costs', 'cost_cube', 'rows')
+
+    key: str
+    client_name: str
+    account_id: str
+    regions: Tuple[str, ...]
+    total_costs: Tuple[Tuple[str, float], ...]
+    cost_cube: Tuple[Tuple, ...]
+    rows: int
+
+    @classmethod
+    def from_dict(cls, key: str, partition: Dict) -> 'AccountPartition':
+        return cls(
+            key=key,
+            client_name=partition['client_name'],
+            account_id=partition['account_id'],
+            regions=tuple(sorted(partition['regions'], key=str)),
+            total_costs=tuple(partition['total_costs'].items()),
+            cost_cube=tuple(cube_key + tuple(cell) for cube_key, cell in partition['cost_cube'].items()),
+            rows=partition['rows']
+        )
+
+    def cube(self) -> Dict:
+        return {tuple(row[:3]): list(row[3:]) for row in self.cost_cube}
+
+    def to_dict(self) -> Dict:
+        return {
+            'client_name': self.client_name,
+            'account_id': self.account_id,
+            'regions': set(self.regions),
+            'total_costs': dict(self.total_costs),
+            'cost_cube': self.cube(),
+            'rows': self.rows
+        }
+
+    def _header(self) -> Dict:
+        return {
+            'key': self.key,
+            'client_name': self.client_name,
+            'account_id': self.account_id,
+            'regions': list(self.regions),
+            'total_costs': dict(self.total_costs),
+            'cost_cube': [list(row) for row in self.cost_cube],
+            'rows': self.rows,
+        }
+
+    @classmethod
+    def _from_header(cls, header: Dict) -> 'AccountPartition':
+        return cls(
+            key=header['key'],
+            client_name=header['client_name'],
+            account_id=header['account_id'],
+            regions=tuple(header['regions']),
+            total_costs=tuple(header['total_costs'].items()),
+            cost_cube=tuple(tuple(row) for row in header['cost_cube']),
+            rows=header['rows']
+        )
+
+
+@dataclass(frozen=True)
+class ProcessResult:
+    """Resultado de process_csv imutável, serializável em bytes/JSON e via pickle"""
+    __slots__ = ('client_name', 'account_id', 'regions', 'total_costs', 'cost_cube', 'rows', 'locale', 'items', 'accounts')
+
+    client_name: str
+    account_id: str
+    regions: Tuple[str, ...]
+    total_costs: Tuple[Tuple[str, float], ...]
+    # Linhas (região, service_key, payment_mode, custo, upfront, quantidade, itens)
+    cost_cube: Tuple[Tuple, ...]
+    # Linhas lidas da seção detalhada e idioma da exportação ('pt'/'en')
+    rows: int
+    locale: str
+    items: LineItemColumns
+    # Uma partição por conta da Hierarquia de grupos, na ordem em que aparecem
+    accounts: Tuple[AccountPartition, ...]
+
+    @classmethod
+    def from_dict(cls, result: Dict) -> 'ProcessResult':
+        """Converte o dict de process_csv para o modelo em colunas"""
+        strings = {}
+
+        def intern(value) -> int:
+            if isinstance(value, float) and value != value:
+                value = _NAN  # configs vazias (NaN) compartilham uma única entrada
+            if value not in strings:
+                strings[value] = len(strings)
+            return strings[value]
+
+        columns = {name: array(typecode) for name, typecode in NUMERIC_COLUMNS}
+        columns['spec_offsets'].append(0)
+
+        config_ids = [intern(config) for config in result['configs']]
+
+        for region, services in result['services_by_region'].items():
+            for service_key, instances in services.items():
+                for item in instances:
+                    columns['region'].append(intern(region))
+                    columns['service_key'].append(intern(service_key))
+                    columns['tipo'].append(intern(item.tipo))
+                    columns['payment_mode'].append(intern(item.payment_mode))
+                    columns['service_name'].append(intern(item.service_name))
+                    columns['config'].append(config_ids[item.config_id])
+                    columns['account'].append(intern(item.account))
+                    columns['quantidade'].append(item.quantidade)
+                    columns['cost'].append(item.cost)
+                    columns['upfront'].append(item.upfront)
+                    columns['spec_ids'].extend(intern(spec) for spec in item.specs)
+                    columns['spec_offsets'].append(len(columns['spec_ids']))
+
+        return cls(
+            client_name=result['client_name'],
+            account_id=result['account_id'],
+            regions=tuple(sorted(result['regions'], key=str)),
+            total_costs=tuple(result['total_costs'].items()),
+            cost_cube=tuple(key + tuple(cell) for key, cell in result_cube(result).items()),
+            rows=result.get('rows', 0),
+            locale=result.get('locale'),
+            items=LineItemColumns(strings=tuple(strings), **columns),
+            accounts=tuple(AccountPartition.from_dict(key, partition) for key, partition in result.get('accounts', {}).items())
+        )
+
+    def cube(self) -> Dict:
+        """Cubo de custos no formato de cost_cube: (região, service_key, payment_mode) -> célula"""
+        return {tuple(row[:3]): list(row[3:]) for row in self.cost_cube}
+
+    def partition(self, key: str) -> 'ProcessResult':
+        """Resultado de uma única conta: os itens dela e os agregados da partição
+
+        Os totais e o cubo vêm da partição (somados na ordem das linhas da
+        conta), então são os mesmos de processar só as linhas dessa conta.
+        """
+        account = next((account for account in self.accounts if account.key == key), None)
+        if account is None:
+            raise KeyError(key)
+        return next(self._partitions((account,)))[1]
+
+    def partitions(self) -> Iterator[Tuple[str, 'ProcessResult']]:
+        """(conta, resultado da conta) de todas as partições, na ordem de accounts
+
+        Os itens são separados por conta em um único passe, em vez de um
+        passe por conta como em chamadas sucessivas de partition().
+        """
+        return self._partitions(self.accounts)
+
+    def _partitions(self, accounts: Sequence[AccountPartition]) -> Iterator[Tuple[str, 'ProcessResult']]:
+        items = self.items
+        string_ids = {value: index for index, value in enumerate(items.strings)}
+        selected = {string_ids.get(account.key): [] for account in accounts}
+        for index, value in enumerate(items.account.tolist()):
+            indices = selected.get(value)
+            if indices is not None:
+                indices.append(index)
+
+        typecodes = dict(NUMERIC_COLUMNS)
+        values = {name: getattr(items, name).tolist() for name in ITEM_COLUMNS}
+        offsets = items.spec_offsets.tolist()
+        spec_ids = items.spec_ids.tolist()
+
+        for account in accounts:
+            indices = selected.get(string_ids.get(account.key), [])
+            columns = {
+                name: array(typecodes[name], [column[index] for index in indices])
+                for name, column in values.items()
+            }
+            columns['spec_offsets'] = array('i', [0])
+            columns['spec_ids'] = array('i')
+            for index in indices:
+                columns['spec_ids'].extend(spec_ids[offsets[index]:offsets[index + 1]])
+                columns['spec_offsets'].append(len(columns['spec_ids']))
+
+            yield account.key, ProcessResult(
+                client_name=account.client_name,
+                account_id=account.account_id,
+                regions=account.regions,
+                total_costs=account.total_costs,
+                cost_cube=account.cost_cube,
+                rows=account.rows,
+                locale=self.locale,
+                items=LineItemColumns(strings=items.strings, **columns),
+                accounts=(account,)
+            )
+
+    def to_dict(self) -> Dict:
+        """Reconstrói o dict no formato de process_csv"""
+        items = self.items
+        strings = [sys.intern(value) if isinstance(value, str) else value for value in items.strings]
+        offsets = items.spec_offsets.tolist()
+        spec_ids = items.spec_ids.tolist()
+        specs_cache = {}
+        config_ids = {}
+        services_by_region = {}
+
+        rows = zip(
+            items.region.tolist(), items.service_key.tolist(), items.tipo.tolist(),
+            items.quantidade.tolist(), items.payment_mode.tolist(), items.cost.tolist(),
+            items.upfront.tolist(), items.service_name.tolist(), items.config.tolist(), items.account.tolist()
+        )
+        for index, (region, service_key, tipo, quantidade, payment_mode, cost, upfront, service_name, config, account) in enumerate(rows):
+            region_services = services_by_region.get(strings[region])
+            if region_services is None:
+                region_services = services_by_region[strings[region]] = {}
+
+            # Tuplas de specs iguais são compartilhadas entre os itens
+            spec_key = tuple(spec_ids[offsets[index]:offsets[index + 1]])
+            specs = specs_cache.get(spec_key)
+            if specs is None:
+                specs = specs_cache[spec_key] = tuple(strings[i] for i in spec_key)
+
+            region_services.setdefault(strings[service_key], []).append(LineItem(
+                strings[tipo], quantidade, specs, strings[payment_mode], cost, upfront,
+                strings[service_name], config_ids.setdefault(config, len(config_ids)), strings[account]
+            ))
+
+        data = self.overview()
+        data['services_by_region'] = services_by_region
+        data['configs'] = [strings[config] for config in config_ids]
+        data['accounts'] = {account.key: account.to_dict() for account in self.accounts}
+        return data
+
+    def overview(self) -> Dict:
+        """Campos agregados do dict de process_csv, sem reconstruir os itens
+
+        Basta para métricas, gráfico e tabelas por região; generate_summary
+        precisa dos itens (to_dict).
+        """
+        return {
+            'client_name': self.client_name,
+            'account_id': self.account_id,
+            'regions': set(self.regions),
+            'total_costs': dict(self.total_costs),
+            'cost_cube': self.cube(),
+            'rows': self.rows,
+            'locale': self.locale
+        }
+
+    def _header(self) -> Dict:
+        return {
+            'client_name': self.client_name,
+            'account_id': self.account_id,
+            'regions': list(self.regions),
+            'total_costs': dict(self.total_costs),
+            'cost_cube': [list(row) for row in self.cost_cube],
+            'rows': self.rows,
+            'locale': self.locale,
+            'accounts': [account._header() for account in self.accounts],
+            'strings': list(self.items.strings),
+        }
+
+    def to_json(self) -> str:
+        """Serializa em JSON (floats em repr, portanto sem perda)"""
+        document = {'format': MAGIC.decode(), 'version': FORMAT_VERSION}
+        document.update(self._header())
+        document['columns'] = {name: list(values) for name, values in self.items.numeric_columns().items()}
+        return json.dumps(document, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> 'ProcessResult':
+        document = json.loads(text)
+        if document.get('format') != MAGIC.decode() or document.get('version') != FORMAT_VERSION:
+            raise ValueError("Formato de resultado JSON não suportado")
+        return cls._from_parts(document, document['columns'])
+
+    def to_bytes(self) -> bytes:
+        """Serializa em bytes: cabeçalho JSON + colunas numéricas cruas"""
+        layout = []
+        buffers = []
+        offset = 0
+        for name, values in self.items.numeric_columns().items():
+            column = _as_column(values, dict(NUMERIC_COLUMNS)[name])
+            if sys.byteorder != 'little':
+                column = array(column.typecode if isinstance(column, array) else column.format, column)
+                column.byteswap()
+            offset = _aligned(offset)
+            data = memoryview(column).cast('B')
+            layout.append([name, offset, data.nbytes])
+            buffers.append((offset, data))
+            offset += data.nbytes
+
+        header = self._header()
+        header['layout'] = layout
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        body_start = _aligned(_PREFIX.size + len(header_bytes))
+
+        output = bytearray(body_start + offset)
+        _PREFIX.pack_into(output, 0, MAGIC, FORMAT_VERSION, len(header_bytes))
+        output[_PREFIX.size:_PREFIX.size + len(header_bytes)] = header_bytes
+        for column_offset, data in buffers:
+            output[body_start + column_offset:body_start + column_offset + data.nbytes] = data
+        return bytes(output)
+
+    @classmethod
+    def from_bytes(cls, data) -> 'ProcessResult':
+        """Desserializa sem copiar as colunas: elas viram memoryviews sobre data"""
+        view = memoryview(data)
+        magic, version, header_size = _PREFIX.unpack_from(view, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Formato de resultado binário não suportado")
+
+        header = json.loads(bytes(view[_PREFIX.size:_PREFIX.size + header_size]).decode('utf-8'))
+        body_start = _aligned(_PREFIX.size + header_size)
+        typecodes = dict(NUMERIC_COLUMNS)
+
+        columns = {}
+        for name, offset, size in header['layout']:
+            raw = view[body_start + offset:body_start + offset + size]
+            if sys.byteorder != 'little':
+                column = array(typecodes[name], bytes(raw))
+                column.byteswap()
+                columns[name] = column
+            else:
+                columns[name] = raw.cast(typecodes[name])
+        return cls._from_parts(header, columns)
+
+    @classmethod
+    def _from_parts(cls, header: Dict, columns: Dict) -> 'ProcessResult':
+        typecodes = dict(NUMERIC_COLUMNS)
+        return cls(
+            client_name=header['client_name'],
+            account_id=header['account_id'],
+            regions=tuple(header['regions']),
+            total_costs=tuple(header['total_costs'].items()),
+            cost_cube=tuple(tuple(row) for row in header['cost_cube']),
+            rows=header['rows'],
+            locale=header['locale'],
+            items=LineItemColumns(
+                strings=tuple(header['strings']),
+                **{name: _as_column(columns[name], typecodes[name]) for name in typecodes}
+            ),
+            accounts=tuple(AccountPartition._from_header(account) for account in header['accounts'])
+        )
+
+    def __reduce__(self):
+        # Pickle de um único blob de bytes: barato e compatível com __slots__ congelados
+        return (ProcessResult.from_bytes, (self.to_bytes(),))
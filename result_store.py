@@ -0,0 +1,236 @@
+"""Armazenamento persistente de resultados, endereçado pelo conteúdo (SQLite)
+
+Guarda o ProcessResult serializado (to_bytes) de cada upload processado e os
+resumos já gerados a partir dele, de modo que reenviar a mesma exportação,
+mesmo depois de um restart ou em outra réplica que use o mesmo arquivo, não
+passa pelo parse. A chave é o SHA-256 do upload mais as opções que alteram o
+resultado (pagamento de Lambda/Fargate, versão da tabela de descontos, do
+pipeline e do formato do ProcessResult); os resumos levam também a versão do
+texto gerado. Mudanças no processamento ou no resumo incrementam
+PIPELINE_VERSION (processing.py) ou SUMMARY_VERSION (summary.py), e as
+entradas antigas deixam de ser encontradas.
+
+O tamanho total é limitado: ao passar de max_bytes, as entradas acessadas há
+mais tempo são removidas (LRU) com seus resumos. O arquivo é definido por
+RESULT_STORE_PATH (padrão: result_store.sqlite3; vazio desliga) e o limite por
+RESULT_STORE_MAX_MB (padrão: 512). O SQLite depende de lock de arquivo: use
+disco local ou um volume compartilhado com locks confiáveis.
+
+Estatísticas e limpeza offline:
+    python result_store.py [result_store.sqlite3] [--clear]
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from processing import PIPELINE_VERSION
+from result_model import FORMAT_VERSION, ProcessResult
+from summary import SUMMARY_VERSION
+
+DEFAULT_RESULT_STORE_PATH = 'result_store.sqlite3'
+MB = 1024 * 1024
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at);
+CREATE TABLE IF NOT EXISTS summaries (
+    key TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (key, variant)
+);
+'''
+
+
+def result_key(file_digest: str, lambda_payment_option: str, fargate_payment_option: str, rules_version: str) -> str:
+    """Chave de um resultado: hash do upload + opções que alteram o processamento"""
+    hasher = hashlib.sha256()
+    for part in (file_digest, lambda_payment_option, fargate_payment_option, rules_version, PIPELINE_VERSION, FORMAT_VERSION):
+        hasher.update(str(part).encode('utf-8'))
+        hasher.update(b'\x00')
+    return hasher.hexdigest()
+
+
+def summary_variant(exchange_rate: float, tax_rate: float, account: str = None) -> str:
+    """Versão do texto e parâmetros do resumo que não fazem parte da chave do resultado (e a conta, se for de uma partição)"""
+    variant = f"{SUMMARY_VERSION}|{exchange_rate!r}|{tax_rate!r}"
+    return variant if account is None else f"{variant}|{account}"
+
+
+class ResultStore:
+    """Resultados e resumos em um arquivo SQLite, com remoção LRU por tamanho
+
+    Cada operação abre a própria conexão, então a instância pode ser usada
+    por várias threads (sessões) e por vários processos sobre o mesmo arquivo.
+    hits e misses contam só as consultas deste processo.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 512 * MB):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[ProcessResult]:
+        with self._connect() as connection:
+            row = connection.execute('SELECT data FROM results WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                connection.execute('UPDATE results SET accessed_at = ?, hits = hits + 1 WHERE key = ?', (time.time(), key))
+        self._count(row is not None)
+        return None if row is None else ProcessResult.from_bytes(row[0])
+
+    def put(self, key: str, result: ProcessResult):
+        data = result.to_bytes()
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO results (key, data, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                (key, data, len(data), now, now)
+            )
+            self._evict(connection)
+
+    def get_summary(self, key: str, variant: str) -> Optional[str]:
+        with self._connect() as connection:
+            row = connection.execute('SELECT summary FROM summaries WHERE key = ? AND variant = ?', (key, variant)).fetchone()
+        return None if row is None else row[0]
+
+    def put_summary(self, key: str, variant: str, summary: str):
+        """Guarda um resumo (ignorado se o resultado da chave não estiver armazenado)"""
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO summaries (key, variant, summary, size) '
+                'SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM results WHERE key = ?)',
+                (key, variant, summary, len(summary.encode('utf-8')), key)
+            )
+            self._evict(connection)
+
+    def _evict(self, connection: sqlite3.Connection):
+        """Remove as entradas acessadas há mais tempo até caber em max_bytes"""
+        total = self._total_bytes(connection)
+        if total <= self.max_bytes:
+            return
+        rows = connection.execute(
+            'SELECT r.key, r.size + COALESCE((SELECT SUM(s.size) FROM summaries s WHERE s.key = r.key), 0) '
+            'FROM results r ORDER BY r.accessed_at'
+        )
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        connection.executemany('DELETE FROM results WHERE key = ?', evicted)
+        connection.executemany('DELETE FROM summaries WHERE key = ?', evicted)
+
+    @staticmethod
+    def _total_bytes(connection: sqlite3.Connection) -> int:
+        return connection.execute(
+            'SELECT (SELECT COALESCE(SUM(size), 0) FROM results) + (SELECT COALESCE(SUM(size), 0) FROM summaries)'
+        ).fetchone()[0]
+
+    def stats(self) -> Dict:
+        with self._connect() as connection:
+            entries, stored_hits, oldest, newest = connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(hits), 0), MIN(accessed_at), MAX(accessed_at) FROM results'
+            ).fetchone()
+            summaries = connection.execute('SELECT COUNT(*) FROM summaries').fetchone()[0]
+            total = self._total_bytes(connection)
+        return {
+            'path': self.path,
+            'entries': entries,
+            'summaries': summaries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'stored_hits': stored_hits,
+            'hits': self.hits,
+            'misses': self.misses,
+            'oldest_access': oldest,
+            'newest_access': newest,
+        }
+
+    def largest(self, limit: int = 10) -> List[Dict]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                'SELECT key, size, hits, accessed_at FROM results ORDER BY size DESC LIMIT ?', (limit,)
+            ).fetchall()
+        return [{'key': key, 'size': size, 'hits': hits, 'accessed_at': accessed_at} for key, size, hits, accessed_at in rows]
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute('DELETE FROM results')
+            connection.execute('DELETE FROM summaries')
+
+
+def open_store() -> Optional[ResultStore]:
+    """Store configurado pelo ambiente (None se RESULT_STORE_PATH estiver vazio)"""
+    path = os.environ.get('RESULT_STORE_PATH', DEFAULT_RESULT_STORE_PATH)
+    if not path:
+        return None
+    return ResultStore(path, int(float(os.environ.get('RESULT_STORE_MAX_MB', 512)) * MB))
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Estatísticas do armazenamento persistente de resultados.")
+    parser.add_argument('path', nargs='?', default=os.environ.get('RESULT_STORE_PATH') or DEFAULT_RESULT_STORE_PATH)
+    parser.add_argument('--clear', action='store_true', help="Remove todas as entradas")
+    parser.add_argument('--top', type=int, default=10, help="Quantas entradas maiores listar")
+    args = parser.parse_args(argv)
+
+    store = ResultStore(args.path)
+    if args.clear:
+        store.clear()
+        print(f"{args.path}: entradas removidas.")
+        return
+
+    stats = store.stats()
+    print(f"{stats['path']}: {stats['entries']} resultados, {stats['summaries']} resumos")
+    print(f"Tamanho: {stats['bytes'] / MB:.1f} MB (limite do app: RESULT_STORE_MAX_MB)")
+    print(f"Acertos acumulados: {stats['stored_hits']}")
+    if stats['oldest_access'] is not None:
+        print(f"Acessos: de {time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['oldest_access']))} "
+              f"a {time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['newest_access']))}")
+
+    entries = store.largest(args.top)
+    if entries:
+        print("\nMaiores:")
+        for entry in entries:
+            print(f"{entry['size'] / 1024:10.1f} KB  {entry['hits']:>5} acertos  {entry['key'][:16]}")
+
+
+if __name__ == '__main__':
+    main()
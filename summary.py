@@ -0,0 +1,199 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from cost_cube import result_cube, section_totals
+
+# Versão do texto gerado, parte da chave dos resumos persistidos (result_store):
+# incremente a cada mudança em generate_summary ou nos modelos por serviço
+SUMMARY_VERSION = 1
+
+
+def _ec2_item(instance) -> str:
+    specs = instance.specs
+    pricing_strategy = specs[0] if len(specs) > 0 else 'N/A'
+    os_system = specs[1] if len(specs) > 1 else 'N/A'
+    return f"-{instance.quantidade} - {instance.tipo} ({pricing_strategy}, {os_system})\n"
+
+
+def _rds_item(instance) -> str:
+    specs = instance.specs
+    az = specs[0] if len(specs) > 0 else 'N/A'
+    period = specs[2] if len(specs) > 2 else 'N/A'
+    engine = specs[3] if len(specs) > 3 else 'N/A'
+    # Usar payment_mode em vez de specs[1]
+    return f"-{instance.quantidade} - {instance.tipo} ({az}, {instance.payment_mode}, {period}, {engine})\n"
+
+
+def _elasticache_item(instance) -> str:
+    specs = instance.specs
+    period = specs[1] if len(specs) > 1 else 'N/A'
+    cache_engine = specs[2] if len(specs) > 2 else 'N/A'
+    # Usar payment_mode em vez de specs[0]
+    return f"-{instance.quantidade} - {instance.tipo} ({instance.payment_mode}, {period}, {cache_engine})\n"
+
+
+def _fargate_item(instance) -> str:
+    specs = instance.specs
+    architecture = specs[0] if len(specs) > 0 else 'x86'
+    os_system = specs[1] if len(specs) > 1 else 'Linux'
+    return f"Configuração: {os_system} {architecture}\n"
+
+
+@dataclass(frozen=True)
+class SectionTemplate:
+    """Modelo de uma seção de serviço no resumo
+
+    header é formatado com account_id, region_name, count, lambda_payment e
+    fargate_payment; render_item gera a linha de cada item. all_upfront_multiplier
+    converte o custo All Upfront para o valor anual (12 para Lambda e Fargate).
+    """
+    header: str
+    render_item: Callable = None
+    all_upfront_multiplier: int = 1
+    monthly_only: bool = False
+
+
+SECTION_TEMPLATES = {
+    'EC2': SectionTemplate(
+        header="EC2 Instances - {count:02d} instâncias - Conta AWS {account_id}\nTipos de Instancias:\n",
+        render_item=_ec2_item
+    ),
+    'RDS': SectionTemplate(
+        header="RDS - {count:02d} instâncias - Conta AWS {account_id}\nTipos de Instancias:\n",
+        render_item=_rds_item
+    ),
+    'ElastiCache': SectionTemplate(
+        header="ElastiCache - {count:02d} nós - Conta AWS {account_id}\nTipos de Instancias:\n",
+        render_item=_elasticache_item
+    ),
+    'CloudFront': SectionTemplate(
+        header="CloudFront - Conta AWS {account_id}\nPeríodo: 1 ano\nForma de pagamento: No Upfront em 12x pela AWS\n",
+        monthly_only=True
+    ),
+    'Lambda': SectionTemplate(
+        header="Lambda - Conta AWS {account_id}\nForma de pagamento: {lambda_payment}\n",
+        all_upfront_multiplier=12
+    ),
+    'Fargate': SectionTemplate(
+        header="ECS fargate - {region_name} - Conta AWS {account_id}\nPeríodo: 1 ano\nForma de pagamento: {fargate_payment}\n",
+        render_item=_fargate_item,
+        all_upfront_multiplier=12
+    ),
+}
+
+# Ordem das seções dentro de cada região
+SERVICE_ORDER = ('EC2', 'RDS', 'ElastiCache', 'CloudFront', 'Lambda', 'Fargate')
+
+
+def region_display_name(region: str) -> str:
+    """Nome curto da região usado no resumo"""
+    if "N. da Virgínia" in region or "N. Virginia" in region or "Leste dos EUA" in region:
+        return "N. Virginia"
+    if "São Paulo" in region or "América do Sul" in region:
+        return "São Paulo"
+    return region
+
+
+def _render_section(parts: List[str], template: SectionTemplate, instances: List, no_upfront_cost: float, all_upfront_cost: float, count: int, context: Dict, lines: Dict):
+    parts.append(template.header.format(count=count, **context))
+
+    if template.render_item is not None:
+        # Itens iguais (mesmo tipo, quantidade, specs e pagamento) reutilizam a linha já gerada
+        render_item = template.render_item
+        rendered = lines.setdefault(template, {})
+        for instance in instances:
+            key = (instance.quantidade, instance.tipo, instance.specs, instance.payment_mode)
+            line = rendered.get(key)
+            if line is None:
+                line = rendered[key] = render_item(instance)
+            parts.append(line)
+
+    if template.monthly_only:
+        parts.append(f"Valor total mensal: USD {no_upfront_cost:,.2f} (sem impostos)\n")
+        return
+    if no_upfront_cost > 0:
+        parts.append(f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n")
+    if all_upfront_cost > 0:
+        parts.append(f"Valor total All Upfront: USD {all_upfront_cost * template.all_upfront_multiplier:,.2f}/ano\n")
+
+
+def generate_summary(data: Dict, exchange_rate: float, tax_rate: float = 13.83, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS") -> str:
+    """Gera o resumo formatado baseado nos modelos
+
+    Os trechos são acumulados em uma lista e unidos uma única vez no final;
+    os totais de cada seção vêm do cubo de custos do resultado.
+    """
+    client_name = data['client_name']
+    account_id = data['account_id']
+
+    cube = result_cube(data)
+    lines = {}
+    parts = [f"Resumos dos recursos a serem reservados\n{client_name} - {account_id}\n\n"]
+
+    # Totais por tipo de pagamento
+    total_no_upfront = 0
+    total_all_upfront = 0
+
+    # Processar por região
+    for region in sorted(data['regions']):
+        if region not in data['services_by_region']:
+            continue
+
+        region_name = region_display_name(region)
+        parts.append(f"{region_name}\n")
+
+        services = data['services_by_region'][region]
+        context = {
+            'account_id': account_id,
+            'region_name': region_name,
+            'lambda_payment': lambda_payment_option,
+            'fargate_payment': fargate_payment_option,
+        }
+
+        for service_type in SERVICE_ORDER:
+            instances = services.get(service_type)
+            if not instances:
+                continue
+
+            template = SECTION_TEMPLATES[service_type]
+
+            no_upfront_cost, all_upfront_cost, count = section_totals(cube, region, service_type)
+
+            total_no_upfront += no_upfront_cost
+            # Para Lambda e Fargate All Upfront, multiplicar por 12 no total geral
+            total_all_upfront += all_upfront_cost * template.all_upfront_multiplier
+
+            _render_section(parts, template, instances, no_upfront_cost, all_upfront_cost, count, context, lines)
+            parts.append("\n")
+
+    # Resumo financeiro
+    if total_all_upfront > 0:
+        all_upfront_taxes = total_all_upfront * (tax_rate / 100)
+        all_upfront_with_taxes = total_all_upfront + all_upfront_taxes
+        all_upfront_brl = all_upfront_with_taxes * exchange_rate
+        all_upfront_parcela = all_upfront_brl / 6
+
+        parts.append(
+            "Resumo financeiro All Upfront:\n"
+            f"Valor total (sem imposto): USD {total_all_upfront:,.2f}/ano\n"
+            f"Impostos: USD {all_upfront_taxes:,.2f}/ano\n"
+            f"Valor do dólar (aproximado): R$ {exchange_rate:.2f}\n"
+            f"Valor total em reais (com imposto): R$ {all_upfront_brl:,.2f}/ano\n"
+            f"Parcelamento TdSynnex(com imposto): 06x R$ {all_upfront_parcela:,.2f} via TdSynnex\n\n"
+        )
+
+    if total_no_upfront > 0:
+        no_upfront_annual = total_no_upfront * 12
+        no_upfront_taxes = no_upfront_annual * (tax_rate / 100)
+        no_upfront_with_taxes = no_upfront_annual + no_upfront_taxes
+        no_upfront_brl_monthly = no_upfront_with_taxes * exchange_rate / 12
+
+        parts.append(
+            "Resumo financeiro No Upfront:\n"
+            f"Valor total (sem imposto): USD {no_upfront_annual:,.2f}/ano\n"
+            f"Impostos: USD {no_upfront_taxes:,.2f}/ano\n"
+            f"Valor do dólar (aproximado): R$ {exchange_rate:.2f}\n"
+            f"Valor total em reais (com imposto): 12x R$ {no_upfront_brl_monthly:,.2f} via AWS\n"
+        )
+
+    return ''.join(parts)
@@ -0,0 +1,180 @@
+"""Telemetria em JSON lines: um registro por estimativa processada
+
+Os registros são enfileirados e gravados em lote por uma thread em segundo
+plano, sem bloquear quem os emite. O arquivo é definido pela variável de
+ambiente TELEMETRY_FILE (padrão: telemetry.jsonl); vazia desliga a telemetria.
+
+Relatório offline (latência p50/p95/p99 e arquivos mais lentos):
+    python telemetry.py telemetry.jsonl [--top 10]
+"""
+import argparse
+import atexit
+import json
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List
+
+from cost_cube import result_cube, service_mix
+
+DEFAULT_TELEMETRY_FILE = 'telemetry.jsonl'
+
+# Marcador de fim da fila (pedidos de flush chegam como threading.Event)
+_STOP = object()
+
+
+class TelemetrySink:
+    """Grava registros em um arquivo JSON lines a partir de uma thread dedicada
+
+    emit() nunca bloqueia: com a fila cheia o registro é descartado e contado
+    em dropped. Falhas de escrita são contadas em errors e não propagam.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 1.0, max_queue: int = 10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.errors = 0
+        self._queue = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._run, name='telemetry-sink', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def emit(self, record: Dict):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0):
+        """Espera a gravação de tudo o que foi emitido até agora"""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            # Junta o que já estiver na fila em um único lote
+            batch, events, stop = [], [], False
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._write(batch)
+            for event in events:
+                event.set()
+            if stop:
+                return
+
+    def _write(self, batch: List[Dict]):
+        if not batch:
+            return
+        try:
+            lines = ''.join(json.dumps(record, default=str) + '\n' for record in batch)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        except Exception:
+            self.errors += len(batch)
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_sink():
+    """Sink do processo, criado na primeira chamada (None se a telemetria estiver desligada)"""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            path = os.environ.get('TELEMETRY_FILE', DEFAULT_TELEMETRY_FILE)
+            _sink = TelemetrySink(path) if path else False
+        return _sink or None
+
+
+def emit(record: Dict):
+    sink = get_sink()
+    if sink is not None:
+        sink.emit(record)
+
+
+def estimate_record(source: str, content_hash: str, size: int, data: Dict = None, timings: Dict[str, float] = None, total_seconds: float = None, cache_hits: Dict = None, error: BaseException = None, file_name: str = None) -> Dict:
+    """Monta o registro de uma estimativa processada (data é o dict de process_csv)"""
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+        'source': source,
+        'file': file_name,
+        'content_hash': content_hash,
+        'bytes': size,
+        'rows': data.get('rows') if data else None,
+        'locale': data.get('locale') if data else None,
+        'total_seconds': None if total_seconds is None else round(total_seconds, 6),
+        'stages': {stage: round(seconds, 6) for stage, seconds in (timings or {}).items()},
+        'cache_hits': cache_hits or {},
+        'service_mix': service_mix(result_cube(data)) if data else {},
+        'error': type(error).__name__ if error is not None else None,
+    }
+
+
+def read_records(path: str) -> Iterable[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentil pelo posto mais próximo (values já ordenados)"""
+    if not values:
+        return float('nan')
+    rank = max(1, int(-(-q * len(values) // 100)))
+    return values[rank - 1]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Latência e arquivos mais lentos a partir da telemetria.")
+    parser.add_argument('path', nargs='?', default=os.environ.get('TELEMETRY_FILE') or DEFAULT_TELEMETRY_FILE)
+    parser.add_argument('--top', type=int, default=10, help="Quantos arquivos lentos listar")
+    args = parser.parse_args(argv)
+
+    records = [record for record in read_records(args.path) if record.get('total_seconds') is not None]
+    if not records:
+        print("Nenhum registro com tempo total.")
+        return
+
+    latencies = sorted(record['total_seconds'] for record in records)
+    errors = sum(1 for record in records if record.get('error'))
+    print(f"Registros: {len(records)} ({errors} com erro)")
+    for q in (50, 95, 99):
+        print(f"p{q}: {percentile(latencies, q) * 1000:.1f} ms")
+
+    print("\nMais lentos:")
+    for record in sorted(records, key=lambda record: record['total_seconds'], reverse=True)[:args.top]:
+        slowest = max(record['stages'].items(), key=lambda item: item[1], default=('-', 0))
+        print(f"{record['total_seconds'] * 1000:9.1f} ms  {record.get('rows') or 0:>8} linhas  "
+              f"{(record.get('content_hash') or '')[:12]}  {record.get('file') or ''}  (etapa mais lenta: {slowest[0]})")
+
+
+if __name__ == '__main__':
+    main()
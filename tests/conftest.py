@@ -0,0 +1,42 @@
+"""Exportações sintéticas da Calculadora AWS usadas pelos testes"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Sem telemetria nem store em disco durante os testes
+os.environ['TELEMETRY_FILE'] = ''
+os.environ['RESULT_STORE_PATH'] = ''
+
+import pytest
+
+HEADER_PT = 'Hierarquia de grupos,Região,Descrição,Serviço,Pagamento adiantado,Mensal,Primeiros 12 meses no total,Moeda,Status,Resumo da configuração'
+
+ROWS_A = [
+    'Cliente A - 111111111111 > No Upfront,"América do Sul (São Paulo)",,Amazon EC2,0,120.5,1446,USD,,"Número de instâncias: 2, Instância do EC2 avançada (m5.xlarge), Pricing strategy (EC2 Instance Savings Plans 1 Year No Upfront), Sistema operacional (Linux)"',
+    'Cliente A - 111111111111 > All Upfront,"Leste dos EUA (N. da Virgínia)",,Amazon RDS for PostgreSQL,1500,0,1500,USD,,"Nós (1), Tipo de instância (db.r6g.large), Implantação (Multi-AZ), Modelo de preços (Reserved), Termo (1 year), Opção de compra (All Upfront), Quantidade de armazenamento (20 GB)"',
+    'Cliente A - 111111111111 > No Upfront,"América do Sul (São Paulo)",,AWS Lambda,0,45.2,542.4,USD,,"Arquitetura (ARM), Número de solicitações (1000000)"',
+]
+
+ROWS_B = [
+    'Cliente B - 222222222222 > All Upfront,"América do Sul (São Paulo)",,Amazon ElastiCache,900,0,900,USD,,"Nós (2), Tipo de instância (cache.r6g.large), Mecanismo (Valkey), Opção (Heavy Utilization)"',
+    'Cliente B - 222222222222 > No Upfront,"América do Sul (São Paulo)",,Amazon EC2,0,60.25,723,USD,,"Número de instâncias: 1, Instância do EC2 avançada (m5.large), Pricing strategy (EC2 Instance Savings Plans 1 Year No Upfront), Sistema operacional (Linux)"',
+    'Cliente B - 222222222222 > No Upfront,"Leste dos EUA (N. da Virgínia)",,AWS Fargate,0,80,960,USD,,"Sistema operacional (Linux), Arquitetura da CPU (ARM)"',
+]
+
+
+def export_pt(rows) -> bytes:
+    """Exportação em português com as linhas informadas na seção detalhada"""
+    lines = ['﻿Estimativa', 'Exportar data,2025-01-01', '', 'Estimativa detalhada', HEADER_PT, *rows, '', 'Confirmação', 'Teste']
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+@pytest.fixture
+def write_export(tmp_path):
+    """Grava uma exportação em tmp_path e devolve o caminho"""
+    def write(name: str, rows=None, content: bytes = None) -> str:
+        path = tmp_path / name
+        path.write_bytes(content if content is not None else export_pt(rows))
+        return str(path)
+    return write
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, estimate_cost
+
+
+class Job(threading.Thread):
+    """Upload de size bytes que fica admitido até release ser sinalizado"""
+
+    def __init__(self, controller, name, size, started):
+        super().__init__(daemon=True)
+        self.controller, self.name, self.size, self.started = controller, name, size, started
+        self.positions = []
+        self.release = threading.Event()
+
+    def run(self):
+        with self.controller.admit(self.size, on_wait=self.positions.append):
+            self.started.append(self.name)
+            self.release.wait(5)
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condição não atingida"
+        time.sleep(0.005)
+
+
+def controller(**kwargs):
+    return AdmissionController(poll_interval=0.01, **kwargs)
+
+
+def test_small_uploads_bypass_the_queue():
+    admission = controller(max_heavy_jobs=1, memory_budget=10 ** 9, heavy_bytes=100)
+    with admission.admit(99):
+        with admission.admit(99):
+            assert admission.stats()['running'] == 0
+
+
+def test_heavy_uploads_start_in_fifo_order():
+    admission = controller(max_heavy_jobs=1, memory_budget=10 ** 9, heavy_bytes=1)
+    started = []
+    first = Job(admission, 'a', 10, started)
+    first.start()
+    wait_until(lambda: started == ['a'])
+
+    waiting = [Job(admission, name, 10, started) for name in 'bcd']
+    for job in waiting:
+        job.start()
+        wait_until(lambda: admission.stats()['waiting'] == waiting.index(job) + 1)
+    wait_until(lambda: [job.positions for job in waiting] == [[1], [2], [3]])
+
+    for job in [first] + waiting:
+        job.release.set()
+        job.join(5)
+    assert started == ['a', 'b', 'c', 'd']
+    # a posição só é informada quando muda e só diminui
+    positions = waiting[2].positions
+    assert positions[0] == 3 and positions == sorted(set(positions), reverse=True)
+    assert admission.stats() == {'running': 0, 'waiting': 0, 'running_cost': 0, 'memory_budget': 10 ** 9}
+
+
+def test_memory_budget_holds_back_a_second_job():
+    budget = estimate_cost(100) + estimate_cost(50)
+    admission = controller(max_heavy_jobs=3, memory_budget=budget, heavy_bytes=1)
+    started = []
+    big, medium, small = Job(admission, 'big', 100, started), Job(admission, 'medium', 51, started), Job(admission, 'small', 50, started)
+    big.start()
+    wait_until(lambda: started == ['big'])
+    medium.start()
+    small.start()
+    wait_until(lambda: admission.stats()['waiting'] == 2)
+    # small caberia no orçamento, mas a fila é FIFO: espera medium
+    time.sleep(0.05)
+    assert started == ['big']
+
+    big.release.set()
+    wait_until(lambda: len(started) == 3)
+    assert started == ['big', 'medium', 'small']
+    assert admission.stats()['running_cost'] == estimate_cost(51) + estimate_cost(50)
+    for job in (big, medium, small):
+        job.release.set()
+        job.join(5)
+
+
+def test_oversized_upload_runs_alone():
+    admission = controller(max_heavy_jobs=2, memory_budget=estimate_cost(10), heavy_bytes=1)
+    started = []
+    huge, after = Job(admission, 'huge', 1000, started), Job(admission, 'after', 10, started)
+    huge.start()
+    wait_until(lambda: started == ['huge'])
+    assert admission.stats()['running_cost'] > admission.memory_budget
+
+    after.start()
+    wait_until(lambda: admission.stats()['waiting'] == 1)
+    time.sleep(0.05)
+    assert started == ['huge']
+
+    huge.release.set()
+    wait_until(lambda: started == ['huge', 'after'])
+    after.release.set()
+    for job in (huge, after):
+        job.join(5)
+
+
+def test_interrupted_wait_leaves_the_queue():
+    admission = controller(max_heavy_jobs=1, memory_budget=10 ** 9, heavy_bytes=1)
+    started = []
+    first = Job(admission, 'a', 10, started)
+    first.start()
+    wait_until(lambda: started == ['a'])
+
+    def interrupt(position):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        with admission.admit(10, on_wait=interrupt):
+            pass
+    assert admission.stats()['waiting'] == 0
+
+    first.release.set()
+    first.join(5)
+    assert admission.stats()['running'] == 0
@@ -0,0 +1,52 @@
+import csv
+import multiprocessing
+import os
+
+import pytest
+
+import batch
+from batch import PAYMENT_CHOICES, run_batch, write_index
+from conftest import ROWS_A, ROWS_B
+
+OPTIONS = (5.50, 13.83, PAYMENT_CHOICES['no-upfront'], PAYMENT_CHOICES['no-upfront'])
+
+
+def test_consolidated_export_gets_one_summary_per_account(write_export, tmp_path):
+    files = [
+        write_export('consolidado.csv', ROWS_A + ROWS_B),
+        write_export('invalido.csv', content=b'Estimativa\n'),
+        write_export('unica.csv', ROWS_A),
+    ]
+    output = tmp_path / 'resumos'
+    records = run_batch(files, str(output), *OPTIONS, workers=1)
+
+    assert [(record['status'], record['conta']) for record in records] == [
+        ('ok', '111111111111'), ('ok', '222222222222'), ('erro', ''), ('ok', '111111111111')
+    ]
+    assert sorted(path.name for path in output.glob('*.txt')) == [
+        'consolidado-111111111111.txt', 'consolidado-222222222222.txt', 'unica.txt'
+    ]
+    # O resumo de uma conta é o mesmo de exportar só as linhas dela
+    assert (output / 'consolidado-111111111111.txt').read_text(encoding='utf-8') == (output / 'unica.txt').read_text(encoding='utf-8')
+
+    with open(write_index(records, str(output)), encoding='utf-8') as f:
+        assert len(list(csv.DictReader(f))) == 4
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason="o process_source trocado só chega aos filhos com fork")
+def test_crashing_file_does_not_take_the_batch_down(write_export, tmp_path, monkeypatch):
+    files = [write_export(f'{name}.csv', ROWS_A) for name in ('a', 'b', 'queda', 'c', 'd')]
+    process = batch.process_source
+
+    def crash_on_queda(path, *args):
+        if os.path.basename(path) == 'queda.csv':
+            os._exit(1)
+        return process(path, *args)
+
+    monkeypatch.setattr(batch, 'process_source', crash_on_queda)
+    records = run_batch(files, str(tmp_path / 'resumos'), *OPTIONS, workers=2)
+
+    assert [(os.path.basename(record['arquivo']), record['status']) for record in records] == [
+        ('a.csv', 'ok'), ('b.csv', 'ok'), ('queda.csv', 'erro'), ('c.csv', 'ok'), ('d.csv', 'ok')
+    ]
+    assert records[2]['erro'].startswith('BrokenProcessPool')
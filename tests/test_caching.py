@@ -0,0 +1,61 @@
+import pytest
+
+from caching import LRUCache, content_digest
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' passa a ser a mais antiga
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+
+
+def test_hit_and_miss_counters():
+    cache = LRUCache(4)
+    cache.put('a', 1)
+    cache.get('a')
+    cache.get('x', 'padrão')
+    assert cache.get_many(['a', 'x', 'y'], None) == [1, None, None]
+    assert cache.info() == {'hits': 2, 'misses': 3, 'size': 1, 'maxsize': 4}
+
+    cache.clear()
+    assert cache.info() == {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 4}
+
+
+def test_get_many_refreshes_recency():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get_many(['a'])
+    cache.put('c', 3)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+
+
+def test_resize_drops_oldest_entries():
+    cache = LRUCache(3)
+    for key in 'abc':
+        cache.put(key, key)
+    cache.resize(1)
+    assert (len(cache), cache.get('c')) == (1, 'c')
+
+    cache.resize(0)
+    cache.put('d', 'd')
+    assert len(cache) == 0 and cache.get('d') is None
+
+    with pytest.raises(ValueError):
+        cache.resize(-1)
+    with pytest.raises(ValueError):
+        LRUCache(-1)
+
+
+def test_content_digest_separates_parts():
+    assert content_digest('ab', 'c') != content_digest('a', 'bc')
+    assert content_digest('a', 1) == content_digest('a', '1')
+    assert len(content_digest('texto')) == 16
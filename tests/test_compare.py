@@ -0,0 +1,42 @@
+import pytest
+
+from compare import ADDED, CHANGED, REMOVED, UNCHANGED, compare_results
+from processing import PAYMENT_OPTIONS, process_source
+from result_model import ProcessResult
+from conftest import ROWS_A, ROWS_B
+
+NO_UPFRONT = PAYMENT_OPTIONS[0]
+
+
+def result_of(path) -> ProcessResult:
+    return ProcessResult.from_dict(process_source(path, NO_UPFRONT, NO_UPFRONT))
+
+
+def test_same_estimate_has_no_differences(write_export):
+    result = result_of(write_export('a.csv', ROWS_A))
+    comparison = compare_results(result, result)
+
+    assert comparison['items'] == []
+    assert comparison['counts'][UNCHANGED] == len(ROWS_A)
+    assert all(total['delta'] == 0 for total in comparison['totals'].values())
+
+
+def test_added_removed_and_changed_items(write_export):
+    before = result_of(write_export('antes.csv', ROWS_A))
+    changed = ROWS_A[0].replace(',120.5,1446,', ',150.5,1806,')
+    after = result_of(write_export('depois.csv', [changed, ROWS_A[1], ROWS_B[0]]))
+    comparison = compare_results(before, after)
+
+    assert comparison['counts'] == {ADDED: 1, REMOVED: 1, CHANGED: 1, UNCHANGED: 1}
+    statuses = {(row['Serviço'], row['Situação']) for row in comparison['items']}
+    assert statuses == {('ElastiCache', ADDED), ('Lambda', REMOVED), ('EC2', CHANGED)}
+
+
+def test_totals_match_each_estimate(write_export):
+    before = result_of(write_export('antes.csv', ROWS_A))
+    after = result_of(write_export('depois.csv', ROWS_A + ROWS_B))
+    totals = compare_results(before, after)['totals']
+
+    for name in ('no_upfront', 'all_upfront'):
+        assert totals[name]['before'] == pytest.approx(dict(before.total_costs)[name])
+        assert totals[name]['after'] == pytest.approx(dict(after.total_costs)[name])
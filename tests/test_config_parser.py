@@ -0,0 +1,54 @@
+from config_parser import first_value, int_values, scan_flags, tokenize_config
+from processing import extract_instance_details
+
+
+def test_pairs_in_both_languages():
+    pt = tokenize_config("Número de instâncias: 2, Instância do EC2 avançada (m5.xlarge), Sistema operacional (Linux)")
+    en = tokenize_config("Number of instances: 2, Advance EC2 instance (m5.xlarge), Operating system (Linux)")
+    assert pt == en == {'instance_count': ['2'], 'ec2_instance': ['m5.xlarge'], 'operating_system': ['Linux']}
+
+
+def test_repeated_keys_keep_text_order():
+    fields = tokenize_config("Nós (2), Tipo de instância (cache.r6g.large), Nós (3), Tipo de instância (cache.t3.medium)")
+    assert fields['nodes'] == ['2', '3']
+    assert fields['instance_type'] == ['cache.r6g.large', 'cache.t3.medium']
+    assert int_values(fields, 'nodes') == [2, 3]
+
+
+def test_nested_colon_pairs():
+    fields = tokenize_config("Workload (Consistent, Number of instances: 4), Advance EC2 instance (m5.large)")
+    assert first_value(fields, 'instance_count') == '4'
+    assert first_value(fields, 'ec2_instance') == 'm5.large'
+
+
+def test_unknown_keys_are_kept_and_missing_text_is_empty():
+    assert tokenize_config("Armazenamento (1 TB)") == {'Armazenamento': ['1 TB']}
+    assert tokenize_config(float('nan')) == {}
+    assert first_value({}, 'nodes', 'N/A') == 'N/A'
+    assert int_values({'nodes': ['2', 'x']}, 'nodes') == [2]
+
+
+def test_scan_flags():
+    text = "Deployment (Multi-AZ), Pricing strategy (3-Year No Upfront), Engine (Valkey), Architecture (ARM), Operating system (Windows Server)"
+    assert scan_flags(text) == {'multi', 'three_year', 'no_upfront', 'valkey', 'arm', 'windows'}
+    assert scan_flags("Option (Heavy Utilization), Term (3 year), OnDemand") == {'heavy_utilization', 'three_year', 'on_demand'}
+    assert scan_flags("Memcached, All Upfront") == {'memcached', 'all_upfront'}
+    assert scan_flags("Single-AZ, 1 year") == set()
+    assert scan_flags(None) == set()
+
+
+def test_prefixed_keys_count_as_their_alias():
+    # As regex originais achavam "Nodes (" e "Instance type (" em qualquer ponto do texto
+    fields = tokenize_config("Cache Nodes (2), DB Instance type (db.r6g.large), Primary Operating system (Linux)")
+    assert fields == {'nodes': ['2'], 'instance_type': ['db.r6g.large'], 'operating_system': ['Linux']}
+
+
+def test_pairs_after_a_colon_value_with_parens():
+    fields = tokenize_config("Storage: gp3 (100 GB), Nodes (2), Note: use (x) here, Instance type (db.r6g.large)")
+    assert fields['nodes'] == ['2']
+    assert fields['instance_type'] == ['db.r6g.large']
+
+
+def test_prefixed_nodes_reach_the_line_item():
+    details = extract_instance_details("Cache Nodes (2), Instance type (cache.r6g.large), Engine (Valkey)", "Amazon ElastiCache")
+    assert (details['quantidade'], details['tipo']) == (2, 'cache.r6g.large')
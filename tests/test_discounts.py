@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from discounts import ARCHITECTURES, NO_DISCOUNT, PAYMENT_MODES, REGION_CLASSES, apply_discounts, compile_discount_rules
+
+
+def test_wildcards_expand_to_every_value():
+    lookup = compile_discount_rules([{'service': 'CloudFront', 'payment_mode': 'No Upfront', 'multiplier': 0.7}])
+    assert set(lookup) == {
+        ('CloudFront', region, 'No Upfront', architecture)
+        for region in REGION_CLASSES for architecture in ARCHITECTURES
+    }
+    assert set(lookup.values()) == {(0.7, 0.0, None)}
+
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_specific_rule_wins_in_any_order(reverse):
+    rules = [
+        {'service': 'Fargate', 'multiplier': 0.9},
+        {'service': 'Fargate', 'region': 'sao_paulo', 'multiplier': 0.8},
+        {'service': 'Fargate', 'region': 'sao_paulo', 'architecture': 'ARM', 'multiplier': 0.7},
+    ]
+    lookup = compile_discount_rules(rules[::-1] if reverse else rules)
+
+    assert lookup[('Fargate', 'sao_paulo', 'No Upfront', 'ARM')][0] == 0.7
+    assert lookup[('Fargate', 'sao_paulo', 'No Upfront', 'x86')][0] == 0.8
+    assert lookup[('Fargate', 'other', 'No Upfront', 'ARM')][0] == 0.9
+    assert len(lookup) == len(REGION_CLASSES) * len(PAYMENT_MODES) * len(ARCHITECTURES)
+
+
+def test_equally_specific_rules_must_agree():
+    same = {'service': 'Lambda', 'region': 'other', 'multiplier': 0.88}
+    assert compile_discount_rules([same, dict(same)])
+    with pytest.raises(ValueError, match='conflitantes'):
+        compile_discount_rules([same, dict(same, multiplier=0.8)])
+
+
+@pytest.mark.parametrize('rule', [
+    {'region': 'other', 'multiplier': 0.9},
+    {'service': 'Lambda', 'region': 'Ohio'},
+    {'service': 'Lambda', 'architecture': 'arm64'},
+])
+def test_invalid_rules(rule):
+    with pytest.raises(ValueError):
+        compile_discount_rules([rule])
+
+
+def test_apply_discounts_with_conditional_deduction():
+    table = {'lookup': compile_discount_rules([
+        {'service': 'RDS', 'payment_mode': 'No Upfront', 'deduction': 4.38, 'deduction_if_config_contains': '(20 GB)'},
+        {'service': 'Lambda', 'multiplier': 0.5},
+    ])}
+    costs = apply_discounts(
+        np.array([100.0, 100.0, 100.0, 100.0]),
+        ['RDS', 'RDS', 'Lambda', 'EC2'],
+        ['other'] * 4,
+        ['No Upfront'] * 4,
+        ['x86'] * 4,
+        pd.Series(['Armazenamento (20 GB)', 'Armazenamento (50 GB)', None, None]),
+        table
+    )
+    assert costs.tolist() == [100.0 - 4.38, 100.0, 50.0, 100.0]
+    assert compile_discount_rules([]).get(('EC2', 'other', 'No Upfront', 'x86'), NO_DISCOUNT) == NO_DISCOUNT
@@ -0,0 +1,89 @@
+"""Paridade com o processamento da linha de base (o loop por linha original)
+
+data/baseline_parity.json foi gerado uma vez com process_csv e
+generate_summary do app da linha de base, sobre as exportações de
+benchmarks/generate_export.py abaixo. Os itens entram como hash da lista
+completa, na ordem de services_by_region, com custos em repr exato; o resumo,
+como hash do texto (câmbio 5.50, imposto 13.83%).
+"""
+import hashlib
+import json
+import os
+import sys
+
+import pytest
+
+from conftest import ROOT
+from processing import load_csv_file, normalize_columns, process_csv, process_csv_chunked
+from result_model import ProcessResult
+from summary import generate_summary
+
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from generate_export import write_export
+
+with open(os.path.join(os.path.dirname(__file__), 'data', 'baseline_parity.json'), encoding='utf-8') as f:
+    BASELINE = json.load(f)
+
+EXPORT_OPTIONS = dict(rows=200, accounts=2, seed=11)
+
+
+def case_id(case) -> str:
+    return f"{case['lang']}-{case['lambda_payment_option'][:3]}-{case['fargate_payment_option'][:3]}"
+
+
+@pytest.fixture(scope='module')
+def exports(tmp_path_factory):
+    """Caminho da exportação sintética de cada idioma"""
+    directory = tmp_path_factory.mktemp('parity')
+    paths = {}
+    for lang in ('pt', 'en'):
+        paths[lang] = str(directory / f'{lang}.csv')
+        write_export(paths[lang], lang=lang, **EXPORT_OPTIONS)
+    return paths
+
+
+def item_rows(data):
+    """Itens na ordem de services_by_region, no formato usado para gerar o hash da linha de base"""
+    return [
+        [region, service_key, item.tipo, item.quantidade, list(item.specs), item.payment_mode, item.cost, item.upfront, item.service_name, data['configs'][item.config_id]]
+        for region, services in data['services_by_region'].items()
+        for service_key, items in services.items()
+        for item in items
+    ]
+
+
+def assert_matches_baseline(data, case):
+    rows = item_rows(data)
+    assert (data['client_name'], data['account_id']) == (case['client_name'], case['account_id'])
+    assert sorted(data['regions']) == case['regions']
+    assert data['total_costs'] == case['total_costs']
+    assert len(rows) == case['items']
+    assert hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode()).hexdigest() == case['items_sha256']
+
+
+@pytest.mark.parametrize('case', BASELINE, ids=case_id)
+def test_vectorized_matches_row_loop(exports, case):
+    df = normalize_columns(load_csv_file(exports[case['lang']]))
+    data = process_csv(df, case['lambda_payment_option'], case['fargate_payment_option'])
+    assert_matches_baseline(data, case)
+
+
+@pytest.mark.parametrize('chunksize', [1, 7, 64])
+@pytest.mark.parametrize('case', BASELINE, ids=case_id)
+def test_chunked_matches_in_memory(exports, case, chunksize):
+    options = (case['lambda_payment_option'], case['fargate_payment_option'])
+    in_memory = process_csv(normalize_columns(load_csv_file(exports[case['lang']])), *options)
+    in_memory['locale'] = case['lang']  # como em process_source
+    chunked = process_csv_chunked(exports[case['lang']], *options, chunksize=chunksize)
+
+    assert_matches_baseline(chunked, case)
+    assert ProcessResult.from_dict(chunked).to_dict() == ProcessResult.from_dict(in_memory).to_dict()
+
+
+@pytest.mark.parametrize('case', BASELINE, ids=case_id)
+def test_summary_is_byte_identical(exports, case):
+    options = (case['lambda_payment_option'], case['fargate_payment_option'])
+    data = process_csv(normalize_columns(load_csv_file(exports[case['lang']])), *options)
+    for source in (data, ProcessResult.from_dict(data).to_dict()):
+        summary = generate_summary(source, 5.50, 13.83, *options)
+        assert hashlib.sha256(summary.encode('utf-8')).hexdigest() == case['summary_sha256']
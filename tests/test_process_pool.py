@@ -0,0 +1,55 @@
+import multiprocessing
+import os
+import signal
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import process_pool
+from process_pool import ProcessingPool
+from processing import PAYMENT_OPTIONS
+from warmup import SAMPLE_EXPORT_PT
+
+NO_UPFRONT = PAYMENT_OPTIONS[0]
+
+
+def test_shutdown_releases_a_broken_pool():
+    before = set(multiprocessing.active_children())
+    pool = ProcessingPool(workers=2)
+    try:
+        for job in [pool.submit(SAMPLE_EXPORT_PT, NO_UPFRONT, NO_UPFRONT) for _ in range(2)]:
+            job.result()
+        children = [child for child in multiprocessing.active_children() if child not in before]
+        assert len(children) == 2
+
+        os.kill(children[0].pid, signal.SIGKILL)
+        children[0].join(10)
+        # Sem afinidade, jobs simultâneos vão um para cada processo; o quebrado
+        # falha no submit ou no resultado
+        with pytest.raises(BrokenProcessPool):
+            for job in [pool.submit(SAMPLE_EXPORT_PT, NO_UPFRONT, NO_UPFRONT) for _ in range(2)]:
+                job.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    pool._dispatcher.join(10)
+    assert not pool._dispatcher.is_alive()
+    assert all(not child.is_alive() for child in children)
+
+
+def test_main_is_detached_only_to_spawn_each_worker(monkeypatch):
+    detached = []
+    original = process_pool._detached_main
+
+    def counting_detached_main():
+        detached.append(1)
+        return original()
+
+    monkeypatch.setattr(process_pool, '_detached_main', counting_detached_main)
+    pool = ProcessingPool(workers=2)
+    try:
+        for job in [pool.submit(SAMPLE_EXPORT_PT, NO_UPFRONT, NO_UPFRONT) for _ in range(6)]:
+            job.result()
+        assert len(detached) == 2
+    finally:
+        pool.shutdown()
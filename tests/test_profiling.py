@@ -0,0 +1,60 @@
+import tracemalloc
+
+from profiling import StageProfiler
+
+
+def test_peaks_of_a_single_session():
+    profiler = StageProfiler(trace_memory=True).start()
+    with profiler.stage('externa'):
+        with profiler.stage('interna'):
+            block = bytearray(4 * 1024 * 1024)
+            del block
+    profiler.finish()
+
+    outer, inner = profiler.stages
+    assert inner['peak_bytes'] >= 4 * 1024 * 1024
+    assert outer['peak_bytes'] >= inner['peak_bytes']
+    assert profiler.shared_peaks == 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_overlapping_sessions_share_tracing():
+    first = StageProfiler(trace_memory=True).start()
+    first.begin('antes')
+    second = StageProfiler(trace_memory=True).start()
+    with second.stage('junto'):
+        pass
+    first.end()
+
+    second.finish()
+    assert tracemalloc.is_tracing()  # first ainda mede
+    with first.stage('sozinha'):
+        pass
+    first.finish()
+    assert not tracemalloc.is_tracing()
+
+    assert [stage['peak_bytes'] is None for stage in first.stages] == [True, False]
+    assert second.stages[0]['peak_bytes'] is None
+    assert (first.shared_peaks, second.shared_peaks) == (1, 1)
+    assert first.stages[0]['seconds'] is not None
+
+
+def test_tracing_started_elsewhere_is_left_running():
+    tracemalloc.start()
+    try:
+        profiler = StageProfiler(trace_memory=True).start()
+        with profiler.stage('etapa'):
+            pass
+        profiler.finish()
+        assert tracemalloc.is_tracing()
+        assert profiler.stages[0]['peak_bytes'] is not None
+    finally:
+        tracemalloc.stop()
+
+
+def test_report_labels_process_wide_peaks():
+    profiler = StageProfiler(trace_memory=True).start()
+    with profiler.stage('etapa'):
+        pass
+    profiler.finish()
+    assert profiler.report().startswith("Etapas (pico de memória do processo inteiro)\n")
@@ -0,0 +1,78 @@
+import pickle
+
+import pytest
+
+from processing import load_csv_file, normalize_columns, process_csv
+from result_model import ProcessResult
+from conftest import ROWS_A, ROWS_B
+
+
+def result_of(path) -> ProcessResult:
+    return ProcessResult.from_dict(process_csv(normalize_columns(load_csv_file(path))))
+
+
+def line_items(result: ProcessResult):
+    """Itens por região e serviço, com o texto da configuração no lugar do id"""
+    data = result.to_dict()
+    return {
+        (region, service_key): [(item.tipo, item.quantidade, item.specs, item.payment_mode, item.cost, item.upfront, data['configs'][item.config_id]) for item in items]
+        for region, services in data['services_by_region'].items()
+        for service_key, items in services.items()
+    }
+
+
+@pytest.fixture
+def result(write_export):
+    return result_of(write_export('a.csv', ROWS_A + ROWS_B))
+
+
+def test_bytes_round_trip(result):
+    data = result.to_bytes()
+    restored = ProcessResult.from_bytes(data)
+
+    assert restored.to_bytes() == data
+    assert restored.to_dict() == result.to_dict()
+    assert restored.accounts == result.accounts
+
+
+def test_json_round_trip(result):
+    restored = ProcessResult.from_json(result.to_json())
+    assert restored.to_dict() == result.to_dict()
+
+
+def test_pickle_round_trip(result):
+    assert pickle.loads(pickle.dumps(result)).to_dict() == result.to_dict()
+
+
+def test_from_bytes_rejects_other_formats():
+    with pytest.raises(ValueError):
+        ProcessResult.from_bytes(b'\x00' * 64)
+
+
+def test_accounts_follow_row_order(result):
+    assert [account.key for account in result.accounts] == ['111111111111', '222222222222']
+    assert sum(account.rows for account in result.accounts) == result.rows
+
+
+@pytest.mark.parametrize('key, rows', [('111111111111', ROWS_A), ('222222222222', ROWS_B)])
+def test_partition_matches_processing_the_account_alone(result, write_export, key, rows):
+    partition = result.partition(key)
+    alone = result_of(write_export(f'{key}.csv', rows))
+
+    assert partition.total_costs == alone.total_costs
+    assert partition.cube() == alone.cube()
+    assert partition.regions == alone.regions
+    assert (partition.client_name, partition.account_id, partition.rows) == (alone.client_name, alone.account_id, alone.rows)
+    assert line_items(partition) == line_items(alone)
+
+
+def test_partitions_match_partition(result):
+    partitions = list(result.partitions())
+    assert [key for key, _ in partitions] == [account.key for account in result.accounts]
+    for key, partition in partitions:
+        assert partition.to_bytes() == result.partition(key).to_bytes()
+
+
+def test_partition_of_unknown_account(result):
+    with pytest.raises(KeyError):
+        result.partition('333333333333')
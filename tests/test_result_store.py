@@ -0,0 +1,95 @@
+import pytest
+
+import result_store
+from processing import PAYMENT_OPTIONS, process_source
+from result_model import ProcessResult
+from result_store import ResultStore, result_key, summary_variant
+from conftest import ROWS_A, ROWS_B
+
+NO_UPFRONT, ALL_UPFRONT = PAYMENT_OPTIONS
+
+
+@pytest.fixture
+def result(write_export):
+    return ProcessResult.from_dict(process_source(write_export('a.csv', ROWS_A + ROWS_B), NO_UPFRONT, NO_UPFRONT))
+
+
+def test_result_key_covers_every_option():
+    key = result_key('digest', NO_UPFRONT, NO_UPFRONT, 'rules')
+    assert key == result_key('digest', NO_UPFRONT, NO_UPFRONT, 'rules')
+    assert len({
+        key,
+        result_key('outro', NO_UPFRONT, NO_UPFRONT, 'rules'),
+        result_key('digest', ALL_UPFRONT, NO_UPFRONT, 'rules'),
+        result_key('digest', NO_UPFRONT, ALL_UPFRONT, 'rules'),
+        result_key('digest', NO_UPFRONT, NO_UPFRONT, 'outras'),
+    }) == 5
+
+
+def test_summary_variant_covers_rates():
+    assert summary_variant(5.5, 13.83) == summary_variant(5.5, 13.83)
+    assert summary_variant(5.5, 13.83) != summary_variant(5.6, 13.83)
+    assert summary_variant(5.5, 13.83) != summary_variant(5.5, 14.0)
+
+
+def test_summary_variant_separates_accounts():
+    assert summary_variant(5.5, 13.83) != summary_variant(5.5, 13.83, '111111111111')
+    assert summary_variant(5.5, 13.83, '111111111111') != summary_variant(5.5, 13.83, '222222222222')
+
+
+def test_keys_change_with_pipeline_and_summary_versions(monkeypatch):
+    key = result_key('digest', NO_UPFRONT, NO_UPFRONT, 'rules')
+    variant = summary_variant(5.5, 13.83)
+
+    monkeypatch.setattr(result_store, 'PIPELINE_VERSION', result_store.PIPELINE_VERSION + 1)
+    assert result_key('digest', NO_UPFRONT, NO_UPFRONT, 'rules') != key
+    assert summary_variant(5.5, 13.83) == variant
+
+    monkeypatch.setattr(result_store, 'SUMMARY_VERSION', result_store.SUMMARY_VERSION + 1)
+    assert summary_variant(5.5, 13.83) != variant
+
+
+def test_get_and_put(tmp_path, result):
+    store = ResultStore(str(tmp_path / 'store.sqlite'))
+    key = result_key('digest', NO_UPFRONT, NO_UPFRONT, 'rules')
+
+    assert store.get(key) is None
+    store.put(key, result)
+    assert store.get(key).to_dict() == result.to_dict()
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_summary_requires_stored_result(tmp_path, result):
+    store = ResultStore(str(tmp_path / 'store.sqlite'))
+    variant = summary_variant(5.5, 13.83)
+
+    store.put_summary('sem-resultado', variant, 'resumo')
+    assert store.get_summary('sem-resultado', variant) is None
+
+    store.put('chave', result)
+    store.put_summary('chave', variant, 'resumo')
+    assert store.get_summary('chave', variant) == 'resumo'
+
+
+def test_evicts_least_recently_used(tmp_path, result):
+    size = len(result.to_bytes())
+    store = ResultStore(str(tmp_path / 'store.sqlite'), max_bytes=2 * size + len('resumo'))
+
+    store.put('primeira', result)
+    store.put('segunda', result)
+    store.put_summary('primeira', 'v', 'resumo')
+    assert store.get('primeira') is not None  # 'segunda' passa a ser a menos usada
+
+    store.put('terceira', result)
+    stats = store.stats()
+    assert store.get('segunda') is None
+    assert store.get('primeira') is not None
+    assert store.get('terceira') is not None
+    assert stats['bytes'] <= stats['max_bytes']
+
+
+def test_clear(tmp_path, result):
+    store = ResultStore(str(tmp_path / 'store.sqlite'))
+    store.put('chave', result)
+    store.clear()
+    assert store.stats()['entries'] == 0
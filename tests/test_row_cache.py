@@ -0,0 +1,65 @@
+import pytest
+
+import processing
+from processing import PAYMENT_OPTIONS, ROW_CACHE, load_csv_file, normalize_columns, process_source, row_hashes, row_items
+from conftest import ROWS_A, ROWS_B
+
+NO_UPFRONT, ALL_UPFRONT = PAYMENT_OPTIONS
+
+
+@pytest.fixture
+def frame(write_export):
+    return normalize_columns(load_csv_file(write_export('a.csv', ROWS_A + ROWS_B)))
+
+
+@pytest.fixture(autouse=True)
+def empty_row_cache():
+    ROW_CACHE.clear()
+    yield
+    ROW_CACHE.clear()
+
+
+def test_row_hashes_depend_on_rows_and_options(frame):
+    hashes = row_hashes(frame, NO_UPFRONT, NO_UPFRONT)
+    assert hashes == row_hashes(frame, NO_UPFRONT, NO_UPFRONT)
+    assert len(set(hashes)) == len(frame)
+    assert set(hashes).isdisjoint(row_hashes(frame, ALL_UPFRONT, NO_UPFRONT))
+
+
+def test_row_items_reuses_cached_rows(frame):
+    fresh = processing._compute_row_items(frame, NO_UPFRONT, NO_UPFRONT)
+    first = row_items(frame, NO_UPFRONT, NO_UPFRONT)
+    before = ROW_CACHE.info()
+    second = row_items(frame, NO_UPFRONT, NO_UPFRONT)
+    after = ROW_CACHE.info()
+
+    assert first == fresh
+    assert second == fresh
+    assert after['hits'] - before['hits'] == len(frame)
+    assert after['misses'] == before['misses']
+    # A segunda leitura devolve os objetos guardados, sem recalcular
+    assert all(a is b for a, b in zip(first, second) if a is not None)
+
+
+def test_row_items_only_computes_new_rows(frame, write_export):
+    row_items(frame, NO_UPFRONT, NO_UPFRONT)
+    revision = normalize_columns(load_csv_file(write_export('b.csv', ROWS_A + ROWS_B[:-1] + [ROWS_B[-1].replace(',80,960,', ',90,1080,')])))
+    before = ROW_CACHE.info()
+    items = row_items(revision, NO_UPFRONT, NO_UPFRONT)
+    after = ROW_CACHE.info()
+
+    assert after['hits'] - before['hits'] == len(revision) - 1
+    assert items == processing._compute_row_items(revision, NO_UPFRONT, NO_UPFRONT)
+
+
+def test_process_source_with_and_without_row_cache(write_export):
+    path = write_export('a.csv', ROWS_A + ROWS_B)
+    cached = process_source(path, NO_UPFRONT, NO_UPFRONT)
+    maxsize = ROW_CACHE.maxsize
+    ROW_CACHE.resize(0)
+    try:
+        uncached = process_source(path, NO_UPFRONT, NO_UPFRONT)
+    finally:
+        ROW_CACHE.resize(maxsize)
+    assert cached == uncached
+
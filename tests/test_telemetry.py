@@ -0,0 +1,63 @@
+import json
+import math
+import threading
+
+from telemetry import TelemetrySink, percentile
+
+
+def test_emit_drops_records_when_queue_is_full(tmp_path):
+    writing, release = threading.Event(), threading.Event()
+    sink = TelemetrySink(str(tmp_path / 'telemetry.jsonl'), max_queue=1)
+    write = sink._write
+
+    def blocked_write(batch):
+        writing.set()
+        release.wait(5)
+        write(batch)
+
+    sink._write = blocked_write
+    try:
+        sink.emit({'n': 1})
+        assert writing.wait(5)  # a thread pegou o primeiro e está presa gravando
+        sink.emit({'n': 2})     # ocupa a única vaga da fila
+        sink.emit({'n': 3})
+        sink.emit({'n': 4})
+        assert sink.dropped == 2
+    finally:
+        release.set()
+        sink.close()
+
+    lines = (tmp_path / 'telemetry.jsonl').read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['n'] for line in lines] == [1, 2]
+    assert sink.errors == 0
+
+
+def test_flush_waits_for_pending_records(tmp_path):
+    sink = TelemetrySink(str(tmp_path / 'telemetry.jsonl'))
+    try:
+        for n in range(250):
+            sink.emit({'n': n})
+        sink.flush()
+        assert len((tmp_path / 'telemetry.jsonl').read_text(encoding='utf-8').splitlines()) == 250
+    finally:
+        sink.close()
+
+
+def test_write_errors_are_counted(tmp_path):
+    sink = TelemetrySink(str(tmp_path))  # diretório: open() falha
+    try:
+        sink.emit({'n': 1})
+        sink.flush()
+        assert sink.errors == 1
+    finally:
+        sink.close()
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(n) for n in range(1, 11)]
+    assert percentile(values, 50) == 5.0
+    assert percentile(values, 95) == 10.0
+    assert percentile(values, 99) == 10.0
+    assert percentile(values, 0) == 1.0
+    assert percentile([7.0], 99) == 7.0
+    assert math.isnan(percentile([], 50))
@@ -0,0 +1,50 @@
+"""Lote de uploads com arquivos inválidos: os outros seguem e cada erro fica ao lado do arquivo"""
+import pytest
+
+import app_modern
+from process_pool import ProcessingPool
+from processing import INVALID_FORMAT_MESSAGE, PAYMENT_OPTIONS, InvalidFormatError
+from result_model import ProcessResult
+from conftest import ROWS_A, ROWS_B
+
+NO_UPFRONT = PAYMENT_OPTIONS[0]
+
+
+@pytest.fixture
+def uploads(write_export):
+    return [
+        write_export('a.csv', ROWS_A),
+        write_export('colunas.csv', content='Estimativa detalhada\nColuna,Outra\n1,2\n'.encode('utf-8')),
+        write_export('b.csv', ROWS_B),
+        write_export('vazio.csv', content=b'Estimativa\n'),
+    ]
+
+
+def test_run_each_keeps_processing_after_a_failure(uploads):
+    results, errors = app_modern.run_each(uploads, NO_UPFRONT, NO_UPFRONT)
+
+    assert [result is None for result in results] == [False, True, False, True]
+    assert isinstance(errors[1], InvalidFormatError)
+    assert isinstance(errors[3], ValueError)
+    assert errors[0] is None and errors[2] is None
+    assert [result.account_id for result in results if result is not None] == ['111111111111', '222222222222']
+
+
+def test_upload_error_message():
+    assert app_modern.upload_error_message(InvalidFormatError(INVALID_FORMAT_MESSAGE)) == INVALID_FORMAT_MESSAGE
+    assert app_modern.upload_error_message(ValueError('sem seção')) == 'Erro ao processar arquivo: sem seção'
+
+
+def test_pool_jobs_fail_independently(uploads):
+    pool = ProcessingPool(workers=1)
+    try:
+        jobs = [pool.submit(path, NO_UPFRONT, NO_UPFRONT) for path in uploads]
+        with pytest.raises(InvalidFormatError):
+            jobs[1].result()
+        with pytest.raises(ValueError):
+            jobs[3].result()
+        result, _, _ = jobs[2].result()
+        assert isinstance(result, ProcessResult)
+        assert result.account_id == '222222222222'
+    finally:
+        pool.shutdown()
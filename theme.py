@@ -0,0 +1,208 @@
+"""CSS e imagens do app, preparados uma única vez por processo
+
+O script do Streamlit é reexecutado a cada interação; manter os estilos e as
+imagens já redimensionadas em um módulo importado evita refazer esse trabalho
+em cada rerun.
+"""
+import io
+from functools import lru_cache
+
+from PIL import Image
+
+# Ícone da página e logo da sidebar (os PNGs originais têm 4500 px de largura)
+PAGE_ICON_PATH = "06 - Dati Símbolo Oficial.png"
+PAGE_ICON_WIDTH = 128
+LOGO_PATH = "02 - Dati Logotipo Oficial.png"
+LOGO_WIDTH = 120
+
+
+@lru_cache(maxsize=None)
+def scaled_png(path: str, width: int) -> bytes:
+    """PNG redimensionado para a largura dada, gerado na primeira chamada
+
+    Usa o mesmo filtro do st.image, que de outra forma decodificaria e
+    redimensionaria a imagem original a cada rerun.
+    """
+    with Image.open(path) as image:
+        if image.width > width:
+            image = image.resize((width, int(1.0 * image.height * width / image.width)), resample=Image.BILINEAR)
+        output = io.BytesIO()
+        image.save(output, format='PNG')
+        return output.getvalue()
+
+
+# CSS customizado com paleta de cores personalizada
+BASE_CSS = """
+<style>
+    .main-header {
+        background: linear-gradient(135deg, #1b0f5d 0%, #655ccb 100%);
+        padding: 2rem;
+        border-radius: 15px;
+        margin-bottom: 2rem;
+        color: #ffffff;
+        text-align: center;
+        box-shadow: 0 8px 32px rgba(27, 15, 93, 0.3);
+    }
+
+    .logo-container {
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        gap: 1rem;
+        margin-bottom: 1rem;
+    }
+
+    .metric-card {
+        background: #ffffff;
+        padding: 1.5rem;
+        border-radius: 12px;
+        box-shadow: 0 4px 16px rgba(27, 15, 93, 0.1);
+        border-left: 4px solid #f59d01;
+        transition: transform 0.2s ease;
+    }
+
+    .metric-card:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 6px 20px rgba(27, 15, 93, 0.15);
+    }
+
+    .service-card {
+        background: #ffffff;
+        padding: 1.5rem;
+        border-radius: 12px;
+        margin: 1rem 0;
+        border: 1px solid #5bbed6;
+        box-shadow: 0 2px 8px rgba(91, 190, 214, 0.1);
+    }
+
+    .upload-area {
+        border: 2px dashed #f59d01;
+        border-radius: 15px;
+        padding: 2rem;
+        text-align: center;
+        background: linear-gradient(45deg, #ffffff 0%, #f8f9ff 100%);
+        transition: all 0.3s ease;
+    }
+
+    .upload-area:hover {
+        border-color: #655ccb;
+        background: linear-gradient(45deg, #f8f9ff 0%, #ffffff 100%);
+    }
+
+    .success-banner {
+        background: linear-gradient(45deg, #a1dfb4 0%, #c8e6c9 100%);
+        border: 1px solid #a1dfb4;
+        color: #1b5e20;
+        padding: 1rem;
+        border-radius: 12px;
+        margin: 1rem 0;
+        box-shadow: 0 2px 8px rgba(161, 223, 180, 0.3);
+    }
+
+    .stButton > button {
+        background: linear-gradient(45deg, #f59d01 0%, #ff9800 100%);
+        color: #ffffff;
+        border: none;
+        border-radius: 8px;
+        padding: 0.5rem 1rem;
+        font-weight: 600;
+        transition: all 0.3s ease;
+    }
+
+    .stButton > button:hover {
+        background: linear-gradient(45deg, #e68900 0%, #f57c00 100%);
+        transform: translateY(-1px);
+        box-shadow: 0 4px 12px rgba(245, 157, 1, 0.4);
+    }
+
+    .sidebar .stSelectbox > div > div {
+        background-color: #ffffff;
+        border: 1px solid #5bbed6;
+    }
+
+    .sidebar .stNumberInput > div > div > input {
+        background-color: #ffffff;
+        border: 1px solid #5bbed6;
+    }
+
+    h1, h2, h3 {
+        color: #1b0f5d;
+    }
+
+    .main-header h1 {
+        color: #ffffff !important;
+    }
+
+    .stMetric {
+        background: #ffffff;
+        padding: 1rem;
+        border-radius: 8px;
+        border-left: 3px solid #655ccb;
+    }
+</style>
+"""
+
+# Tema escuro (sobrepõe o CSS base)
+DARK_THEME_CSS = """
+<style>
+    .stApp {
+        background-color: #1a1a1a !important;
+        color: #ffffff !important;
+    }
+    .main-header {
+        background: linear-gradient(135deg, #0d0825 0%, #2d1b69 100%) !important;
+        color: #ffffff !important;
+    }
+    .metric-card {
+        background: #2d2d2d !important;
+        color: #ffffff !important;
+    }
+    .service-card {
+        background: #2d2d2d !important;
+        color: #ffffff !important;
+        border: 1px solid #444444 !important;
+    }
+    .upload-area {
+        background: #2d2d2d !important;
+        border-color: #f59d01 !important;
+        color: #ffffff !important;
+    }
+    .stSidebar {
+        background-color: #262626 !important;
+    }
+    .stSidebar .stMarkdown {
+        color: #ffffff !important;
+    }
+    h1, h2, h3, h4, h5, h6 {
+        color: #ffffff !important;
+    }
+    .stMetric {
+        background: #2d2d2d !important;
+        color: #ffffff !important;
+    }
+    .stDataFrame {
+        background: #2d2d2d !important;
+    }
+    .stTextArea textarea {
+        background-color: #2d2d2d !important;
+        color: #ffffff !important;
+    }
+</style>
+"""
+
+# Tema claro
+LIGHT_THEME_CSS = """
+<style>
+    .stApp {
+        background-color: #ffffff !important;
+        color: #1b0f5d !important;
+    }
+    .main-header {
+        background: linear-gradient(135deg, #1b0f5d 0%, #655ccb 100%) !important;
+        color: #ffffff !important;
+    }
+    h1, h2, h3, h4, h5, h6 {
+        color: #1b0f5d !important;
+    }
+</style>
+"""
@@ -0,0 +1,74 @@
+"""Aquecimento do processo: passa uma exportação sintética pelo pipeline completo
+
+A primeira estimativa de um processo paga a inicialização do parser de CSV do
+pandas, a compilação das regex de configuração, a importação do Plotly e o
+redimensionamento das imagens. warm_up() faz esse trabalho antes do primeiro
+usuário; o app o executa em uma thread, uma vez por processo, depois da
+primeira renderização. WARM_UP=0 (ou vazio) desliga o aquecimento.
+"""
+import os
+import time
+from typing import Dict
+
+from charts import create_cost_chart
+from processing import process_source
+from summary import generate_summary
+from theme import LOGO_PATH, LOGO_WIDTH, PAGE_ICON_PATH, PAGE_ICON_WIDTH, scaled_png
+
+# Exportação mínima em português com todos os serviços tratados pelo resumo
+SAMPLE_EXPORT_PT = '''﻿Estimativa
+Exportar data,2025-01-01
+
+Estimativa detalhada
+Hierarquia de grupos,Região,Descrição,Serviço,Pagamento adiantado,Mensal,Primeiros 12 meses no total,Moeda,Status,Resumo da configuração
+Cliente Exemplo - 123456789012 > No Upfront,"América do Sul (São Paulo)",,Amazon EC2,0,120.5,1446,USD,,"Número de instâncias: 2, Instância do EC2 avançada (m5.xlarge), Pricing strategy (EC2 Instance Savings Plans 1 Year No Upfront), Sistema operacional (Linux)"
+Cliente Exemplo - 123456789012 > All Upfront,"Leste dos EUA (N. da Virgínia)",,Amazon RDS for PostgreSQL,1500,0,1500,USD,,"Nós (1), Tipo de instância (db.r6g.large), Implantação (Multi-AZ), Modelo de preços (Reserved), Termo (1 year), Opção de compra (All Upfront), Quantidade de armazenamento (20 GB)"
+Cliente Exemplo - 123456789012 > All Upfront,"América do Sul (São Paulo)",,Amazon ElastiCache,900,0,900,USD,,"Nós (2), Tipo de instância (cache.r6g.large), Mecanismo (Valkey), Opção (Heavy Utilization)"
+Cliente Exemplo - 123456789012 > No Upfront,"América do Sul (São Paulo)",,Amazon CloudFront,0,300,3600,USD,,"Transferência de dados (10 TB)"
+Cliente Exemplo - 123456789012 > No Upfront,"América do Sul (São Paulo)",,AWS Lambda,0,45.2,542.4,USD,,"Arquitetura (ARM), Número de solicitações (1000000)"
+Cliente Exemplo - 123456789012 > No Upfront,"Leste dos EUA (N. da Virgínia)",,AWS Fargate,0,80,960,USD,,"Sistema operacional (Linux), Arquitetura da CPU (ARM)"
+Cliente Exemplo - 123456789012 > On-Demand,"Leste dos EUA (N. da Virgínia)",,Amazon S3,0,10,120,USD,,"Armazenamento (1 TB)"
+
+Confirmação
+Exemplo sintético para aquecimento
+'''.encode('utf-8')
+
+# Exportação mínima em inglês (detecção de idioma e renomeação das colunas)
+SAMPLE_EXPORT_EN = '''Estimate
+Export date,2025-01-01
+
+Detailed Estimate
+Group hierarchy,Region,Description,Service,Upfront,Monthly,First 12 months total,Currency,Status,Configuration summary
+Example Client - 123456789012 > No Upfront,US East (N. Virginia),,Amazon EC2,0,60.25,723,USD,,"Number of instances: 1, Advance EC2 instance (m5.large), Pricing strategy (EC2 Instance Savings Plans 1 Year No Upfront), Operating system (Windows Server)"
+Example Client - 123456789012 > All Upfront,US East (N. Virginia),,Amazon ElastiCache,400,0,400,USD,,"Nodes (1), Instance type (cache.t3.medium), Engine (Memcached), Option (All Upfront)"
+
+Acknowledgement
+Synthetic warm-up sample
+'''.encode('utf-8')
+
+
+def warm_up_enabled() -> bool:
+    return os.environ.get('WARM_UP', '1') not in ('', '0')
+
+
+def warm_up() -> Dict[str, float]:
+    """Executa o pipeline completo nas exportações de exemplo; retorna segundos por etapa"""
+    timings = {}
+
+    start = time.perf_counter()
+    samples = [process_source(sample) for sample in (SAMPLE_EXPORT_PT, SAMPLE_EXPORT_EN)]
+    for data in samples:
+        generate_summary(data, 5.50)
+    timings['pipeline'] = time.perf_counter() - start
+
+    # Importa o Plotly Express e monta um gráfico completo
+    start = time.perf_counter()
+    create_cost_chart(samples[0], 5.50)
+    timings['plotly'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scaled_png(PAGE_ICON_PATH, PAGE_ICON_WIDTH)
+    scaled_png(LOGO_PATH, LOGO_WIDTH)
+    timings['images'] = time.perf_counter() - start
+
+    return timings